@@ -1,5 +1,33 @@
-from .image_agent import *
-from .research_analysis_agent import *
-from .web_research_agent import *
-from .blog_writer_agent import *
-from .tag_agent import *
\ No newline at end of file
+# Submodules pull in agno, pydantic and duckduckgo_search, so they load on first use.
+# The router instance shares its submodule's name: import it from agents.model_router.
+from utils.lazy import lazy_exports
+
+lazy_exports(
+    __name__,
+    globals(),
+    {
+        "model_router": ["ModelCandidate", "CandidateStats", "StageRunner", "ModelRouter"],
+        "research_models": ["MISSING_SUMMARY", "Credibility", "Finding", "ResearchResult"],
+        "schemas": [
+            "FindingSchema",
+            "ResearchSchema",
+            "FindingRepairSchema",
+            "validate_findings",
+            "coerce_research",
+            "create_repair_agent",
+            "repair_findings",
+        ],
+        "research_budget": [
+            "BUDGET_EXHAUSTED",
+            "ANSWER_GRACE_SECONDS",
+            "ResearchBudget",
+            "SearchSession",
+            "active_search_session",
+            "duckduckgo_search",
+        ],
+        "metadata_agent": ["PostMetadata", "create_metadata_agent"],
+        "research_analysis_agent": ["SUMMARY_TASK", "ResearchAnalysis"],
+        "web_research_agent": ["WebResearchAgent"],
+        "blog_writer_agent": ["BlogWriter"],
+    },
+)
\ No newline at end of file
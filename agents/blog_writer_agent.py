@@ -1,12 +1,17 @@
 # agents/blog_writer.py
 import html
-from agno.agent import Agent, RunResponse
-from agno.team.team import Team
-from agno.models.google import Gemini
-from typing import Dict, Any, Optional, Iterator
+from agno.agent import Agent
+from agno.models.base import Model
+from typing import Dict, Any, List, Optional
+from concurrent.futures import Future
+from .research_models import Finding, ResearchResult
 import logging
 import re
-from utils.config import config
+from .model_router import model_router, StageRunner
+from utils.singleflight import single_flight, make_flight_key
+from utils.prompt_budget import PromptBuilder
+from utils.citations import link_citations, strip_citations
+from utils.resilience import StageCheckpoints
 from textwrap import dedent
 
 logger = logging.getLogger(__name__)
@@ -14,16 +19,18 @@ logger = logging.getLogger(__name__)
 
 class BlogWriter:
     def __init__(self):
-        self.architect = self._create_architect_agent()
-        self.writer = self._create_writer_agent()
-        self.editor = self._create_editor_agent()
+        self.architect = model_router.runner("outline", self._create_architect_agent)
+        self.writer = model_router.runner("draft", self._create_writer_agent)
+        self.editor = model_router.runner("polish", self._create_editor_agent)
+        # Finished outlines and drafts, so retrying a failed blog resumes at the failed stage
+        self.checkpoints = StageCheckpoints()
         logger.info("Agno-based blog writing team initialized")
 
-    def _create_architect_agent(self) -> Agent:
+    def _create_architect_agent(self, model: Model) -> Agent:
         return Agent(
             name="Content Architect",
             role="Design blog structure and outline",
-            model=Gemini(id="gemini-2.0-flash", api_key=config.GEMINI_API_KEY),
+            model=model,
             instructions=dedent(
                 """
                 Create comprehensive blog outlines from research data.
@@ -35,11 +42,11 @@ class BlogWriter:
             markdown=True,
         )
 
-    def _create_writer_agent(self) -> Agent:
+    def _create_writer_agent(self, model: Model) -> Agent:
         return Agent(
             name="Technical Writer",
             role="Draft blog content based on outline",
-            model=Gemini(id="gemini-2.0-flash", api_key=config.GEMINI_API_KEY),
+            model=model,
             instructions=dedent(
                 """
                 Create engaging technical blog content with rich visual elements:
@@ -62,11 +69,11 @@ class BlogWriter:
             ),
         )
 
-    def _create_editor_agent(self) -> Agent:
+    def _create_editor_agent(self, model: Model) -> Agent:
         return Agent(
             name="Technical Editor",
             role="Polish content and add visual enhancements",
-            model=Gemini(id="gemini-2.0-flash", api_key=config.GEMINI_API_KEY),
+            model=model,
             instructions=dedent(
                 """
                 Enhance blog content for visual engagement:
@@ -85,8 +92,8 @@ class BlogWriter:
                     - Include relevant emojis in section headers
                     - Create comparison tables for technical specs
                 3. Polish technical accuracy
-                4. Add citations using [^1] notation
-                5. Create reference section
+                4. Do NOT add citations, footnotes or a references section;
+                   they are added afterwards from the research sources
                 
                 Critical Formatting Rules:
                 - NEVER output literal "\n" - use actual line breaks
@@ -120,126 +127,180 @@ class BlogWriter:
         return raw
 
 
-    def write_blog(self, research_data: Dict) -> Dict[str, Any]:
+    def write_blog(
+        self,
+        research_data: ResearchResult,
+        summary: Optional[Future] = None,
+        grounding: Optional[Future] = None,
+    ) -> Dict[str, Any]:
         """
         Generate technical blog using optimized workflow
 
         Args:
             research_data: Output from ResearchAnalysis
+            summary: Pending research summary; the outline is created while it runs
+            grounding: Pending findings with source page excerpts, also awaited after the outline
 
         Returns:
             Dictionary containing blog content
         """
+        checkpoint_key = make_flight_key(
+            "blog", research_data.topic, [finding.fact for finding in research_data.key_findings]
+        )
+        done = self.checkpoints.get(checkpoint_key)
+        stage = "outline"
         try:
             # Create outline
-            outline = self._create_outline(research_data)
+            outline = done.get("outline") or self._create_outline(research_data)
+            self.checkpoints.save(checkpoint_key, "outline", outline)
+            if "draft" in done:
+                logger.info("Resuming blog from checkpointed draft")
+
+            # The draft is the first stage that needs the summary
+            if summary is not None and not research_data.summary:
+                try:
+                    research_data.summary = summary.result()
+                except Exception as e:
+                    logger.warning(f"Drafting without research summary: {e}")
+            if grounding is not None:
+                try:
+                    research_data.key_findings = grounding.result()
+                except Exception as e:
+                    logger.warning(f"Drafting without source page excerpts: {e}")
 
             # Draft content
-            draft = self._draft_content(research_data, outline)
+            stage = "draft"
+            draft = done.get("draft") or self._draft_content(research_data, outline)
+            self.checkpoints.save(checkpoint_key, "draft", draft)
 
             # Finalize content
-            
-            final_blog = self._finalize_content(research_data, draft)
+            stage = "polish"
+            final_blog = self._finalize_content(draft)
             final_blog = self._preserve_emojis(final_blog)
             final_blog = self._convert_escaped_newlines(final_blog)
 
+            # Citations and references are bookkeeping, done locally
+            final_blog = link_citations(final_blog, research_data.key_findings)
+
             # Apply markdown formatting cleanup
             # final_blog = self._clean_markdown(final_blog)
 
+            self.checkpoints.clear(checkpoint_key)
             return {
-                "research_topic": research_data.get("topic", ""),
+                "research_topic": research_data.topic,
                 "final": final_blog,
+                # Kept so citations can be linked again after user edits
+                "findings": [finding.to_dict() for finding in research_data.key_findings],
             }
         except Exception as e:
-            logger.exception(f"Blog creation failed: {str(e)}")
-            return {"error": f"Blog creation failed: {str(e)}"}
+            logger.exception(f"Blog creation failed at the {stage} stage: {str(e)}")
+            return {"error": f"Blog creation failed at the {stage} stage: {str(e)}"}
 
-    def _create_outline(self, research: Dict) -> str:
+    def _create_outline(self, research: ResearchResult) -> str:
         """Generate blog structure from research"""
-        prompt = dedent(
-            f"""
-        **Research Topic**: {research.get("topic", "")}
-        **Key Findings**:
-        {self._format_findings(research.get("key_findings", [])[:5])}
-        
-        **Task**: Create detailed blog outline with section key points.
-        """
+        prompt = (
+            PromptBuilder(model_router.token_budget("outline"), "outline")
+            .text(f"**Research Topic**: {research.topic}\n**Key Findings**:")
+            .section("findings", self._format_findings(research.key_findings), max_tokens=1500)
+            .text("\n**Task**: Create detailed blog outline with section key points.")
+            .build()
         )
-        response = self.architect.run(prompt)
-        return response.content.strip()  # type: ignore
+        return self._run_stage("outline", self.architect, prompt)
 
-    def _draft_content(self, research: Dict, outline: str) -> str:
+    def _draft_content(self, research: ResearchResult, outline: str) -> str:
         """Expand outline into full content"""
-        prompt = dedent(
-            f"""
-        **Topic**: {research.get("topic", "")}
-        **Outline**: 
-        {outline}
-        
-        **Research Summary**:
-        {research.get("summary", "")[:300]}
-        
-        **Task**: Write full blog content based on outline.
-        """
+        prompt = (
+            PromptBuilder(model_router.token_budget("draft"), "draft")
+            .text(f"**Topic**: {research.topic}\n**Outline**:")
+            .section("outline", outline, required=True)
+            .text("\n**Research Summary**:")
+            .section("summary", research.summary or "", priority=1, max_tokens=800)
+            .text("\n**Source Excerpts**:")
+            .section("excerpts", self._format_excerpts(research.key_findings), priority=2)
+            .text("\n**Task**: Write full blog content based on outline.")
+            .build()
         )
-        response = self.writer.run(prompt)
-        return response.content.strip()  # type: ignore
-
-    def _finalize_content(self, research: Dict, content: str) -> str:
-        """Polish and add citations"""
-        prompt = dedent(
-            f"""
-        **Blog Content**:
-        {content}
-        
-        **Research Sources**:
-        {self._format_sources(research.get("key_findings", []))}
-        
-        **Task**: 
-        - Add citations where needed using [^number] notation
-        - Create references section at end
-        - Polish grammar and flow
-        - Output ONLY the final markdown content
-        """
+        return self._run_stage("draft", self.writer, prompt)
+
+    def _finalize_content(self, content: str) -> str:
+        """Polish prose and formatting"""
+        prompt = (
+            PromptBuilder(model_router.token_budget("polish"), "polish")
+            .text("**Blog Content**:")
+            .section("draft", content, required=True)
+            .text(
+                dedent(
+                    """
+                    **Task**: 
+                    - Polish grammar and flow
+                    - Output ONLY the final markdown content
+                    """
+                )
+            )
+            .build()
         )
-        response = self.editor.run(prompt)
-        
-        # Decode escaped characters like \n into actual line breaks
-        decoded_content = response.content.strip() # type: ignore
-        return decoded_content 
+        return self._run_stage("polish", self.editor, prompt)
 
-    def _format_findings(self, findings: list) -> str:
-        return "\n".join(f"- {f['fact']}" for f in findings)
+    def _run_stage(self, stage: str, agent: StageRunner, prompt: str) -> str:
+        """Run one writer stage, sharing the result with identical in-flight calls"""
+        return single_flight.do(
+            stage,
+            make_flight_key(stage, prompt),
+            lambda: agent.run(prompt).content.strip(),  # type: ignore
+        )
 
-    def _format_sources(self, findings: list) -> str:
-        unique_sources = {}
-        for f in findings:
-            source = f.get("source_url", "User Provided")
-            if source not in unique_sources:
-                unique_sources[source] = f.get("source_credibility", "N/A")
-        return "\n".join(f"- {url}" for url in unique_sources.keys())
+    def _format_findings(self, findings: List[Finding]) -> List[str]:
+        return [f.prompt_line for f in findings]
+
+    def _format_excerpts(self, findings: List[Finding]) -> List[str]:
+        return [f"{f.prompt_line}\n  Source excerpt: {f.excerpt}" for f in findings if f.excerpt]
 
     def apply_user_edits(self, blog_state: Dict, user_edits: str) -> Dict:
-        """Apply user edits to blog content"""
+        """
+        Apply user edits to blog content
+
+        The editor gets the blog without citations, as it is told not to write
+        any, and they are linked again from the research findings afterwards.
+        """
         try:
-            prompt = dedent(
-                f"""
-            **Current Blog**:
-            {blog_state['final'][:3000]}
-            
-            **Requested Changes**:
-            {user_edits}
-            
-            **Task**: Implement changes while preserving:
-            - Technical accuracy
-            - Citation format
-            - Professional tone
-            - Output ONLY the modified markdown
-            """
+            findings = blog_state.get("findings")
+            # The whole blog is required: a truncated blog would come back truncated
+            prompt = (
+                PromptBuilder(model_router.token_budget("polish"), "edit")
+                .text("**Current Blog**:")
+                .section(
+                    "blog",
+                    strip_citations(blog_state["final"]) if findings else blog_state["final"],
+                    required=True,
+                )
+                .text("\n**Requested Changes**:")
+                .section("edits", user_edits, required=True)
+                .text(
+                    dedent(
+                        """
+                        **Task**: Implement changes while preserving:
+                        - Technical accuracy
+                        - Professional tone
+                        - Output ONLY the modified markdown
+                        """
+                    )
+                    if findings
+                    else dedent(
+                        """
+                        **Task**: Implement changes while preserving:
+                        - Technical accuracy
+                        - Every [^n] footnote marker and the references section, unchanged
+                        - Professional tone
+                        - Output ONLY the modified markdown
+                        """
+                    )
+                )
+                .build()
             )
 
             response = self.editor.run(prompt)
-            blog_state["final"] = response.content.strip()  # type: ignore
+            edited = response.content.strip()  # type: ignore
+            blog_state["final"] = link_citations(edited, findings) if findings else edited
             blog_state["user_edits"] = user_edits
             return blog_state
 
@@ -0,0 +1,32 @@
+# agents/metadata_agent.py
+
+from typing import List
+from agno.agent import Agent
+from agno.models.base import Model
+from pydantic import BaseModel, Field
+
+
+class PostMetadata(BaseModel):
+    keyword: str = Field(
+        ..., description="One clear and descriptive keyword or phrase for Unsplash image search"
+    )
+    tags: List[str] = Field(
+        ..., description="Up to 4 SEO-friendly tags, each a lowercase word or hyphenated phrase"
+    )
+
+
+def create_metadata_agent(model: Model) -> Agent:
+    """Single memory-less agent returning the image keyword and tags together"""
+    return Agent(
+        model=model,
+        instructions=[
+            "Generate publishing metadata for the given blog topic.",
+            "keyword: one clear and descriptive keyword or phrase for image search.",
+            "Keep it relevant to the topic. Don't be creative or visual as this image will be searched and retrieved from unsplash",
+            "tags: clear, SEO-friendly tags relevant to the topic.",
+            "Each tag must be a single lowercase word or a hyphenated phrase (e.g., 'machine-learning').",
+            "Strictly no special characters except hyphens. No spaces allowed.",
+        ],
+        response_model=PostMetadata,
+        markdown=False,
+    )
@@ -0,0 +1,403 @@
+# agents/model_router.py
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from dataclasses import dataclass
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from agno.agent import Agent, RunResponse
+from agno.models.base import Model
+from utils.cassette import cassette
+from utils.config import config
+from utils.resilience import call_with_resilience, default_policy
+from utils.usage import active_usage, usage_ledger
+
+logger = logging.getLogger(__name__)
+
+# Outcomes older than this no longer count, so a failed provider is retried eventually
+STATS_WINDOW_SECONDS = 300
+STATS_MAX_SAMPLES = 50
+UNHEALTHY_ERROR_RATE = 0.5
+UNHEALTHY_MIN_SAMPLES = 3
+
+
+@dataclass(frozen=True)
+class ModelCandidate:
+    provider: str
+    model_id: str
+
+    @classmethod
+    def parse(cls, spec: str) -> "ModelCandidate":
+        provider, _, model_id = spec.partition(":")
+        if not model_id:
+            raise ValueError(f"Model spec must look like 'provider:model_id', got {spec!r}")
+        return cls(provider.strip().lower(), model_id.strip())
+
+    @property
+    def name(self) -> str:
+        return f"{self.provider}:{self.model_id}"
+
+    def build_model(self) -> Model:
+        if self.provider == "gemini":
+            from agno.models.google import Gemini
+
+            return Gemini(id=self.model_id, api_key=config.GEMINI_API_KEY)
+        if self.provider == "groq":
+            from agno.models.groq import Groq
+
+            return Groq(id=self.model_id, api_key=config.GROQ_API_KEY)
+        raise ValueError(f"Unsupported model provider: {self.provider}")
+
+
+def _encode_response(response: RunResponse) -> Dict[str, Any]:
+    content = response.content
+    if hasattr(content, "model_dump_json"):
+        # Structured output is replayed as JSON, which every stage parser accepts
+        content = content.model_dump_json()
+    return {"content": content, "model": response.model, "metrics": response.metrics}
+
+
+def _decode_response(recorded: Dict[str, Any]) -> RunResponse:
+    return RunResponse(
+        content=recorded["content"], model=recorded.get("model"), metrics=recorded.get("metrics")
+    )
+
+
+class CandidateStats:
+    """Rolling latency and error-rate window for one candidate"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Deque[Tuple[float, float, bool]] = deque(maxlen=STATS_MAX_SAMPLES)
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            self._samples.append((time.monotonic(), latency, ok))
+
+    def _recent(self) -> List[Tuple[float, float, bool]]:
+        cutoff = time.monotonic() - STATS_WINDOW_SECONDS
+        with self._lock:
+            return [s for s in self._samples if s[0] >= cutoff]
+
+    def _latency_percentile(self, pct: float) -> Optional[float]:
+        latencies = sorted(latency for _, latency, ok in self._recent() if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(pct * len(latencies)))]
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self._latency_percentile(0.50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self._latency_percentile(0.95)
+
+    @property
+    def error_rate(self) -> float:
+        recent = self._recent()
+        if not recent:
+            return 0.0
+        return sum(1 for _, _, ok in recent if not ok) / len(recent)
+
+    @property
+    def healthy(self) -> bool:
+        recent = self._recent()
+        return len(recent) < UNHEALTHY_MIN_SAMPLES or self.error_rate < UNHEALTHY_ERROR_RATE
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self._recent()),
+            "p50": self.p50,
+            "p95": self.p95,
+            "error_rate": round(self.error_rate, 3),
+            "healthy": self.healthy,
+        }
+
+
+class StageRunner:
+    """
+    Drop-in replacement for an agent that routes each run to the best
+    candidate model configured for its stage.
+
+    Candidates are tried in order of health, observed median latency and
+    configured position. Failures fall through to the next candidate, and
+    hedged stages start a backup request when the first one is slower
+    than its usual p95.
+    """
+
+    def __init__(self, router: "ModelRouter", stage: str, factory: Callable[[Model], Agent]):
+        self.router = router
+        self.stage = stage
+        self.factory = factory
+        # Agents keep per-run state, so concurrent runs each check out their own
+        self._idle: Dict[ModelCandidate, List[Agent]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def agent_for(self, candidate: ModelCandidate) -> Iterator[Agent]:
+        with self._lock:
+            idle = self._idle.setdefault(candidate, [])
+            agent = idle.pop() if idle else None
+        if agent is None:
+            agent = self.factory(self.router.build_model(candidate))
+        try:
+            yield agent
+        finally:
+            with self._lock:
+                self._idle[candidate].append(agent)
+
+    def run(
+        self,
+        *args,
+        timeout: Optional[float] = None,
+        cancelled: Optional[threading.Event] = None,
+        **kwargs,
+    ) -> RunResponse:
+        """
+        Run the stage on the best candidate, failing over to the others
+
+        timeout overrides MODEL_CALL_TIMEOUT for stages with their own deadline.
+        Once cancelled is set, no further candidate is started.
+        """
+        timeout = timeout or config.MODEL_CALL_TIMEOUT
+        candidates = self.router.ranked(self.stage)
+        if self.router.is_hedged(self.stage) and len(candidates) > 1:
+            return self._run_hedged(candidates, timeout, cancelled, args, kwargs)
+
+        last_error: Optional[Exception] = None
+        for candidate in candidates:
+            self._check_cancelled(cancelled)
+            try:
+                return self._attempt(candidate, timeout, args, kwargs)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Stage '{self.stage}' failed on {candidate.name}: {e}")
+        raise RuntimeError(f"All models failed for stage '{self.stage}'") from last_error
+
+    def _check_cancelled(self, cancelled: Optional[threading.Event]):
+        if cancelled is not None and cancelled.is_set():
+            raise CancelledError(f"Stage '{self.stage}' was cancelled")
+
+    def _run_agent(self, candidate: ModelCandidate, args, kwargs) -> RunResponse:
+        # Keyed without the candidate, so a replay works whichever model ranks first
+        return cassette.call(
+            cassette.key("model", self.stage, args, kwargs),
+            lambda: self._run_live(candidate, args, kwargs),
+            encode=_encode_response,
+            decode=_decode_response,
+            request={
+                "stage": self.stage,
+                "model": candidate.name,
+                "prompt": args,
+                "options": kwargs,
+            },
+        )
+
+    def _run_live(self, candidate: ModelCandidate, args, kwargs) -> RunResponse:
+        # A timed-out run keeps its agent checked out until it actually returns
+        start = time.monotonic()
+        with self.agent_for(candidate) as agent:
+            previous = getattr(agent, "run_response", None)
+            try:
+                response = agent.run(*args, **kwargs)
+            except Exception:
+                # A run that failed part-way may still have made billable model calls
+                partial = getattr(agent, "run_response", None)
+                if partial is not None and partial is not previous:
+                    self._record_usage(candidate, partial.metrics, start)
+                raise
+        # Billed once the provider answered: after a timeout, and even if the answer is unusable.
+        # Replayed calls never get here, so they are not counted as spend.
+        if response is not None:
+            self._record_usage(candidate, response.metrics, start)
+        if response is None or response.content is None:
+            raise ValueError("Empty model response")
+        return response
+
+    def _record_usage(self, candidate: ModelCandidate, metrics: Any, start: float):
+        try:
+            usage_ledger.record(self.stage, candidate.model_id, metrics, time.monotonic() - start)
+        except Exception as e:
+            logger.warning(f"Could not record usage for stage '{self.stage}': {e}")
+
+    def _attempt(self, candidate: ModelCandidate, timeout: float, args, kwargs) -> RunResponse:
+        start = time.monotonic()
+        try:
+            # One quick retry on transient errors; anything else fails over to the next candidate.
+            # A timed-out call is not retried: it is still running and will be billed anyway.
+            response = call_with_resilience(
+                f"model:{candidate.name}",
+                self._run_agent,
+                candidate,
+                args,
+                kwargs,
+                policy=default_policy(
+                    max_attempts=min(2, config.RETRY_MAX_ATTEMPTS),
+                    base_delay=1.0,
+                    timeout=timeout,
+                    retry_timeouts=False,
+                ),
+            )
+        except Exception:
+            self.router.record(self.stage, candidate, time.monotonic() - start, ok=False)
+            raise
+        self.router.record(self.stage, candidate, time.monotonic() - start, ok=True)
+        return response
+
+    def _run_hedged(
+        self,
+        candidates: List[ModelCandidate],
+        timeout: float,
+        cancelled: Optional[threading.Event],
+        args,
+        kwargs,
+    ) -> RunResponse:
+        pending: Dict[Future, ModelCandidate] = {}
+        remaining = list(candidates)
+        last_error: Optional[Exception] = None
+
+        def launch():
+            self._check_cancelled(cancelled)
+            candidate = remaining.pop(0)
+            # Run in the caller's context so the attempt is billed to the same run
+            future = self.router.executor.submit(
+                copy_context().run, self._attempt, candidate, timeout, args, kwargs
+            )
+            pending[future] = candidate
+
+        launch()
+        while pending:
+            hedge_delay = self.router.hedge_delay(self.stage, pending[next(iter(pending))])
+            done, _ = wait(
+                pending,
+                timeout=hedge_delay if remaining else None,
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                logger.info(f"Hedging stage '{self.stage}' after {hedge_delay:.1f}s")
+                launch()
+                continue
+            for future in done:
+                candidate = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"Stage '{self.stage}' failed on {candidate.name}: {e}")
+            if not pending and remaining:
+                launch()
+        raise RuntimeError(f"All models failed for stage '{self.stage}'") from last_error
+
+
+class ModelRouter:
+    """Per-stage model candidates with shared latency and error statistics"""
+
+    def __init__(self, routes: Dict[str, List[str]], hedged_stages: set, hedge_delay: float):
+        self.routes = {
+            stage: [ModelCandidate.parse(spec) for spec in specs]
+            for stage, specs in routes.items()
+        }
+        self.hedged_stages = hedged_stages
+        self.default_hedge_delay = hedge_delay
+        self.stats: Dict[ModelCandidate, CandidateStats] = {}
+        # One SDK client per candidate, so every agent reuses the same connection pool
+        self._clients: Dict[ModelCandidate, Any] = {}
+        self._clients_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="model-hedge")
+
+    def runner(self, stage: str, factory: Callable[[Model], Agent]) -> StageRunner:
+        if stage not in self.routes:
+            raise ValueError(f"No model route configured for stage '{stage}'")
+        return StageRunner(self, stage, factory)
+
+    @property
+    def candidates(self) -> List[ModelCandidate]:
+        """Every distinct candidate across all stages, in configured order"""
+        return list(dict.fromkeys(c for candidates in self.routes.values() for c in candidates))
+
+    def client_for(self, candidate: ModelCandidate, model: Model) -> Any:
+        with self._clients_lock:
+            if candidate not in self._clients:
+                self._clients[candidate] = model.get_client()
+            return self._clients[candidate]
+
+    def build_model(self, candidate: ModelCandidate) -> Model:
+        model = candidate.build_model()
+        model.client = self.client_for(candidate, model)
+        return model
+
+    def preconnect(self, candidate: ModelCandidate):
+        """Open the candidate's pooled connection with a free model listing, not a generation"""
+        client = self.client_for(candidate, candidate.build_model())
+        if candidate.provider == "gemini":
+            client.models.list(config={"page_size": 1})
+        else:
+            client.models.list()
+
+    def stats_for(self, candidate: ModelCandidate) -> CandidateStats:
+        with self._lock:
+            return self.stats.setdefault(candidate, CandidateStats())
+
+    def record(self, stage: str, candidate: ModelCandidate, latency: float, ok: bool):
+        self.stats_for(candidate).record(latency, ok)
+        logger.debug(
+            f"Stage '{stage}' on {candidate.name}: {latency:.2f}s ({'ok' if ok else 'error'})"
+        )
+
+    def ranked(self, stage: str) -> List[ModelCandidate]:
+        """
+        Healthy candidates first, then by observed p50, then by configured order
+
+        Runs of users low on budget rank by expected cost right after health.
+        """
+        economy = self.economy()
+
+        def sort_key(item):
+            position, candidate = item
+            stats = self.stats_for(candidate)
+            p50 = stats.p50
+            cost = usage_ledger.expected_cost(stage, candidate.model_id) if economy else 0.0
+            return (not stats.healthy, cost, p50 if p50 is not None else float("inf"), position)
+
+        ranked = sorted(enumerate(self.routes[stage]), key=sort_key)
+        return [candidate for _, candidate in ranked]
+
+    def token_budget(self, stage: str) -> int:
+        """Prompt budget that fits every candidate, so failover never overflows"""
+        budgets = config.PROMPT_TOKEN_BUDGETS
+        return min(
+            budgets.get(candidate.model_id, config.DEFAULT_PROMPT_TOKEN_BUDGET)
+            for candidate in self.routes[stage]
+        )
+
+    def economy(self) -> bool:
+        scope = active_usage.get()
+        return scope is not None and scope.economy
+
+    def is_hedged(self, stage: str) -> bool:
+        # A hedge can bill both requests, which a user low on budget cannot afford
+        return stage in self.hedged_stages and not self.economy()
+
+    def hedge_delay(self, stage: str, candidate: ModelCandidate) -> float:
+        p95 = self.stats_for(candidate).p95
+        return p95 if p95 is not None else self.default_hedge_delay
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current statistics for every candidate, keyed by stage"""
+        return {
+            stage: {c.name: self.stats_for(c).snapshot() for c in candidates}
+            for stage, candidates in self.routes.items()
+        }
+
+
+model_router = ModelRouter(
+    routes=config.MODEL_ROUTES,
+    hedged_stages=config.HEDGED_STAGES,
+    hedge_delay=config.MODEL_HEDGE_DELAY,
+)
@@ -1,43 +1,71 @@
 # agents/research_merger.py
 from agno.agent import Agent
-from agno.models.groq import Groq
-from typing import Dict, List, Any
+from agno.models.base import Model
+from typing import List, Any, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
 import logging
-import json
 import re
 from utils.config import config
+from utils.singleflight import single_flight, make_flight_key
+from utils.prompt_budget import PromptBuilder, chunk_text
+from textwrap import dedent
 from .web_research_agent import WebResearchAgent
+from .model_router import model_router
+from .schemas import ResearchSchema, coerce_research, create_repair_agent, repair_findings
+from .research_models import MISSING_SUMMARY, Finding, ResearchResult
 from difflib import SequenceMatcher
 
 logger = logging.getLogger(__name__)
 
+# Attempts per notes chunk when the model's output cannot be parsed
+NOTES_PARSE_ATTEMPTS = 2
+
+SUMMARY_TASK = dedent(
+    """
+    **Task**:
+    Create a comprehensive research summary that:
+    1. Provides an overview of the topic
+    2. Highlights key insights from all sources
+    3. Identifies patterns and relationships between findings
+    4. Concludes with significant implications
+    5. Maintains a neutral, professional tone
+    6. Is approximately 300-500 words
+    7. DOES NOT include any thinking process or internal tags
+    """
+)
+
 
 class ResearchAnalysis:
     def __init__(self):
         self.research_agent = WebResearchAgent()
-        self.parser_agent = self._create_parser_agent()
-        self.summary_agent = self._create_summary_agent()
+        self.parser_agent = model_router.runner("parse", self._create_parser_agent)
+        self.summary_agent = model_router.runner("summary", self._create_summary_agent)
+        self.repair_agent = model_router.runner("parse", create_repair_agent)
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="summary")
+        self.parse_executor = ThreadPoolExecutor(
+            max_workers=config.NOTES_PARSE_CONCURRENCY, thread_name_prefix="notes-parse"
+        )
         logger.info("Agno-based research merger initialized")
 
-    def _create_parser_agent(self) -> Agent:
+    def _create_parser_agent(self, model: Model) -> Agent:
         """Create agent for parsing user research"""
         return Agent(
-            model=Groq(id="meta-llama/llama-4-scout-17b-16e-instruct", api_key=config.GROQ_API_KEY),
+            model=model,
             instructions=[
                 "You are a research analysis specialist.",
-                "Convert unstructured research notes into structured JSON format.",
+                "Convert unstructured research notes into structured findings.",
                 "Extract key facts with their supporting evidence and sources.",
-                "For each finding, include: fact, supporting_evidence, source_url, source_credibility",
                 "Use 'User Provided' for missing URLs/credibility",
-                "Output ONLY valid JSON with the specified structure",
             ],
-            markdown=True,
+            response_model=ResearchSchema,
+            use_json_mode=True,
         )
 
-    def _create_summary_agent(self) -> Agent:
+    def _create_summary_agent(self, model: Model) -> Agent:
         """Create agent for generating summaries"""
         return Agent(
-            model=Groq(id="meta-llama/llama-4-scout-17b-16e-instruct", api_key=config.GROQ_API_KEY),
+            model=model,
             instructions=[
                 "You are a research synthesis expert.",
                 "Combine findings from multiple sources into a comprehensive summary.",
@@ -49,103 +77,199 @@ class ResearchAnalysis:
             ],
         )
 
-    def analyse_research(self, topic: str, user_research: str) -> Dict[str, Any]:
+    def analyse_research(
+        self, topic: str, user_research: str, depth: Optional[str] = None
+    ) -> ResearchResult:
         """
         Merge user-provided research with automated research using Agno agents
 
         Args:
             topic: Research topic
             user_research: User's research text (unstructured)
+            depth: Web research depth preset, e.g. "fast" or "thorough"
 
         Returns:
             Combined research in structured format
         """
+        combined = self.gather_research(topic, user_research, depth)
+        if combined.usable:
+            self.attach_summary(combined, self.start_summary(combined))
+        return combined
+
+    def gather_research(
+        self, topic: str, user_research: str, depth: Optional[str] = None
+    ) -> ResearchResult:
+        """Collect and merge findings without generating the summary"""
         try:
-            user_structured = self._parse_user_research(topic, user_research)
+            if user_research.strip():
+                user_structured = self._parse_user_research(topic, user_research)
+            else:
+                user_structured = ResearchResult(topic=topic)
 
-            auto_research = self.research_agent.research_topic(topic)
+            auto_research = self.research_agent.research_topic(topic, depth)
 
-            combined = self._combine_research(user_structured, auto_research)
+            return self._combine_research(user_structured, auto_research)
+        except Exception as e:
+            logger.exception(f"Research merge failed: {str(e)}")
+            return ResearchResult.failed(topic, f"Research merge failed: {str(e)}")
 
-            combined["summary"] = self._generate_summary(combined)
+    def start_summary(self, research_data: ResearchResult) -> Future:
+        """Generate the summary in the background so outlining can start right away"""
+        # Run in the caller's context so the summary is billed to the same run
+        return self.executor.submit(copy_context().run, self.summarize, research_data)
 
-            return combined
+    def attach_summary(self, research_data: ResearchResult, summary: Future) -> ResearchResult:
+        """Store the finished summary and drop the bookkeeping used to build it"""
+        try:
+            research_data.summary = summary.result()
         except Exception as e:
-            logger.exception(f"Research merge failed: {str(e)}")
-            return {"error": f"Research merge failed: {str(e)}", "topic": topic}
-
-    def _parse_user_research(self, topic: str, user_research: str) -> Dict[str, Any]:
-        """Convert unstructured user research to structured format using Agno"""
-        prompt = f"""
-        **Topic**: {topic}
-        
-        **User Research**:
-        {user_research}
-        
-        **Required Output Structure**:
-        {{
-            "topic": "Research topic",
-            "key_findings": [
-                {{
-                    "fact": "Specific fact or claim",
-                    "supporting_evidence": "Brief supporting details",
-                    "source_url": "Source URL or 'User Provided'",
-                    "source_credibility": "High/Medium/Low/User Provided"
-                }}
-            ]
-        }}
+            logger.exception(f"Summary generation failed: {str(e)}")
+            research_data.summary = research_data.auto_summary or MISSING_SUMMARY
+        research_data.auto_summary = None
+        research_data.user_findings = []
+        return research_data
+
+    def summarize(self, research_data: ResearchResult) -> str:
+        """
+        Reuse the web agent's summary when possible
+
+        Without user findings the web summary is used as-is. Otherwise only
+        the user-added findings are folded into it; a full summary is
+        generated only when the web agent did not provide one.
+        """
+        auto_summary = research_data.auto_summary
+        user_findings = research_data.user_findings
+
+        if not auto_summary:
+            return self._generate_summary(research_data)
+        if not user_findings:
+            logger.info("Reusing web research summary")
+            return auto_summary
+        return self._extend_summary(research_data.topic, auto_summary, user_findings)
+
+    def _parse_user_research(self, topic: str, user_research: str) -> ResearchResult:
+        """
+        Convert unstructured user research to structured format using Agno
+
+        Long notes are split at heading and paragraph boundaries and the
+        chunks are parsed concurrently, then merged through deduplication.
+        Parts that still fail are named in the result's error, next to the
+        findings of the parts that parsed.
         """
+        chunk_tokens = min(config.NOTES_CHUNK_TOKENS, model_router.token_budget("parse") // 2)
+        chunks = chunk_text(user_research, chunk_tokens)
+        if len(chunks) <= 1:
+            result = self._parse_notes_chunk(topic, user_research, 1, 1)
+            if result.error:
+                result.error = f"Could not parse the research notes: {result.error}"
+            return result
+
+        logger.info(f"Parsing research notes in {len(chunks)} chunks")
+        # One context copy per chunk: a context can only be entered by one thread at a time
+        parsed = list(
+            self.parse_executor.map(
+                lambda item: item[0].run(self._parse_notes_chunk, topic, item[2], item[1], len(chunks)),
+                [(copy_context(), part, chunk) for part, chunk in enumerate(chunks, start=1)],
+            )
+        )
+        findings = [finding for result in parsed for finding in result.key_findings]
+        merged = ResearchResult(topic=topic, key_findings=self._deduplicate_findings(findings))
+        failed = [result.error for result in parsed if result.error]
+        if failed:
+            merged.error = (
+                f"Could not parse {len(failed)} of {len(chunks)} parts of the research notes: "
+                + "; ".join(failed)
+            )
+            logger.warning(merged.error)
+        return merged
+
+    def _parse_notes_chunk(
+        self, topic: str, notes: str, part: int, total: int
+    ) -> ResearchResult:
+        heading = "**User Research**:"
+        if total > 1:
+            heading = f"**User Research** (part {part} of {total}, extract findings from this part only):"
+        prompt = (
+            PromptBuilder(model_router.token_budget("parse"), f"parse-{part}")
+            .text(f"**Topic**: {topic}\n\n{heading}")
+            .section("notes", notes, required=True)
+            .build()
+        )
+
+        error = ""
+        for attempt in range(1, NOTES_PARSE_ATTEMPTS + 1):
+            try:
+                response = self.parser_agent.run(prompt)
+                return self._parse_research_output(response.content, topic)
+            except ValueError as e:
+                # Unparseable output is often a one-off, so the part is asked for again
+                error = str(e)
+                logger.warning(f"Notes part {part}/{total}, attempt {attempt}: {error}")
+            except Exception as e:
+                # Every model already failed for this part
+                error = str(e)
+                logger.warning(f"Notes part {part}/{total} failed: {error}")
+                break
+        return ResearchResult.failed(
+            topic, f"part {part}: {error}" if total > 1 else error, raw_output=notes[:500]
+        )
 
-        response = self.parser_agent.run(prompt)
-        return self._parse_research_output(response.content)  # type: ignore
+    def _parse_research_output(self, output: Any, topic: str) -> ResearchResult:
+        """
+        Validate structured research, repairing only the findings that fail
 
-    def _parse_research_output(self, output: str) -> Dict[str, Any]:
-        """Parse structured research from agent output"""
+        Raises:
+            ValueError: If the output has no recognizable research structure
+        """
         try:
-            # Extract JSON from markdown
-            json_match = re.search(r"```json\n(.*?)\n```", output, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-            return json.loads(output)
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse research output: {output[:200]}...")
-            return {"topic": "Unparsed Research", "key_findings": []}
-
-    def _combine_research(self, user_data: Dict, auto_data: Dict) -> Dict[str, Any]:
+            research_data, broken = coerce_research(output, topic)
+        except ValueError as e:
+            raise ValueError(f"Unparseable research output ({e}): {str(output)[:200]}") from e
+        if broken:
+            logger.warning(f"Repairing {len(broken)} invalid user findings")
+            research_data.add_findings(repair_findings(self.repair_agent, broken))
+        return research_data
+
+    def _combine_research(
+        self, user_data: ResearchResult, auto_data: ResearchResult
+    ) -> ResearchResult:
         """Combine and deduplicate research findings"""
         # Handle errors in automated research
-        if "error" in auto_data:
+        if auto_data.error:
             logger.warning("Using only user research due to automated research error")
             return user_data
 
-        # Combine topic names
-        topic = auto_data.get("topic", user_data.get("topic", "Unknown Topic"))
-
         # Combine findings
-        combined_findings = user_data.get("key_findings", []) + auto_data.get(
-            "key_findings", []
-        )
+        combined_findings = user_data.key_findings + auto_data.key_findings
 
         # Deduplicate based on fact similarity
         unique_findings = self._deduplicate_findings(combined_findings)
 
-        return {
-            "topic": topic,
-            "key_findings": unique_findings,
-            "sources": {
-                "user": len(user_data.get("key_findings", [])),
-                "auto": len(auto_data.get("key_findings", [])),
+        # User findings come first, so any that survived deduplication are new
+        user_ids = {id(f) for f in user_data.key_findings}
+        auto_summary = auto_data.summary
+
+        return ResearchResult(
+            topic=auto_data.topic or user_data.topic or "Unknown Topic",
+            key_findings=unique_findings,
+            sources={
+                "user": len(user_data.key_findings),
+                "auto": len(auto_data.key_findings),
             },
-        }
+            # A partial failure parsing the notes stays visible on the merged result
+            error=user_data.error,
+            auto_summary=auto_summary if auto_summary != MISSING_SUMMARY else None,
+            user_findings=[f for f in unique_findings if id(f) in user_ids],
+        )
 
-    def _deduplicate_findings(self, findings: List[Dict]) -> List[Dict]:
+    def _deduplicate_findings(self, findings: List[Finding]) -> List[Finding]:
         """Remove duplicate findings using text similarity"""
         unique_findings = []
         seen_facts = set()
 
         for finding in findings:
             # Normalize fact text
-            fact_text = finding["fact"].lower().strip()
+            fact_text = finding.fact.lower().strip()
 
             # Check for duplicates
             is_duplicate = False
@@ -164,32 +288,50 @@ class ResearchAnalysis:
         """Calculate text similarity ratio"""
         return SequenceMatcher(None, a, b).ratio()
 
-    def _generate_summary(self, research_data: Dict) -> str:
+    def _generate_summary(self, research_data: ResearchResult) -> str:
         """Generate unified research summary using Agno agent"""
-        findings_str = "\n".join(
-            f"- {finding['fact']} (Source: {finding['source_url']})"
-            for finding in research_data["key_findings"]
+        findings = [finding.source_line for finding in research_data.key_findings]
+
+        prompt = (
+            PromptBuilder(model_router.token_budget("summary"), "summary")
+            .text(f"**Topic**: {research_data.topic}\n\n**Key Findings**:")
+            .section("findings", findings)
+            .text(SUMMARY_TASK)
+            .build()
         )
 
-        prompt = f"""
-        **Topic**: {research_data["topic"]}
-        
-        **Key Findings**:
-        {findings_str}
-        
-        **Task**:
-        Create a comprehensive research summary that:
-        1. Provides an overview of the topic
-        2. Highlights key insights from all sources
-        3. Identifies patterns and relationships between findings
-        4. Concludes with significant implications
-        5. Maintains a neutral, professional tone
-        6. Is approximately 300-500 words
-        7. DOES NOT include any thinking process or internal tags
-        """
+        return single_flight.do(
+            "summary",
+            make_flight_key("summary", prompt),
+            lambda: self.summary_agent.run(prompt).content,
+        )
 
-        response = self.summary_agent.run(prompt)
-        return response.content  # type: ignore
+    def _extend_summary(self, topic: str, summary: str, new_findings: List[Finding]) -> str:
+        """Fold user-added findings into an existing summary"""
+        prompt = (
+            PromptBuilder(model_router.token_budget("summary"), "summary-extend")
+            .text(f"**Topic**: {topic}\n\n**Existing Summary**:")
+            .section("summary", summary, required=True)
+            .text("\n**Additional Findings**:")
+            .section("findings", [finding.source_line for finding in new_findings])
+            .text(
+                dedent(
+                    """
+                    **Task**:
+                    Update the existing summary so it also covers the additional findings.
+                    Keep its structure and tone, stay within 300-500 words, and output only
+                    the updated summary without any thinking process or internal tags.
+                    """
+                )
+            )
+            .build()
+        )
+
+        return single_flight.do(
+            "summary",
+            make_flight_key("summary", prompt),
+            lambda: self.summary_agent.run(prompt).content,
+        )
 
     def _clean_summary(self, summary: str) -> str:
         """Remove any internal thinking tags or markers from summary"""
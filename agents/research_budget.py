@@ -0,0 +1,140 @@
+# agents/research_budget.py
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from agno.exceptions import StopAgentRun
+from duckduckgo_search import DDGS
+from utils.cassette import cassette
+from utils.config import config
+
+from .research_models import Credibility, Finding
+
+logger = logging.getLogger(__name__)
+
+BUDGET_EXHAUSTED = (
+    "Research budget exhausted. Do not search again; "
+    "answer now using only the results gathered so far."
+)
+# Time allowed past the search budget for the model to write its answer
+ANSWER_GRACE_SECONDS = 20
+
+
+@dataclass(frozen=True)
+class ResearchBudget:
+    max_tool_calls: int
+    max_seconds: float
+    min_findings: int
+
+    @classmethod
+    def for_depth(cls, depth: Optional[str] = None) -> "ResearchBudget":
+        budgets = config.RESEARCH_BUDGETS
+        depth = depth or config.RESEARCH_DEPTH
+        if depth not in budgets:
+            raise ValueError(f"Unknown research depth '{depth}', expected one of {list(budgets)}")
+        return cls(**budgets[depth])
+
+    @property
+    def deadline_seconds(self) -> float:
+        """Wall-clock limit for the whole research run, answer included"""
+        return self.max_seconds + ANSWER_GRACE_SECONDS
+
+
+class SearchSession:
+    """
+    Tool calls and raw search results of one budgeted research run
+
+    A cancelled session refuses every further search, and the search tool
+    aborts the agent run that asked for it.
+    """
+
+    def __init__(self, budget: ResearchBudget):
+        self.budget = budget
+        self.started = time.monotonic()
+        self.tool_calls = 0
+        self.results: List[Dict[str, str]] = []
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def cancel(self):
+        """Stop the run: the caller gave up waiting for it"""
+        self.cancelled.set()
+
+    def try_acquire_call(self) -> bool:
+        with self._lock:
+            if (
+                self.cancelled.is_set()
+                or self.tool_calls >= self.budget.max_tool_calls
+                or self.elapsed >= self.budget.max_seconds
+            ):
+                return False
+            self.tool_calls += 1
+            return True
+
+    def record(self, results: List[Dict[str, str]]):
+        with self._lock:
+            self.results.extend(results)
+
+    def fallback_findings(self, exclude_urls: set, limit: int) -> List[Finding]:
+        """Findings built straight from search results, for when the model ran out of time"""
+        findings: List[Finding] = []
+        with self._lock:
+            results = list(self.results)
+        for result in results:
+            url = result.get("href", "")
+            if not url or url in exclude_urls or not result.get("title"):
+                continue
+            exclude_urls.add(url)
+            findings.append(
+                Finding.create(
+                    result["title"],
+                    result.get("body") or "No evidence provided",
+                    url,
+                    Credibility.MEDIUM,
+                )
+            )
+            if len(findings) >= limit:
+                break
+        return findings
+
+
+active_search_session: ContextVar[Optional[SearchSession]] = ContextVar(
+    "active_search_session", default=None
+)
+
+
+def duckduckgo_search(query: str, max_results: int = 5) -> str:
+    """
+    Search the web with DuckDuckGo.
+
+    Args:
+        query: The search query.
+        max_results: Number of results to return.
+
+    Returns:
+        JSON list of results with title, href and body.
+    """
+    session = active_search_session.get()
+    if session is not None and session.cancelled.is_set():
+        logger.info("Research run was cancelled, aborting it")
+        raise StopAgentRun("Research run was cancelled")
+    if session is not None and not session.try_acquire_call():
+        logger.info("Research budget exhausted, refusing further searches")
+        return BUDGET_EXHAUSTED
+
+    results = cassette.call(
+        cassette.key("search", query, max_results),
+        lambda: DDGS().text(keywords=query, max_results=max_results) or [],
+        request={"query": query, "max_results": max_results},
+    )
+    if session is not None:
+        session.record(results)
+    return json.dumps(results)
@@ -0,0 +1,147 @@
+# agents/research_models.py
+import json
+import sys
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+MISSING_SUMMARY = "Research summary not available"
+
+
+class Credibility(str, Enum):
+    HIGH = "High"
+    MEDIUM = "Medium"
+    LOW = "Low"
+    USER = "User Provided"
+
+    @classmethod
+    def parse(cls, value: Any) -> "Credibility":
+        if isinstance(value, cls):
+            return value
+        return _CREDIBILITY_LOOKUP.get(str(value).strip().lower(), cls.MEDIUM)
+
+
+_CREDIBILITY_LOOKUP = {member.value.lower(): member for member in Credibility}
+
+
+class _MappingAccess:
+    """Read-only dict-style access so templates written against dicts keep working"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        value = getattr(self, key)
+        return value.value if isinstance(value, Enum) else value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__dataclass_fields__ and getattr(self, key) is not None  # type: ignore
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+
+@dataclass(frozen=True, slots=True)
+class Finding(_MappingAccess):
+    fact: str
+    supporting_evidence: str = "No evidence provided"
+    source_url: str = "Unknown source"
+    source_credibility: Credibility = Credibility.MEDIUM
+    # Text from the fetched source page that grounds the fact
+    excerpt: Optional[str] = field(default=None, repr=False)
+    _prompt_line: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _source_line: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def create(
+        cls,
+        fact: str,
+        supporting_evidence: str = "No evidence provided",
+        source_url: str = "Unknown source",
+        source_credibility: Any = Credibility.MEDIUM,
+    ) -> "Finding":
+        """Build a finding from already validated fields, interning the repetitive ones"""
+        return cls(
+            fact=fact.strip(),
+            supporting_evidence=supporting_evidence,
+            source_url=sys.intern(source_url),
+            source_credibility=Credibility.parse(source_credibility),
+        )
+
+    @property
+    def prompt_line(self) -> str:
+        """Bullet used when listing findings in prompts"""
+        if self._prompt_line is None:
+            object.__setattr__(self, "_prompt_line", f"- {self.fact}")
+        return self._prompt_line  # type: ignore
+
+    @property
+    def source_line(self) -> str:
+        """Bullet with the source appended, used for summaries"""
+        if self._source_line is None:
+            object.__setattr__(self, "_source_line", f"- {self.fact} (Source: {self.source_url})")
+        return self._source_line  # type: ignore
+
+    def with_excerpt(self, excerpt: str) -> "Finding":
+        return replace(self, excerpt=excerpt)
+
+    def to_dict(self) -> Dict[str, str]:
+        data = {
+            "fact": self.fact,
+            "supporting_evidence": self.supporting_evidence,
+            "source_url": self.source_url,
+            "source_credibility": self.source_credibility.value,
+        }
+        if self.excerpt:
+            data["excerpt"] = self.excerpt
+        return data
+
+
+@dataclass(slots=True)
+class ResearchResult(_MappingAccess):
+    topic: str
+    key_findings: List[Finding] = field(default_factory=list)
+    summary: Optional[str] = None
+    sources: Optional[Dict[str, int]] = None
+    error: Optional[str] = None
+    raw_output: Optional[str] = None
+    # Bookkeeping for incremental summaries; never serialized
+    auto_summary: Optional[str] = field(default=None, repr=False)
+    user_findings: List[Finding] = field(default_factory=list, repr=False)
+    _json: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any):
+        # Any change to the result invalidates the cached serialized form
+        if name != "_json":
+            object.__setattr__(self, "_json", None)
+        object.__setattr__(self, name, value)
+
+    @classmethod
+    def failed(cls, topic: str, error: str, raw_output: Optional[str] = None) -> "ResearchResult":
+        return cls(topic=topic, error=error, raw_output=raw_output)
+
+    @property
+    def usable(self) -> bool:
+        """False only when research failed outright; a partial failure keeps its findings and error"""
+        return not self.error or bool(self.key_findings)
+
+    def add_findings(self, findings: List[Finding]):
+        self.key_findings = self.key_findings + list(findings)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "topic": self.topic,
+            "key_findings": [finding.to_dict() for finding in self.key_findings],
+        }
+        for name in ("summary", "sources", "error", "raw_output"):
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        return data
+
+    def to_json(self) -> str:
+        """Indented JSON export, serialized once per version of the result"""
+        if self._json is None:
+            object.__setattr__(self, "_json", json.dumps(self.to_dict(), indent=2))
+        return self._json  # type: ignore
@@ -0,0 +1,170 @@
+# agents/schemas.py
+import json
+import logging
+from typing import Any, Dict, List, Literal, Tuple
+
+from agno.agent import Agent
+from agno.models.base import Model
+from pydantic import AliasChoices, BaseModel, Field, ValidationError, field_validator
+
+from .research_models import MISSING_SUMMARY, Finding, ResearchResult
+
+logger = logging.getLogger(__name__)
+
+
+class FindingSchema(BaseModel):
+    """One research finding as exchanged with the models"""
+
+    fact: str = Field(
+        ..., min_length=1, validation_alias=AliasChoices("fact", "claim"),
+        description="Specific fact or claim",
+    )
+    supporting_evidence: str = Field(
+        "No evidence provided", validation_alias=AliasChoices("supporting_evidence", "evidence"),
+        description="Brief supporting details",
+    )
+    source_url: str = Field(
+        "Unknown source", validation_alias=AliasChoices("source_url", "url"),
+        description="Full source URL, or 'User Provided'",
+    )
+    source_credibility: Literal["High", "Medium", "Low", "User Provided"] = Field(
+        "Medium", validation_alias=AliasChoices("source_credibility", "credibility"),
+    )
+
+    @field_validator("source_credibility", mode="before")
+    @classmethod
+    def _normalize_credibility(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            value = value.strip()
+            return "User Provided" if value.lower() == "user provided" else value.capitalize()
+        return value
+
+
+class ResearchSchema(BaseModel):
+    """Structured research output shared by the web research and parser agents"""
+
+    topic: str = Field(..., description="Research topic")
+    key_findings: List[FindingSchema] = Field(
+        default_factory=list, description="Findings listed directly, without grouping"
+    )
+    summary: str = Field(MISSING_SUMMARY, description="Brief research summary")
+
+    def to_result(self) -> ResearchResult:
+        return ResearchResult(
+            topic=self.topic,
+            key_findings=[_to_finding(finding) for finding in self.key_findings],
+            summary=self.summary,
+        )
+
+
+class FindingRepairSchema(BaseModel):
+    key_findings: List[FindingSchema]
+
+
+def _to_finding(schema: FindingSchema) -> Finding:
+    return Finding.create(
+        schema.fact,
+        schema.supporting_evidence,
+        schema.source_url,
+        schema.source_credibility,
+    )
+
+
+def _load_json_object(text: str) -> Dict[str, Any]:
+    """Decode the first JSON object in a response that did not match the schema"""
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("No JSON object in response")
+    data, _ = json.JSONDecoder().raw_decode(text[start:])
+    if not isinstance(data, dict):
+        raise ValueError("Response JSON is not an object")
+    return data
+
+
+def _flatten_findings(items: List[Any]) -> List[Any]:
+    """Expand findings grouped by category into a flat list"""
+    flat = []
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get("sources"), list):
+            flat.extend(item["sources"])
+        else:
+            flat.append(item)
+    return flat
+
+
+def validate_findings(items: List[Any]) -> Tuple[List[Finding], List[Tuple[Any, str]]]:
+    """
+    Validate findings one by one
+
+    Returns:
+        Valid findings, and (raw finding, error) pairs for the rest
+    """
+    valid, broken = [], []
+    for item in _flatten_findings(items):
+        try:
+            valid.append(_to_finding(FindingSchema.model_validate(item)))
+        except ValidationError as e:
+            broken.append((item, str(e)))
+    return valid, broken
+
+
+def coerce_research(content: Any, topic: str) -> Tuple[ResearchResult, List[Tuple[Any, str]]]:
+    """
+    Turn an agent response into research data plus the findings that failed validation
+
+    Raises:
+        ValueError: if the response holds no usable research object at all
+    """
+    if isinstance(content, ResearchSchema):
+        return content.to_result(), []
+
+    data = _load_json_object(str(content))
+    findings = data.get("key_findings")
+    if not isinstance(findings, list):
+        raise ValueError("key_findings should be a list")
+
+    valid, broken = validate_findings(findings)
+    research = ResearchResult(
+        topic=data.get("topic") or topic,
+        key_findings=valid,
+        summary=data.get("summary") or MISSING_SUMMARY,
+    )
+    return research, broken
+
+
+def create_repair_agent(model: Model) -> Agent:
+    """Agent that fixes individual findings that failed schema validation"""
+    return Agent(
+        model=model,
+        instructions=[
+            "You repair research findings that failed schema validation.",
+            "Fix each finding using only the information it already contains.",
+            "Drop a finding only if it has no usable fact.",
+        ],
+        response_model=FindingRepairSchema,
+        use_json_mode=True,
+    )
+
+
+def repair_findings(repair_agent: Any, broken: List[Tuple[Any, str]]) -> List[Finding]:
+    """Re-validate broken findings with one targeted model call"""
+    if not broken:
+        return []
+
+    payload = "\n".join(
+        f"- finding: {json.dumps(item, default=str)}\n  error: {error}" for item, error in broken
+    )
+    try:
+        response = repair_agent.run(f"**Broken findings**:\n{payload}")
+        content = response.content
+        if isinstance(content, FindingRepairSchema):
+            return [_to_finding(finding) for finding in content.key_findings]
+        repaired, still_broken = validate_findings(
+            _load_json_object(str(content)).get("key_findings", [])
+        )
+        if still_broken:
+            logger.warning(f"Dropped {len(still_broken)} findings that could not be repaired")
+        return repaired
+    except Exception as e:
+        logger.warning(f"Finding repair failed, dropping {len(broken)} findings: {e}")
+        return []
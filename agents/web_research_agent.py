@@ -1,11 +1,20 @@
 # agents/research_agent.py
 from agno.agent import Agent, RunResponse
-from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.models.google import Gemini
-from typing import Dict, Any
-from utils.config import config
-import json
-import re
+from agno.models.base import Model
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from contextvars import copy_context
+from dataclasses import asdict
+from typing import Any, Optional
+from .model_router import model_router
+from .schemas import ResearchSchema, coerce_research, create_repair_agent, repair_findings
+from .research_models import ResearchResult
+from .research_budget import (
+    ResearchBudget,
+    SearchSession,
+    active_search_session,
+    duckduckgo_search,
+)
+from utils.singleflight import single_flight, make_flight_key
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,142 +22,129 @@ logger = logging.getLogger(__name__)
 
 class WebResearchAgent:
     def __init__(self):
-        self.agent = self._create_research_agent()
+        self.agent = model_router.runner("research", self._create_research_agent)
+        self.repair_agent = model_router.runner("parse", create_repair_agent)
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="web-research")
         logger.info("Research agent initialized")
 
-    def _create_research_agent(self) -> Agent:
+    def _create_research_agent(self, model: Model) -> Agent:
         """Create and configure the research agent with DuckDuckGo tool"""
         try:
             return Agent(
-                model=Gemini(id="gemini-2.0-flash", api_key=config.GEMINI_API_KEY),
-                tools=[DuckDuckGoTools()],
+                model=model,
+                tools=[duckduckgo_search],
                 instructions=[
                     "You are a professional research assistant specialized in technical topics.",
                     "Use the duckduckgo_search tool to research the topic",
+                    "Your number of searches is limited; when the tool reports the budget is exhausted, stop searching and answer.",
                     "Analyze search results to identify key information and credible sources.",
-                    "For each key finding, provide:",
-                    "1. A clear fact/claim (string)",
-                    "2. Brief supporting evidence (string)",
-                    "3. The source URL (string)",
-                    "4. Source credibility rating: High/Medium/Low (string)",
-                    "Output in valid JSON format with EXACTLY this structure:",
-                    """{
-                "topic": "Research topic",
-                "key_findings": [
-                    {
-                        "fact": "Specific fact or claim",
-                        "supporting_evidence": "Supporting details",
-                        "source_url": "Full source URL",
-                        "source_credibility": "High/Medium/Low"
-                    }
-                ],
-                "summary": "Brief research summary"
-            }""",
+                    "For each key finding, provide a clear fact, brief supporting evidence,",
+                    "the source URL and a source credibility rating (High/Medium/Low).",
                     "DO NOT include categories or grouped findings",
                     "Each finding should have its own source information",
                     "List findings directly under 'key_findings' without nesting",
                 ],
-                markdown=True,
+                response_model=ResearchSchema,
+                use_json_mode=True,
                 show_tool_calls=True,
             )
         except Exception as e:
             logger.error(f"Failed to create research agent: {str(e)}")
             raise
 
-    def research_topic(self, topic: str) -> Dict[str, Any]:
-        """Conduct comprehensive research on a given topic"""
-        logger.info(f"Starting research on: {topic}")
+    def research_topic(self, topic: str, depth: Optional[str] = None) -> ResearchResult:
+        """Conduct research on a given topic within the budget for the requested depth"""
+        budget = ResearchBudget.for_depth(depth)
+        return single_flight.do(
+            "research",
+            make_flight_key("research", topic, asdict(budget)),
+            self._research_topic,
+            topic,
+            budget,
+        )
+
+    def _research_topic(self, topic: str, budget: ResearchBudget) -> ResearchResult:
+        logger.info(f"Starting research on: {topic} with budget {budget}")
+        session = SearchSession(budget)
         try:
-            research_response: RunResponse = self.agent.run(
-                f"Research the topic: {topic} and provide findings in JSON format"
+            research_response: RunResponse = self._run_within_budget(topic, session)
+            research_data = self._parse_research_output(research_response.content, topic)
+        except TimeoutError:
+            logger.warning(
+                f"Research exceeded {budget.max_seconds}s budget, "
+                f"using {len(session.results)} gathered search results"
             )
-
-            research_data = self._parse_research_output(research_response.content.strip())  # type: ignore
-
-            if "error" in research_data:
-                logger.error(f"Research failed: {research_data['error']}")
-            else:
-                logger.info(
-                    f"Research completed with {len(research_data.get('key_findings', []))} findings"
-                )
-
-            return research_data
+            research_data = ResearchResult(topic=topic)
         except Exception as e:
             logger.exception(f"Research failed: {str(e)}")
-            return {"error": f"Research process failed: {str(e)}", "topic": topic}
-
-    def _parse_research_output(self, output: str) -> Dict[str, Any]:
-        try:
-            clean_output = re.sub(r"```json|```", "", output).strip()
-            research_data = json.loads(clean_output)
-
-            if "key_findings" in research_data and research_data["key_findings"]:
-                first_item = research_data["key_findings"][0]
-                if "sources" in first_item and isinstance(first_item["sources"], list):
-                    transformed_findings = []
-                    for category in research_data["key_findings"]:
-                        for source in category.get("sources", []):
-                            transformed_findings.append(
-                                {
-                                    "fact": source.get("claim", ""),
-                                    "supporting_evidence": source.get("evidence", ""),
-                                    "source_url": source.get("url", "Unknown source"),
-                                    "source_credibility": source.get(
-                                        "credibility", "Medium"
-                                    ),
-                                }
-                            )
-                    research_data["key_findings"] = transformed_findings
-
-            if "key_findings" not in research_data:
-                raise ValueError("Missing key_findings in research output")
-
-            if not isinstance(research_data["key_findings"], list):
-                raise ValueError("key_findings should be a list")
-
-            valid_findings = []
-            for finding in research_data["key_findings"]:
-                if "fact" not in finding:
-                    finding["fact"] = finding.get("claim", "No fact provided")
-
-                if "supporting_evidence" not in finding:
-                    finding["supporting_evidence"] = finding.get(
-                        "evidence", "No evidence provided"
-                    )
+            research_data = ResearchResult.failed(topic, f"Research process failed: {str(e)}")
 
-                if "source_url" not in finding:
-                    finding["source_url"] = finding.get("url", "Unknown source")
+        research_data = self._top_up_findings(research_data, session)
 
-                if "source_credibility" not in finding:
-                    finding["source_credibility"] = finding.get("credibility", "Medium")
-
-                for field in [
-                    "claim",
-                    "evidence",
-                    "url",
-                    "credibility",
-                    "sources",
-                    "category",
-                ]:
-                    if field in finding:
-                        del finding[field]
-
-                valid_findings.append(finding)
-
-            research_data["key_findings"] = valid_findings
-
-            if "summary" not in research_data:
-                research_data["summary"] = "Research summary not available"
+        if research_data.error:
+            logger.error(f"Research failed: {research_data.error}")
+        else:
+            logger.info(
+                f"Research completed with {len(research_data.key_findings)} findings, "
+                f"{session.tool_calls} searches in {session.elapsed:.1f}s"
+            )
+        return research_data
+
+    def _run_within_budget(self, topic: str, session: SearchSession) -> RunResponse:
+        """
+        Run the agent in a worker bound to this session, waiting no longer than the budget
+
+        On timeout the session is cancelled, so the abandoned run stops at its next
+        search and no fallback model is started, and the worker is not waited on.
+        """
+        budget = session.budget
+        context = copy_context()
+        context.run(active_search_session.set, session)
+        future = self.executor.submit(
+            context.run,
+            self.agent.run,
+            f"Research the topic: {topic} and provide findings in JSON format. "
+            f"You may run at most {budget.max_tool_calls} searches.",
+            # The model call gets the research deadline, not the shorter generic model timeout
+            timeout=budget.deadline_seconds,
+            cancelled=session.cancelled,
+        )
+        try:
+            return future.result(timeout=budget.deadline_seconds)
+        except TimeoutError:
+            session.cancel()
+            future.cancel()
+            raise
 
+    def _top_up_findings(self, research_data: ResearchResult, session: SearchSession) -> ResearchResult:
+        """Fill up to the minimum number of findings from raw search results"""
+        missing = session.budget.min_findings - len(research_data.key_findings)
+        if missing <= 0 or not session.results:
             return research_data
 
-        except (json.JSONDecodeError, ValueError) as e:
-            return {
-                "error": f"Research parsing failed: {str(e)}",
-                "raw_output": output[:500] + "..." if len(output) > 500 else output,
-            }
-        except Exception as e:
-            return {
-                "error": f"Unexpected parsing error: {str(e)}",
-                "raw_output": output[:500] + "..." if len(output) > 500 else output,
-            }
+        used_urls = {finding.source_url for finding in research_data.key_findings}
+        extra = session.fallback_findings(used_urls, missing)
+        if not extra:
+            return research_data
+        logger.info(f"Added {len(extra)} findings from raw search results")
+        if research_data.error:
+            # Whatever was gathered beats failing the stage outright
+            return ResearchResult(topic=research_data.topic, key_findings=extra)
+        research_data.add_findings(extra)
+        return research_data
+
+    def _parse_research_output(self, output: Any, topic: str) -> ResearchResult:
+        """Validate the structured response, repairing only the findings that fail"""
+        try:
+            research_data, broken = coerce_research(output, topic)
+            if broken:
+                logger.warning(f"Repairing {len(broken)} invalid findings")
+                research_data.add_findings(repair_findings(self.repair_agent, broken))
+            return research_data
+        except ValueError as e:
+            raw = str(output)
+            return ResearchResult.failed(
+                topic,
+                f"Research parsing failed: {str(e)}",
+                raw[:500] + "..." if len(raw) > 500 else raw,
+            )
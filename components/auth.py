@@ -1,8 +1,13 @@
 # auth.py
 import os
+from typing import TYPE_CHECKING
+
 import streamlit as st
-from supabase import create_client, Client
 from dotenv import load_dotenv
+from utils.resilience import call_with_resilience
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 def auth_ui():
@@ -17,21 +22,26 @@ def auth_ui():
         supabase = get_supabase_client()
         try:
             if mode == "Login":
-                user = supabase.auth.sign_in_with_password(
-                    {"email": email, "password": password}
+                user = call_with_resilience(
+                    "supabase:sign_in",
+                    supabase.auth.sign_in_with_password,
+                    {"email": email, "password": password},
                 )
                 st.session_state["user"] = user
                 st.success("Login successful!")
                 st.rerun()
             else:
-                response = supabase.auth.sign_up(
+                response = call_with_resilience(
+                    "supabase:sign_up",
+                    supabase.auth.sign_up,
                     {
                         "email": email,
                         "password": password,
                         "options": {
                             "email_redirect_to": "https://bloggers-tapri.streamlit.app"
                         },
-                    }
+                    },
+                    idempotent=False,
                 )
                 st.success(
                     "Signup successful! Please check your email to verify your account."
@@ -44,7 +54,10 @@ def auth_ui():
 
 
 @st.cache_resource
-def get_supabase_client() -> Client:
+def get_supabase_client() -> "Client":
+    # Imported here so the login form renders before the Supabase SDK loads
+    from supabase import create_client
+
     SUPABASE_URL = os.getenv("SUPABASE_URL") or st.secrets.get("SUPABASE_URL", "")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY") or st.secrets.get("SUPABASE_KEY", "")
     if not SUPABASE_URL or not SUPABASE_KEY:
@@ -79,11 +92,13 @@ def handle_login(email: str, password: str):
 
     supabase = get_supabase_client()
     try:
-        response = supabase.auth.sign_in_with_password(
-            {"email": email, "password": password}
+        response = call_with_resilience(
+            "supabase:sign_in",
+            supabase.auth.sign_in_with_password,
+            {"email": email, "password": password},
         )
 
-        user = supabase.auth.get_user()
+        user = call_with_resilience("supabase:get_user", supabase.auth.get_user)
         if not user.user.email_confirmed_at:  # type: ignore
             st.error(
                 "Please verify your email before logging in. Check your inbox for the verification link."
@@ -105,14 +120,17 @@ def handle_signup(email: str, password: str):
 
     supabase = get_supabase_client()
     try:
-        response = supabase.auth.sign_up(
+        response = call_with_resilience(
+            "supabase:sign_up",
+            supabase.auth.sign_up,
             {
                 "email": email,
                 "password": password,
                 "options": {
                     "email_redirect_to": "https://bloggers-tapri.streamlit.app"
                 },
-            }
+            },
+            idempotent=False,
         )
 
         st.success(
@@ -130,10 +148,16 @@ def handle_signup(email: str, password: str):
         st.error(f"Signup failed: {str(e)}")
 
 
+def current_user_id() -> str:
+    """Email of the logged-in user, which usage and budgets are tracked by"""
+    user = st.session_state.get("user")
+    return getattr(getattr(user, "user", None), "email", None) or "anonymous"
+
+
 def logout():
     if "user" in st.session_state:
         supabase = get_supabase_client()
-        supabase.auth.sign_out()
+        call_with_resilience("supabase:sign_out", supabase.auth.sign_out)
         del st.session_state.user
     st.rerun()
 
@@ -147,7 +171,7 @@ def check_authenticated():
         st.stop()
 
     try:
-        user = supabase.auth.get_user()
+        user = call_with_resilience("supabase:get_user", supabase.auth.get_user)
         if not user.user.email_confirmed_at:  # type: ignore
             st.error(
                 "Please verify your email before accessing the app. Check your inbox."
@@ -1,24 +1,59 @@
 import streamlit as st
 import os
 import json
-from services import fetch_banner
-from utils import image_to_base64
+from services.image_store import image_store
+from services.exporter import bundle_exporter
+from services.unsplash import banner_path, fetch_banner
+from utils import content_hash, image_to_base64
 
+TAG_STYLE = (
+    "display:inline-block; background-color:#3498db; color:white; padding:0.3rem 0.6rem; "
+    "margin:0.2rem; border-radius:20px; font-size:0.85rem;"
+)
 
-def render_blog_tab():
-    st.subheader("Generated Blog")
+
+# Rendered pieces are cached per content version, so reruns only resend them
+@st.cache_data(max_entries=32, show_spinner=False)
+def _banner_html(image_id, keyword: str) -> str:
+    image = image_store.get(image_id)
+    credit = f" · Photo by {image.photographer}" if image and image.photographer else ""
+    return (
+        f'<div class="banner-container">'
+        f'<img src="data:image/png;base64,{image_to_base64(banner_path(image_id, preview=True))}" class="banner-image">'
+        f'<div class="image-keyword">Image keyword: {keyword}{credit}</div>'
+        f"</div>"
+    )
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _tags_html(tags: str) -> str:
+    return " ".join(f"<span style='{TAG_STYLE}'>{t}</span>" for t in tags.split(","))
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _markdown_payload(version: str, _blog_content) -> bytes:
+    content = (
+        _blog_content
+        if isinstance(_blog_content, str)
+        else json.dumps(_blog_content, indent=2)
+    )
+    return content.encode("utf-8")
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _preview_body(version: str, _markdown) -> str:
+    return _markdown if isinstance(_markdown, str) else ""
+
+
+@st.fragment
+def _render_banner_section():
     image_container = st.empty()
 
-    if st.session_state.image_path and os.path.exists(st.session_state.image_path):
+    if os.path.exists(banner_path(st.session_state.image_id)):
         image_container.markdown(
-            f'<div class="banner-container">'
-            f'<img src="data:image/png;base64,{image_to_base64(st.session_state.image_path)}" class="banner-image">'
-            f'<div class="image-keyword">Image keyword: {st.session_state.image_keyword}</div>'
-            f"</div>",
+            _banner_html(st.session_state.image_id, st.session_state.image_keyword),
             unsafe_allow_html=True,
         )
-    elif st.session_state.image_path:
-        image_container.warning("Banner image not found at the specified path")
     else:
         image_container.warning("No banner image available")
 
@@ -27,14 +62,15 @@ def render_blog_tab():
     ):
         with st.spinner("Generating new image..."):
             try:
-                new_image_path = fetch_banner(st.session_state.image_keyword)
-                if new_image_path and os.path.exists(new_image_path):
-                    st.session_state.image_path = new_image_path
+                new_image_id = fetch_banner(
+                    st.session_state.image_keyword, owner=st.session_state.run_id
+                )
+                if new_image_id:
+                    if new_image_id != st.session_state.image_id:
+                        image_store.release(st.session_state.image_id, st.session_state.run_id)
+                    st.session_state.image_id = new_image_id
                     image_container.markdown(
-                        f'<div class="banner-container">'
-                        f'<img src="data:image/png;base64,{image_to_base64(new_image_path)}" class="banner-image">'
-                        f'<div class="image-keyword">Image keyword: {st.session_state.image_keyword}</div>'
-                        f"</div>",
+                        _banner_html(new_image_id, st.session_state.image_keyword),
                         unsafe_allow_html=True,
                     )
                     st.success("Image regenerated successfully!")
@@ -43,47 +79,78 @@ def render_blog_tab():
             except Exception as e:
                 st.error(f"Image regeneration failed: {str(e)}")
 
+
+def _bundle_bytes(version: str, content: dict) -> bytes:
+    # Rebuilt here if other sessions' exports evicted it since the button was shown
+    bundle_exporter.build(version, **content)
+    return bundle_exporter.read(version) or b""
+
+
+def _render_bundle_export(blog_version: str):
+    """Zip of blog, research, banner and references, built only when asked for"""
+    image_id = st.session_state.image_id
+    version = content_hash(st.session_state.run_id or "", blog_version, image_id or "")
+    image = image_store.get(image_id)
+    content = {
+        "markdown": st.session_state.blog_content,
+        "research": st.session_state.research_data,
+        "image_path": image_store.path(image_id),
+        "metadata": {
+            "run_id": st.session_state.run_id,
+            "topic": st.session_state.research_data.get("topic"),
+            "image_keyword": st.session_state.image_keyword,
+            "tags": st.session_state.tags,
+            "duration_seconds": st.session_state.duration,
+            "photographer": image.photographer if image else None,
+            "image_source": image.source_url if image else None,
+        },
+    }
+    if not bundle_exporter.has(version):
+        if not st.button("📦 Prepare Export Bundle", use_container_width=True):
+            return
+        with st.spinner("Packing export bundle..."):
+            bundle_exporter.build(version, **content)
+    # Read only when clicked, on Streamlit's download thread, so reruns of
+    # this fragment no longer carry the bundle
+    st.download_button(
+        label="📥 Download Bundle",
+        data=lambda: _bundle_bytes(version, content),
+        file_name="research_blog_bundle.zip",
+        mime="application/zip",
+        use_container_width=True,
+    )
+
+
+@st.fragment
+def _render_blog_body():
     col1, col2 = st.columns([2, 1])
     col1.metric("Research Duration", f"{st.session_state.duration:.2f} seconds")
     col2.metric("Image Keyword", st.session_state.image_keyword)
 
+    blog_version = content_hash(str(st.session_state.blog_content))
     btn_col1, btn_col2 = st.columns([1, 1])
     with btn_col1:
-        markdown_data = (
-            st.session_state.blog_content
-            if isinstance(st.session_state.blog_content, str)
-            else json.dumps(st.session_state.blog_content, indent=2)
-        )
-
         st.download_button(
             label="📥 Download Markdown",
-            data=markdown_data,
+            data=_markdown_payload(blog_version, st.session_state.blog_content),
             file_name="research_blog.md",
             mime="text/markdown",
             use_container_width=True,
         )
 
     with btn_col2:
-        st.download_button(
-            label="📥 Download Research",
-            data=json.dumps(st.session_state.research_data, indent=2),
-            file_name="research_data.json",
-            mime="application/json",
-            use_container_width=True,
-        )
+        _render_bundle_export(blog_version)
 
     st.markdown("### Live Preview")
-    st.markdown(st.session_state.edited_blog)
+    edited_blog = st.session_state.edited_blog
+    st.markdown(_preview_body(content_hash(str(edited_blog)), edited_blog))
 
     if st.session_state.tags:
         st.markdown("### SEO Tags")
-        tag_list = st.session_state.tags.split(",")
-        st.markdown(
-            " ".join(
-                [
-                    f"<span style='display:inline-block; background-color:#3498db; color:white; padding:0.3rem 0.6rem; margin:0.2rem; border-radius:20px; font-size:0.85rem;'>{t}</span>"
-                    for t in tag_list
-                ]
-            ),
-            unsafe_allow_html=True,
-        )
+        st.markdown(_tags_html(st.session_state.tags), unsafe_allow_html=True)
+
+
+def render_blog_tab():
+    st.subheader("Generated Blog")
+    _render_banner_section()
+    _render_blog_body()
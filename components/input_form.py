@@ -1,10 +1,15 @@
 import streamlit as st
+import uuid
 from services import agno_service
+from services.image_store import image_store
 from services.unsplash import fetch_banner
-from utils import logger as st_logger
+from utils.logger import logger as st_logger
 from datetime import datetime
 from utils.helpers import calculate_duration
+from utils.usage import BudgetExceeded
 from agents import BlogWriter
+from .auth import current_user_id
+from .profiler_panel import start_run_profiler
 
 def render_input_form():
     with st.form("research_form"):
@@ -17,6 +22,14 @@ def render_input_form():
             help="Enter the main topic for your research"
         )
         
+        depth = col2.radio(
+            "Research Depth",
+            ["fast", "thorough"],
+            index=1,
+            format_func=str.capitalize,
+            help="Fast caps web research at a few searches for predictable latency"
+        )
+        
         user_research = st.text_area(
             "Your Research Notes (Optional)",
             height=200,
@@ -33,11 +46,23 @@ def render_input_form():
             with st.spinner("🔍 Conducting research and generating blog..."):
                 try:
                     start_time = datetime.now()
-                    image_keyword, research_data, blog, tags = agno_service.run_agno_services(topic, user_research)
-                    image_path = fetch_banner(image_keyword)
+                    run_id = uuid.uuid4().hex
+                    # Runs until the end of this script run, so rendering the result is included
+                    start_run_profiler()
+                    image_keyword, research_data, blog, tags = agno_service.run_agno_services(
+                        topic, user_research, depth, user_id=current_user_id(), run_id=run_id
+                    )
+                    if "error" in blog:
+                        st.error(f"{blog['error']}. Submit again to resume from the failed stage.")
+                        st.stop()
+                    # The new run owns its banner; the previous run's banner may now be evicted
+                    image_store.release(
+                        st.session_state.get("image_id"), st.session_state.get("run_id", "")
+                    )
+                    image_id = fetch_banner(image_keyword, owner=run_id)
                     
                     duration = calculate_duration(start_time)
-                    st_logger.info(f"Research completed in {duration:.2f} seconds")
+                    st_logger.bind(run_id=run_id).info(f"Research completed in {duration:.2f} seconds")
                     
                     writer = BlogWriter()
                     cleaned_blog = writer._convert_escaped_newlines(blog["final"]) # type: ignore
@@ -47,11 +72,14 @@ def render_input_form():
                     st.session_state.blog_content = cleaned_blog
                     st.session_state.edited_blog = cleaned_blog
                     st.session_state.image_keyword = image_keyword
-                    st.session_state.image_path = image_path
+                    st.session_state.run_id = run_id
+                    st.session_state.image_id = image_id
                     st.session_state.duration = duration
                     st.session_state.active_tab = "blog"
                     st.session_state.tags = tags
                     
+                except BudgetExceeded as e:
+                    st.error(str(e))
                 except Exception as e:
                     st_logger.error(f"Research failed: {str(e)}")
                     st.error(f"Research failed: {str(e)}")
\ No newline at end of file
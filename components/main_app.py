@@ -1,62 +1,122 @@
 import streamlit as st
-from .auth import auth_ui, get_supabase_client, logout
-from .publish_tab import render_publish_tab
+from .auth import auth_ui, current_user_id, get_supabase_client, logout
 from .headers import render_header
-from .input_form import render_input_form
-from .blog_tab import render_blog_tab
-from .research_tab import render_research_tab
-from .references_tab import render_references_tab
+from .profiler_panel import finish_run_profiler, render_profiler_panel
+from utils.config import config
 
 st.set_page_config(page_title="Research Blog Generator", page_icon="📝", layout="wide")
 
 
 def main_app():
+    # The generator tabs import the agent stack, so they load only after login
+    from .input_form import render_input_form
+
     render_header()
 
     st.session_state.setdefault("research_data", None)
     st.session_state.setdefault("blog_content", None)
     st.session_state.setdefault("active_tab", "input")
     st.session_state.setdefault("edited_blog", None)
-    st.session_state.setdefault("image_path", None)
+    st.session_state.setdefault("image_id", None)
     st.session_state.setdefault("image_keyword", None)
     st.session_state.setdefault("image_version", 0)
+    st.session_state.setdefault("run_id", None)
 
     render_input_form()
 
     if st.session_state.research_data and st.session_state.blog_content:
-        tab_cols = st.columns(5)
-        tab_names = ["input", "blog", "research", "references", "publish"]
-        tab_icons = ["📝", "📄", "🔬", "📚", "🚀"]
-
-        for i, (tab_name, tab_icon) in enumerate(zip(tab_names, tab_icons)):
-            with tab_cols[i]:
-                if st.button(
-                    f"{tab_icon} {tab_name.capitalize()}",
-                    key=f"tab_{tab_name}",
-                    use_container_width=True,
-                ):
-                    st.session_state.active_tab = tab_name
-
-        st.markdown(
-            f"""
-        <style>
-            button[data-testid="baseButton-secondary"][key="tab_{st.session_state.active_tab}"] {{
-                background-color: #3498db !important;
-                color: white !important;
-            }}
-        </style>
-        """,
-            unsafe_allow_html=True,
-        )
-
-        if st.session_state.active_tab == "blog":
-            render_blog_tab()
-        elif st.session_state.active_tab == "research":
-            render_research_tab()
-        elif st.session_state.active_tab == "references":
-            render_references_tab()
-        elif st.session_state.active_tab == "publish":
-            render_publish_tab()
+        render_tabs()
+
+
+@st.fragment
+def render_tabs():
+    """Tab bar and active tab; switching tabs reruns only this fragment"""
+    from .blog_tab import render_blog_tab
+    from .research_tab import render_research_tab
+    from .references_tab import render_references_tab
+    from .publish_tab import render_publish_tab
+
+    tab_cols = st.columns(5)
+    tab_names = ["input", "blog", "research", "references", "publish"]
+    tab_icons = ["📝", "📄", "🔬", "📚", "🚀"]
+
+    for i, (tab_name, tab_icon) in enumerate(zip(tab_names, tab_icons)):
+        with tab_cols[i]:
+            if st.button(
+                f"{tab_icon} {tab_name.capitalize()}",
+                key=f"tab_{tab_name}",
+                use_container_width=True,
+            ):
+                st.session_state.active_tab = tab_name
+
+    st.markdown(
+        f"""
+    <style>
+        button[data-testid="baseButton-secondary"][key="tab_{st.session_state.active_tab}"] {{
+            background-color: #3498db !important;
+            color: white !important;
+        }}
+    </style>
+    """,
+        unsafe_allow_html=True,
+    )
+
+    if st.session_state.active_tab == "blog":
+        render_blog_tab()
+    elif st.session_state.active_tab == "research":
+        render_research_tab()
+    elif st.session_state.active_tab == "references":
+        render_references_tab()
+    elif st.session_state.active_tab == "publish":
+        render_publish_tab()
+
+
+def render_warmup_status():
+    """Warm connections in the background and show what it saved once done"""
+    from services.warmup import start_warmup
+
+    warmup = start_warmup()
+    if not warmup.done():
+        st.sidebar.caption("⏳ Warming up connections...")
+    elif warmup.exception() is None:
+        st.sidebar.caption(f"⚡ {warmup.result().summary()}")
+
+
+def render_usage_status():
+    """Today's model spend against the user's budget, and what the last run cost per stage"""
+    from utils.usage import usage_ledger
+
+    user_id = current_user_id()
+    spent = usage_ledger.spent_today(user_id)
+    budget = usage_ledger.budget_for(user_id)
+    tokens = spent["input_tokens"] + spent["output_tokens"]
+    with st.sidebar.expander("💰 Model usage today"):
+        if budget > 0:
+            st.progress(
+                min(1.0, spent["cost_usd"] / budget),
+                text=f"${spent['cost_usd']:.4f} of ${budget:.2f}",
+            )
+        else:
+            st.caption(f"${spent['cost_usd']:.4f} spent, no daily limit")
+        st.caption(f"{spent['calls']} model calls · {tokens:,} tokens")
+
+        run_id = st.session_state.get("run_id")
+        breakdown = usage_ledger.run_breakdown(run_id) if run_id else []
+        if breakdown:
+            st.caption("Last run by stage")
+            st.dataframe(
+                [
+                    {
+                        "stage": row["stage"],
+                        "calls": row["calls"],
+                        "tokens": row["input_tokens"] + row["output_tokens"],
+                        "cost ($)": round(row["cost_usd"], 5),
+                    }
+                    for row in breakdown
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
 
 
 # -------------------------
@@ -69,4 +129,13 @@ def run_app():
         st.sidebar.success(f"Logged in as {st.session_state['user'].user.email}")
         if st.sidebar.button("Logout"):
             logout()
-        main_app()
+        if config.WARMUP_ON_LOGIN:
+            render_warmup_status()
+        try:
+            main_app()
+        finally:
+            finish_run_profiler()
+        # After the form, so a run that just finished is already counted
+        render_usage_status()
+        # Also after finishing, which resets the toggle before it is drawn
+        render_profiler_panel()
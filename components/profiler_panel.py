@@ -0,0 +1,76 @@
+import os
+from typing import Optional
+
+import streamlit as st
+from utils.config import config
+from utils.profiler import PROFILE_MODES, SamplingProfiler
+
+from .auth import current_user_id
+
+
+def is_admin() -> bool:
+    return current_user_id().lower() in config.ADMIN_EMAILS
+
+
+def start_run_profiler() -> Optional[SamplingProfiler]:
+    """Start profiling this script run if an admin armed the profiler; costs nothing otherwise"""
+    if not st.session_state.get("profile_next_run") or not is_admin():
+        return None
+    profiler = SamplingProfiler(
+        st.session_state.get("profile_mode", "wall"), config.PROFILE_INTERVAL_MS / 1000
+    ).start()
+    st.session_state["_active_profiler"] = profiler
+    return profiler
+
+
+def finish_run_profiler():
+    """Stop the profiler started during this script run, save it and disarm the toggle"""
+    profiler = st.session_state.pop("_active_profiler", None)
+    if profiler is None:
+        return
+    profiler.stop()
+    name = st.session_state.get("run_id") or "run"
+    st.session_state["last_profile"] = {
+        "path": profiler.save(config.PROFILE_DIR, name),
+        "mode": profiler.mode,
+        "elapsed": profiler.elapsed,
+        "top": profiler.top_functions(),
+    }
+    st.session_state["profile_next_run"] = False
+
+
+def render_profiler_panel():
+    """Admin-only sidebar controls for profiling the next generation"""
+    if not is_admin():
+        return
+    with st.sidebar.expander("🔥 Profiler"):
+        st.toggle("Profile next generation", key="profile_next_run")
+        st.radio(
+            "Mode",
+            PROFILE_MODES,
+            key="profile_mode",
+            horizontal=True,
+            help="Wall time includes waits on models and the network; CPU time shows only Python work",
+        )
+
+        last = st.session_state.get("last_profile")
+        if not last or not os.path.exists(last["path"]):
+            return
+        st.caption(f"Last profile: {last['mode']} time over {last['elapsed']:.1f}s")
+        with open(last["path"], "rb") as f:
+            st.download_button(
+                "Download speedscope JSON",
+                f.read(),
+                file_name=os.path.basename(last["path"]),
+                mime="application/json",
+                use_container_width=True,
+            )
+        st.caption("Open it at https://www.speedscope.app for a flame graph")
+        st.dataframe(
+            [
+                {"function": row["function"], "location": row["location"], "share": f"{row['share']:.1%}"}
+                for row in last["top"]
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
@@ -1,11 +1,16 @@
 import streamlit as st
 import os
+from typing import Sequence
 from utils.helpers import clean_tag
-from services.devto_api import publish_to_devto
+from services.publisher import DONE, FAILED, SKIPPED, PublishJob, publish_queue
+from services.unsplash import banner_path
+
+STATE_ICONS = {"queued": "🕒", "checking": "🔎", "sending": "📤", DONE: "✅", FAILED: "❌", SKIPPED: "➖"}
+STATUS_POLL_SECONDS = 2
 
 def render_publish_tab():
     st.subheader("Publishing Options")
-    
+
     api_key_input = st.text_input(
         "DEV.to API Key (required for publishing)",
         type="password",
@@ -16,7 +21,7 @@ def render_publish_tab():
     st.markdown(
         """
         <small style="color: gray;">
-        🔒 Your API key is used only for this publish action and is never stored or logged. 
+        🔒 Your API key is used only for this publish action and is never stored or logged.
         Get your API key from <a href="https://dev.to/settings/account" target="_blank">DEV.to settings</a>.
         </small>
         """,
@@ -24,37 +29,74 @@ def render_publish_tab():
     )
 
     st.divider()
-    
+
+    targets = publish_queue.available()
+    labels = {target.name: target.label for target in targets}
+    platforms = st.multiselect(
+        "Platforms",
+        list(labels),
+        default=list(labels),
+        format_func=labels.get,
+        help="Publishing again updates the posts this blog already has instead of creating new ones",
+    )
+
     col1, col2 = st.columns(2)
     with col1:
         if st.button("🚀 Publish as Draft", use_container_width=True):
-            publish_blog(api_key_input, published=False)
+            publish_blog(api_key_input, published=False, platforms=platforms)
     with col2:
         if st.button("🌍 Publish Live", use_container_width=True):
-            publish_blog(api_key_input, published=True)
+            publish_blog(api_key_input, published=True, platforms=platforms)
+
+    render_publish_status(st.session_state.run_id)
 
-def publish_blog(api_key: str, published: bool = False):
-    if not api_key:
+def publish_blog(api_key: str, published: bool = False, platforms: Sequence[str] = ()):
+    if not platforms:
+        st.error("Select at least one platform")
+        return
+    if not api_key and "devto" in platforms:
         if published:
             st.error("API key is required for publishing")
             return
         else:
-            api_key = os.getenv("DEV_TO_API_KEY") # type: ignore            
-    
-    with st.spinner("Publishing to Dev.to..."):            
-        original_tags = st.session_state.tags.split(",")
-        cleaned_tags = [clean_tag(tag.strip()) for tag in original_tags][:4] 
-        
-        try:
-            response = publish_to_devto(
-                api_key=api_key,
-                title=st.session_state.research_data.get("topic", "AI Blog"),
-                content=st.session_state.edited_blog,
-                image_path=st.session_state.image_path,
-                published=published,
-                tags=",".join(cleaned_tags)
-            )
-            status = "published" if published else "saved as draft"
-            st.success(f"✅ Blog {status}: [View Post](https://dev.to{response['path']})")
-        except Exception as e:
-            st.error(f"❌ Failed to publish blog: {e}")
\ No newline at end of file
+            api_key = os.getenv("DEV_TO_API_KEY") # type: ignore
+
+    original_tags = st.session_state.tags.split(",")
+    cleaned_tags = [clean_tag(tag.strip()) for tag in original_tags][:4]
+
+    publish_queue.submit(
+        PublishJob(
+            run_id=st.session_state.run_id,
+            title=st.session_state.research_data.get("topic", "AI Blog"),
+            content=st.session_state.edited_blog,
+            tags=",".join(cleaned_tags),
+            published=published,
+            image_path=banner_path(st.session_state.image_id),
+            image_id=st.session_state.image_id,
+            api_key=api_key,
+        ),
+        platforms,
+    )
+
+def render_publish_status(run_id: str):
+    """Publish progress per platform; polls only while a publish is in flight"""
+    polling = publish_queue.in_flight(run_id)
+
+    def show_status():
+        statuses = publish_queue.status(run_id)
+        for name, status in statuses.items():
+            label = publish_queue.targets[name].label
+            icon = STATE_ICONS.get(status.state, "")
+            if status.state == DONE:
+                action = "updated" if status.updated else "created"
+                kind = "live" if status.published else "draft"
+                st.markdown(f"{icon} **{label}**: {kind} {action} · [View Post]({status.url})")
+            elif status.state in (FAILED, SKIPPED):
+                st.markdown(f"{icon} **{label}**: {status.error}")
+            else:
+                st.markdown(f"{icon} **{label}**: {status.state}...")
+        if polling and not publish_queue.in_flight(run_id):
+            # Everything finished: rerun once more so this fragment stops polling
+            st.rerun()
+
+    st.fragment(show_status, run_every=STATUS_POLL_SECONDS if polling else None)()
@@ -1,31 +1,104 @@
+import html
+import math
+from typing import List, Tuple
+
 import streamlit as st
+from utils import content_hash
 from utils.helpers import get_credibility_badge
 
+CREDIBILITY_LEVELS = ["High", "Medium", "Low", "User Provided"]
+PAGE_SIZES = [10, 25, 50]
+
+
+def _finding_card(finding) -> str:
+    source = finding.get("source_url")
+    url = html.escape(source or "#", quote=True)
+    return (
+        f"<div class='card'>"
+        f"<h4>{html.escape(finding['fact'])}</h4>"
+        f"<p>{html.escape(finding.get('supporting_evidence', 'No evidence provided'))}</p>"
+        f"<div><strong>Source:</strong> <a href='{url}' target='_blank'>{html.escape(source) if source else 'No URL'}</a></div>"
+        f"<div><strong>Credibility:</strong> {get_credibility_badge(finding.get('source_credibility', 'Medium'))}</div>"
+        f"</div>"
+    )
+
+
+# Built once per research version; pages and filters then only slice these
+@st.cache_data(max_entries=8, show_spinner=False)
+def _indexed_findings(version: str, _findings) -> List[Tuple[str, str, str]]:
+    """(search text, credibility, card HTML) for every finding"""
+    return [
+        (
+            f"{finding['fact']} {finding.get('supporting_evidence', '')} "
+            f"{finding.get('source_url', '')}".lower(),
+            finding.get("source_credibility", "Medium"),
+            _finding_card(finding),
+        )
+        for finding in _findings
+    ]
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _findings_page(
+    version: str, query: str, levels: Tuple[str, ...], page: int, page_size: int, _findings
+) -> Tuple[str, int]:
+    """One page of matching findings as a single HTML block, and the match count"""
+    terms = query.lower().split()
+    matches = [
+        card
+        for text, credibility, card in _indexed_findings(version, _findings)
+        if credibility in levels and all(term in text for term in terms)
+    ]
+    start = (page - 1) * page_size
+    return "".join(matches[start : start + page_size]), len(matches)
+
+
+@st.fragment
+def _render_findings(findings):
+    version = content_hash(
+        *(f"{finding['fact']}|{finding.get('source_url', '')}" for finding in findings)
+    )
+
+    search_col, level_col, size_col = st.columns([3, 3, 1])
+    query = search_col.text_input("Search findings", key="findings_query")
+    levels = level_col.multiselect(
+        "Credibility", CREDIBILITY_LEVELS, default=CREDIBILITY_LEVELS, key="findings_levels"
+    )
+    page_size = size_col.selectbox("Per page", PAGE_SIZES, key="findings_page_size")
+
+    # Page 1 first, so a stale page number never outlives a narrower filter
+    _, total = _findings_page(version, query, tuple(levels), 1, page_size, findings)
+    pages = max(1, math.ceil(total / page_size))
+    page = 1
+    if pages > 1:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+
+    page_html, _ = _findings_page(version, query, tuple(levels), int(page), page_size, findings)
+    st.caption(f"{total} of {len(findings)} findings · page {int(page)} of {pages}")
+    if page_html:
+        st.markdown(page_html, unsafe_allow_html=True)
+    else:
+        st.info("No findings match the current filters")
+
+
 def render_research_tab():
     st.subheader("Research Data")
-    
+
+    if "error" in st.session_state.research_data:
+        st.warning(st.session_state.research_data["error"])
+
     if "key_findings" in st.session_state.research_data:
         st.write(f"**Topic**: {st.session_state.research_data.get('topic', '')}")
-        
+
         if "sources" in st.session_state.research_data:
             st.write(f"**Sources**: User: {st.session_state.research_data['sources']['user']}, "
                     f"Auto: {st.session_state.research_data['sources']['auto']}")
         else:
             st.write("**Sources**: Not available")
-        
+
         st.subheader("Key Findings")
-        for finding in st.session_state.research_data["key_findings"]:
-            with st.container():
-                st.markdown(
-                    f"<div class='card'>"
-                    f"<h4>{finding['fact']}</h4>"
-                    f"<p>{finding.get('supporting_evidence', 'No evidence provided')}</p>"
-                    f"<div><strong>Source:</strong> <a href='{finding.get('source_url', '#')}' target='_blank'>{finding.get('source_url', 'No URL')}</a></div>"
-                    f"<div><strong>Credibility:</strong> {get_credibility_badge(finding.get('source_credibility', 'Medium'))}</div>"
-                    f"</div>",
-                    unsafe_allow_html=True
-                )
-    
+        _render_findings(st.session_state.research_data["key_findings"])
+
     if "summary" in st.session_state.research_data:
         with st.expander("Research Summary"):
-            st.markdown(st.session_state.research_data["summary"])
\ No newline at end of file
+            st.markdown(st.session_state.research_data["summary"])
@@ -0,0 +1,92 @@
+# scripts/check_import_budget.py
+"""
+Import-time budget for the login screen
+
+Imports the app entry module in a fresh interpreter with ``-X importtime`` and
+fails when the cumulative import time exceeds the budget or when an SDK that
+is only needed after login got imported.
+
+    python scripts/check_import_budget.py --budget-ms 2500
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy SDKs that must not load before the user has logged in
+DEFERRED_MODULES = [
+    "agno",
+    "google.genai",
+    "groq",
+    "supabase",
+    "duckduckgo_search",
+    "loguru",
+    "bs4",
+    "httpx",
+]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(code: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self us, cumulative us, nesting depth) for every import, in import order"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Running {code!r} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="components.main_app")
+    parser.add_argument("--budget-ms", type=float, default=2500)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    # Interpreter start-up imports are not the app's doing
+    startup = {name for name, _, _, _ in measure("pass")}
+    rows = [row for row in measure(f"import {args.module}") if row[0] not in startup]
+    total_ms = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000
+    # Self time summed per top-level package shows who actually pays
+    by_package: Dict[str, int] = {}
+    for name, self_us, _, _ in rows:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+
+    print(f"{args.module}: {total_ms:.0f} ms cumulative (budget {args.budget_ms:.0f} ms)")
+    for name, cumulative in sorted(by_package.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    imported = {name for name, _, _, _ in rows}
+    leaked = [
+        module
+        for module in DEFERRED_MODULES
+        if any(name == module or name.startswith(module + ".") for name in imported)
+    ]
+    failed = False
+    if leaked:
+        print(f"Deferred SDKs imported before login: {', '.join(leaked)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"Over budget by {total_ms - args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+# scripts/load_test.py
+"""
+Multi-session load test for one app process
+
+Drives N simulated Streamlit sessions (``streamlit.testing.v1.AppTest``) through
+login, blog generation, tab switches and a draft publish, all inside this
+process, so they share its caches, executors and connection pools exactly like
+real sessions do. Providers are replaced locally:
+
+* Supabase Auth, Unsplash, imgbb and dev.to are local stand-in servers
+* model calls, web searches and source-page fetches replay a cassette
+
+Record the cassette once by generating a blog for the same topic:
+
+    RECORD_MODE=record streamlit run app.py
+    python scripts/load_test.py --sessions 20 --ramp-up 10
+
+Every session generates the same recorded topic, so single-flight coalescing
+is turned off by default and each session runs its own generation; pass
+--coalesce to measure the merged path instead. The report states which mode
+its numbers describe. Usage, logs, page cache, images and publications go to
+a temporary directory, never to the real ledgers.
+
+Reports throughput, p50/p95/p99 per interaction, and the peak threads, busy
+workers and queued tasks of every executor while the sessions ran. AppTest
+reruns the whole script on every interaction, so fragment-only reruns are
+measured as full reruns.
+"""
+import argparse
+import importlib
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stand_ins import (  # noqa: E402
+    devto_stand_in,
+    imgbb_stand_in,
+    supabase_stand_in,
+    unsplash_stand_in,
+)
+
+DEFAULT_TOPIC = "AI-Powered Cybersecurity Systems: Attack Prediction Models"
+TABS = ["blog", "research", "references", "publish"]
+
+# Executors whose saturation is sampled: (module, attribute path)
+EXECUTORS = {
+    "agno-service": ("services.agno", "agno_service.executor"),
+    "summary": ("services.agno", "agno_service.research_merger.executor"),
+    "notes-parse": ("services.agno", "agno_service.research_merger.parse_executor"),
+    "web-research": ("services.agno", "agno_service.research_agent.executor"),
+    "model-hedge": ("agents.model_router", "model_router.executor"),
+    "page-fetch": ("services.page_fetcher", "page_fetcher.executor"),
+    "publish": ("services.publisher", "publish_queue.executor"),
+    # One pool per endpoint, reported as "timeout:<endpoint>"
+    "timeout": ("utils.resilience", "_timeout_executors"),
+}
+
+
+@dataclass
+class Sample:
+    interaction: str
+    seconds: float
+    ok: bool
+    error: str = ""
+
+
+@dataclass
+class Saturation:
+    peak_threads: int = 0
+    peak_busy: Dict[str, int] = field(default_factory=dict)
+    peak_queued: Dict[str, int] = field(default_factory=dict)
+    max_workers: Dict[str, int] = field(default_factory=dict)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _resolve(module_name: str, path: str):
+    # Only sample executors of modules the sessions have already imported
+    target = sys.modules.get(module_name)
+    for attr in path.split("."):
+        target = getattr(target, attr, None)
+    return target
+
+
+class SaturationSampler(threading.Thread):
+    """Polls thread counts and executor queues until stopped"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="load-test-sampler", daemon=True)
+        self.interval = interval
+        self.result = Saturation()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            result = self.result
+            result.peak_threads = max(result.peak_threads, threading.active_count())
+            for name, executor in self._executors():
+                # ThreadPoolExecutor keeps no public gauges; idle workers block on the queue
+                queued = executor._work_queue.qsize()
+                idle = executor._idle_semaphore._value
+                busy = max(0, len(executor._threads) - idle)
+                result.max_workers[name] = executor._max_workers
+                result.peak_busy[name] = max(result.peak_busy.get(name, 0), busy)
+                result.peak_queued[name] = max(result.peak_queued.get(name, 0), queued)
+
+    def _executors(self):
+        for name, (module_name, path) in EXECUTORS.items():
+            executor = _resolve(module_name, path)
+            if isinstance(executor, dict):
+                yield from ((f"{name}:{key}", pool) for key, pool in list(executor.items()))
+            elif executor is not None:
+                yield name, executor
+
+    def stop(self) -> Saturation:
+        self._stop_event.set()
+        self.join()
+        return self.result
+
+
+class Session:
+    """One simulated user going through the app"""
+
+    def __init__(self, index: int, args: argparse.Namespace, samples: List[Sample], lock: threading.Lock):
+        from streamlit.testing.v1 import AppTest
+
+        self.index = index
+        self.args = args
+        self.samples = samples
+        self.lock = lock
+        self.app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=args.timeout)
+
+    def timed(self, interaction: str, action: Callable[[], None], expect: Optional[Callable[[], bool]] = None) -> bool:
+        start = time.perf_counter()
+        error = ""
+        try:
+            action()
+            if self.app.exception:
+                error = self.app.exception[0].message
+            elif self.app.error:
+                error = self.app.error[0].value
+            elif expect is not None and not expect():
+                error = "expected outcome not rendered"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        sample = Sample(interaction, time.perf_counter() - start, not error, error)
+        with self.lock:
+            self.samples.append(sample)
+        return sample.ok
+
+    def _by_label(self, widgets, label: str):
+        return next(widget for widget in widgets if widget.label == label)
+
+    def login(self) -> bool:
+        app = self.app
+        if not self.timed("open", app.run):
+            return False
+
+        def submit():
+            self._by_label(app.text_input, "Email").input(f"load{self.index}@example.com")
+            self._by_label(app.text_input, "Password").input("stand-in-password")
+            self._by_label(app.button, "Continue").click()
+            app.run()
+
+        return self.timed("login", submit, expect=lambda: "user" in app.session_state)
+
+    def generate(self) -> bool:
+        app = self.app
+
+        def submit():
+            self._by_label(app.text_input, "Research Topic*").input(self.args.topic)
+            self._by_label(app.button, "Generate Blog").click()
+            app.run()
+
+        return self.timed("generate", submit, expect=lambda: bool(app.session_state.blog_content))
+
+    def switch_tab(self, tab: str) -> bool:
+        return self.timed(f"tab:{tab}", lambda: self.app.button(key=f"tab_{tab}").click().run())
+
+    def publish(self) -> bool:
+        from services.publisher import DONE, publish_queue
+
+        app = self.app
+        run_id = app.session_state.run_id
+
+        def click_and_wait():
+            self._by_label(app.button, "🚀 Publish as Draft").click()
+            app.run()
+            # Publishing is queued, so the interaction lasts until the queue finishes it
+            deadline = time.monotonic() + self.args.timeout
+            while publish_queue.in_flight(run_id) and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+        return self.timed(
+            "publish",
+            click_and_wait,
+            expect=lambda: getattr(publish_queue.status(run_id).get("devto"), "state", None) == DONE,
+        )
+
+    def run(self) -> bool:
+        if not (self.login() and self.generate()):
+            return False
+        for tab in self.args.tabs:
+            if not self.switch_tab(tab):
+                return False
+        return self.args.no_publish or self.publish()
+
+
+def configure_environment(args: argparse.Namespace, stand_ins: Dict[str, object]):
+    """Point the app at the stand-ins and the cassette"""
+    # Loads .env first, so the overrides below are not replaced by its values
+    importlib.import_module("utils.config")
+
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    os.environ.update(
+        {
+            "RECORD_MODE": "replay",
+            "CASSETTE_PATH": args.cassette,
+            "CASSETTE_KINDS": "model,search,page",
+            "REPLAY_LATENCY_SCALE": str(args.latency_scale),
+            "SUPABASE_URL": stand_ins["supabase"].url,
+            # The Supabase client only accepts JWT-shaped keys
+            "SUPABASE_KEY": "stand.in.key",
+            "UNSPLASH_API_URL": stand_ins["unsplash"].url,
+            "UNSPLASH_ACCESS_KEY": "stand-in",
+            "UNSPLASH_SECRET_KEY": "stand-in",
+            "IMGBB_API_URL": stand_ins["imgbb"].url,
+            "IMGBB_API_KEY": "stand-in",
+            "DEVTO_API_URL": stand_ins["devto"].url,
+            "DEV_TO_API_KEY": "stand-in",
+            "SINGLE_FLIGHT": "true" if args.coalesce else "false",
+            # Replayed runs must never reach the real ledgers, logs or caches
+            "IMAGE_STORE_DIR": os.path.join(workdir, "images"),
+            "PUBLISH_DB_PATH": os.path.join(workdir, "publish.sqlite3"),
+            "USAGE_DB_PATH": os.path.join(workdir, "usage.sqlite3"),
+            "LOG_PATH": os.path.join(workdir, "logs", "app.jsonl"),
+            "PAGE_CACHE_DIR": os.path.join(workdir, "page_cache"),
+            "PROFILE_DIR": os.path.join(workdir, "profiles"),
+            "WARMUP_ON_LOGIN": "false",
+        }
+    )
+
+
+def build_report(
+    samples: List[Sample],
+    completed: int,
+    elapsed: float,
+    saturation: Saturation,
+    stand_ins: Dict[str, object],
+    args: argparse.Namespace,
+) -> Dict:
+    by_interaction: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_interaction[sample.interaction].append(sample)
+
+    interactions = {}
+    for name, group in by_interaction.items():
+        durations = [sample.seconds for sample in group if sample.ok]
+        errors = [sample.error for sample in group if not sample.ok]
+        interactions[name] = {
+            "count": len(group),
+            "errors": len(errors),
+            "first_error": errors[0] if errors else None,
+            **(
+                {
+                    "p50": round(percentile(durations, 50), 3),
+                    "p95": round(percentile(durations, 95), 3),
+                    "p99": round(percentile(durations, 99), 3),
+                    "max": round(max(durations), 3),
+                }
+                if durations
+                else {}
+            ),
+        }
+
+    single_flight = sys.modules.get("utils.singleflight")
+    return {
+        "sessions": args.sessions,
+        "mode": "coalesced" if args.coalesce else "independent",
+        "completed": completed,
+        "elapsed_seconds": round(elapsed, 2),
+        "sessions_per_minute": round(completed / elapsed * 60, 2) if elapsed else 0.0,
+        "interactions_per_second": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "interactions": interactions,
+        "single_flight": single_flight.single_flight.stats() if single_flight else {},
+        "saturation": {
+            "peak_threads": saturation.peak_threads,
+            "executors": {
+                name: {
+                    "max_workers": saturation.max_workers[name],
+                    "peak_busy": saturation.peak_busy[name],
+                    "peak_queued": saturation.peak_queued[name],
+                }
+                for name in saturation.max_workers
+            },
+            "stand_ins": {
+                name: {
+                    "requests": stand_in.stats.requests,
+                    "max_in_flight": stand_in.stats.max_in_flight,
+                    "by_route": stand_in.stats.by_route,
+                }
+                for name, stand_in in stand_ins.items()
+            },
+        },
+    }
+
+
+def print_report(report: Dict):
+    print(
+        f"\n{report['completed']}/{report['sessions']} sessions completed in "
+        f"{report['elapsed_seconds']}s ({report['sessions_per_minute']} sessions/min, "
+        f"{report['interactions_per_second']} interactions/s)"
+    )
+    if report["mode"] == "coalesced":
+        print("Mode: coalesced - identical generations were merged by single-flight\n")
+    else:
+        print("Mode: independent - every session ran its own generation\n")
+    print(f"{'interaction':<16}{'count':>7}{'errors':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, row in report["interactions"].items():
+        timings = "".join(f"{row.get(key, float('nan')):>9.2f}" for key in ("p50", "p95", "p99", "max"))
+        print(f"{name:<16}{row['count']:>7}{row['errors']:>8}{timings}")
+        if row["first_error"]:
+            print(f"  first error: {row['first_error'][:200]}")
+
+    saturation = report["saturation"]
+    print(f"\nPeak threads: {saturation['peak_threads']}")
+    width = max([20] + [len(name) + 2 for name in saturation["executors"]])
+    print(f"{'executor':<{width}}{'workers':>9}{'peak busy':>11}{'peak queued':>13}")
+    for name, row in saturation["executors"].items():
+        flag = "  <- saturated" if row["peak_queued"] else ""
+        print(f"{name:<{width}}{row['max_workers']:>9}{row['peak_busy']:>11}{row['peak_queued']:>13}{flag}")
+    print(f"\n{'stand-in':<20}{'requests':>9}{'max in flight':>15}")
+    for name, row in saturation["stand_ins"].items():
+        print(f"{name:<20}{row['requests']:>9}{row['max_in_flight']:>15}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which sessions start")
+    parser.add_argument("--cassette", default=os.path.join("outputs", "cassettes", "session.jsonl"))
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier on recorded model latency")
+    parser.add_argument("--topic", default=DEFAULT_TOPIC, help="Must match the recorded run")
+    parser.add_argument("--tabs", type=lambda value: value.split(","), default=TABS)
+    parser.add_argument("--no-publish", action="store_true")
+    parser.add_argument(
+        "--coalesce",
+        action="store_true",
+        help="Keep single-flight on, so identical generations are merged as in production",
+    )
+    parser.add_argument("--timeout", type=float, default=300, help="Per-interaction timeout in seconds")
+    parser.add_argument("--sample-interval", type=float, default=0.1)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    if not os.path.exists(args.cassette):
+        sys.exit(f"No cassette at {args.cassette}; record one with RECORD_MODE=record first")
+
+    stand_ins = {
+        "supabase": supabase_stand_in(),
+        "unsplash": unsplash_stand_in(),
+        "imgbb": imgbb_stand_in(),
+        "devto": devto_stand_in(),
+    }
+    for stand_in in stand_ins.values():
+        stand_in.start()
+    configure_environment(args, stand_ins)
+
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    sampler = SaturationSampler(args.sample_interval)
+    delay = args.ramp_up / args.sessions if args.sessions else 0.0
+
+    def run_session(index: int) -> bool:
+        time.sleep(index * delay)
+        try:
+            return Session(index, args, samples, lock).run()
+        except Exception:
+            traceback.print_exc()
+            return False
+
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.sessions), thread_name_prefix="load-session") as executor:
+        completed = sum(executor.map(run_session, range(args.sessions)))
+    elapsed = time.perf_counter() - start
+    saturation = sampler.stop()
+    for stand_in in stand_ins.values():
+        stand_in.stop()
+
+    report = build_report(samples, completed, elapsed, saturation, stand_ins, args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0 if completed == args.sessions else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
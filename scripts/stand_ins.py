@@ -0,0 +1,340 @@
+# scripts/stand_ins.py
+"""
+Local stand-ins for the external REST providers
+
+Each stand-in is a threaded HTTP server on a free localhost port that answers
+the handful of endpoints the app uses with canned payloads after a simulated
+latency. They are meant for load tests, never for production traffic.
+
+    python scripts/stand_ins.py   # serve them all and print the settings to use
+"""
+import io
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# (status, content type, body) or (status, content type, body, extra headers)
+Reply = Union[Tuple[int, str, bytes], Tuple[int, str, bytes, Dict[str, str]]]
+Handler = Callable[["StandIn", Dict], Reply]
+
+
+def json_reply(payload, status: int = 200) -> Reply:
+    return status, "application/json", json.dumps(payload).encode("utf-8")
+
+
+@dataclass
+class StandInStats:
+    requests: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    by_route: Dict[str, int] = field(default_factory=dict)
+
+
+class StandIn:
+    """
+    A fake provider: routes map "METHOD /path" (or a "/path/" prefix) to handlers
+
+    Args:
+        name: Provider name used in reports
+        routes: Handlers keyed by "METHOD /path"; keys ending in "/" match prefixes
+        latency: Mean simulated latency in seconds, jittered by +/-25%
+    """
+
+    def __init__(self, name: str, routes: Dict[str, Handler], latency: float = 0.05):
+        self.name = name
+        self.routes = routes
+        self.latency = latency
+        self.stats = StandInStats()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandIn":
+        stand_in = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self):
+                stand_in._serve(self)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever, name=f"stand-in-{self.name}", daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _route(self, method: str, path: str) -> Tuple[str, Optional[Handler]]:
+        exact = f"{method} {path}"
+        if exact in self.routes:
+            return exact, self.routes[exact]
+        for route, handler in self.routes.items():
+            route_method, route_path = route.split(" ", 1)
+            if route_method == method and route_path.endswith("/") and path.startswith(route_path):
+                return route, handler
+        return exact, None
+
+    def _serve(self, request: BaseHTTPRequestHandler):
+        parts = urlsplit(request.path)
+        route, handler = self._route(request.command, parts.path)
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.in_flight += 1
+            self.stats.max_in_flight = max(self.stats.max_in_flight, self.stats.in_flight)
+            self.stats.by_route[route] = self.stats.by_route.get(route, 0) + 1
+        try:
+            length = int(request.headers.get("Content-Length") or 0)
+            body = request.rfile.read(length) if length else b""
+            if self.latency > 0:
+                time.sleep(self.latency * random.uniform(0.75, 1.25))
+            if handler is None:
+                reply = json_reply({"error": "not found"}, 404)
+            else:
+                reply = handler(
+                    self,
+                    {
+                        "method": request.command,
+                        "path": parts.path,
+                        "query": {k: v[0] for k, v in parse_qs(parts.query).items()},
+                        "headers": request.headers,
+                        "body": body,
+                    },
+                )
+            status, content_type, payload, *extra = reply
+            request.send_response(status)
+            for name, value in (extra[0] if extra else {}).items():
+                request.send_header(name, value)
+            request.send_header("Content-Type", content_type)
+            request.send_header("Content-Length", str(len(payload)))
+            request.end_headers()
+            request.wfile.write(payload)
+        finally:
+            with self._lock:
+                self.stats.in_flight -= 1
+
+
+def _banner_bytes() -> bytes:
+    """A banner-sized JPEG in a random colour, so banners do not all dedupe"""
+    from PIL import Image
+
+    colour = tuple(random.randrange(256) for _ in range(3))
+    buffer = io.BytesIO()
+    Image.new("RGB", (1080, 720), colour).save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def supabase_stand_in(latency: float = 0.08) -> StandIn:
+    """Supabase Auth (GoTrue): password sign-in, current user and sign-out"""
+
+    def user(email: str) -> Dict:
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        return {
+            "id": str(uuid.uuid5(uuid.NAMESPACE_DNS, email)),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": email,
+            "email_confirmed_at": now,
+            "app_metadata": {"provider": "email"},
+            "user_metadata": {},
+            "created_at": now,
+        }
+
+    def token(stand_in: StandIn, request: Dict) -> Reply:
+        email = json.loads(request["body"] or b"{}").get("email", "load@example.com")
+        return json_reply(
+            {
+                "access_token": f"stand-in.{uuid.uuid4().hex}.token",
+                "token_type": "bearer",
+                "expires_in": 3600,
+                "expires_at": int(time.time()) + 3600,
+                "refresh_token": uuid.uuid4().hex,
+                "user": user(email),
+            }
+        )
+
+    return StandIn(
+        "supabase",
+        {
+            "POST /auth/v1/token": token,
+            "GET /auth/v1/user": lambda stand_in, request: json_reply(user("load@example.com")),
+            "POST /auth/v1/logout": lambda stand_in, request: (204, "application/json", b""),
+        },
+        latency,
+    )
+
+
+def unsplash_stand_in(latency: float = 0.15) -> StandIn:
+    """Unsplash random photo search plus the image download it points at"""
+
+    def random_photo(stand_in: StandIn, request: Dict) -> Reply:
+        photo_id = uuid.uuid4().hex[:12]
+        return json_reply(
+            {
+                "id": photo_id,
+                "urls": {"regular": f"{stand_in.url}/images/{photo_id}.jpg"},
+                "user": {"name": "Stand-in Photographer"},
+                "links": {"html": f"{stand_in.url}/photos/{photo_id}"},
+            }
+        )
+
+    return StandIn(
+        "unsplash",
+        {
+            "GET /photos/random": random_photo,
+            "GET /images/": lambda stand_in, request: (200, "image/jpeg", _banner_bytes()),
+        },
+        latency,
+    )
+
+
+def imgbb_stand_in(latency: float = 0.25) -> StandIn:
+    def upload(stand_in: StandIn, request: Dict) -> Reply:
+        return json_reply({"data": {"url": f"{stand_in.url}/hosted/{uuid.uuid4().hex[:12]}.jpg"}})
+
+    return StandIn("imgbb", {"POST /upload": upload}, latency)
+
+
+def devto_stand_in(latency: float = 0.3) -> StandIn:
+    """dev.to article creation, updates and the user's article list"""
+    article_ids = itertools.count(1)
+    articles: Dict[int, Dict] = {}
+
+    def save(stand_in: StandIn, request: Dict, article_id: int, status: int) -> Reply:
+        if not request["headers"].get("api-key"):
+            return json_reply({"error": "unauthorized", "status": 401}, 401)
+        article = json.loads(request["body"] or b"{}").get("article", {})
+        slug = f"stand-in-{article_id}"
+        articles[article_id] = {
+            "id": article_id,
+            "title": article.get("title", ""),
+            "published": article.get("published", False),
+            "path": f"/stand-in/{slug}",
+            "url": f"{stand_in.url}/stand-in/{slug}",
+        }
+        return json_reply(articles[article_id], status)
+
+    def update(stand_in: StandIn, request: Dict) -> Reply:
+        article_id = request["path"].rsplit("/", 1)[-1]
+        if not article_id.isdigit() or int(article_id) not in articles:
+            return json_reply({"error": "not found", "status": 404}, 404)
+        return save(stand_in, request, int(article_id), 200)
+
+    def mine(stand_in: StandIn, request: Dict) -> Reply:
+        if not request["headers"].get("api-key"):
+            return json_reply({"error": "unauthorized", "status": 401}, 401)
+        # Newest first, like dev.to
+        return json_reply([articles[article_id] for article_id in sorted(articles, reverse=True)])
+
+    return StandIn(
+        "devto",
+        {
+            "POST /articles": lambda stand_in, request: save(stand_in, request, next(article_ids), 201),
+            "PUT /articles/": update,
+            "GET /articles/me/all": mine,
+        },
+        latency,
+    )
+
+
+def linkedin_stand_in(latency: float = 0.2, requests_per_minute: int = 30) -> StandIn:
+    """LinkedIn Posts API: create, partially update and find by author, answering 429 over the rate limit"""
+    post_ids = itertools.count(1)
+    posts: Dict[str, Dict] = {}
+    sent: List[float] = []
+    lock = threading.Lock()
+
+    def limited() -> Optional[Reply]:
+        """A 429 with Retry-After once the minute's requests are used up"""
+        with lock:
+            now = time.monotonic()
+            sent[:] = [at for at in sent if now - at < 60]
+            if len(sent) >= requests_per_minute:
+                retry_after = str(max(1, int(60 - (now - sent[0]))))
+                return 429, "application/json", b'{"status": 429}', {"Retry-After": retry_after}
+            sent.append(now)
+            return None
+
+    def create(stand_in: StandIn, request: Dict) -> Reply:
+        throttled = limited()
+        if throttled:
+            return throttled
+        if not request["headers"].get("Authorization", "").startswith("Bearer "):
+            return json_reply({"status": 401}, 401)
+        urn = f"urn:li:share:{next(post_ids)}"
+        posts[urn] = json.loads(request["body"] or b"{}")
+        return 201, "application/json", b"", {"x-restli-id": urn}
+
+    def update(stand_in: StandIn, request: Dict) -> Reply:
+        throttled = limited()
+        if throttled:
+            return throttled
+        urn = unquote(request["path"].rsplit("/", 1)[-1])
+        if request["headers"].get("X-RestLi-Method") != "PARTIAL_UPDATE" or urn not in posts:
+            return json_reply({"status": 404}, 404)
+        posts[urn].update(json.loads(request["body"] or b"{}").get("patch", {}).get("$set", {}))
+        return 204, "application/json", b""
+
+    def by_author(stand_in: StandIn, request: Dict) -> Reply:
+        throttled = limited()
+        if throttled:
+            return throttled
+        if request["query"].get("q") != "author":
+            return json_reply({"status": 400}, 400)
+        count = int(request["query"].get("count", 10))
+        elements = [{"id": urn, **post} for urn, post in reversed(list(posts.items()))][:count]
+        return json_reply({"elements": elements})
+
+    return StandIn(
+        "linkedin",
+        {"POST /rest/posts": create, "POST /rest/posts/": update, "GET /rest/posts": by_author},
+        latency,
+    )
+
+
+STAND_INS = {
+    "supabase": (supabase_stand_in, ["SUPABASE_URL"]),
+    "unsplash": (unsplash_stand_in, ["UNSPLASH_API_URL"]),
+    "imgbb": (imgbb_stand_in, ["IMGBB_API_URL"]),
+    "devto": (devto_stand_in, ["DEVTO_API_URL"]),
+    "linkedin": (linkedin_stand_in, ["LINKEDIN_API_URL"]),
+}
+
+
+def main():
+    """Serve every stand-in until interrupted and print the settings that point the app at them"""
+    servers = [factory().start() for factory, _ in STAND_INS.values()]
+    for server, (_, variables) in zip(servers, STAND_INS.values()):
+        for variable in variables:
+            print(f"export {variable}={server.url}")
+    print("export SUPABASE_KEY=stand.in.key LINKEDIN_ACCESS_TOKEN=stand-in LINKEDIN_AUTHOR_URN=urn:li:person:stand-in")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
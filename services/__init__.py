@@ -1,3 +1,26 @@
-from .unsplash import *
-from .agno import *
-from .devto_api import *
\ No newline at end of file
+# Importing a service builds its clients, so each loads on first use
+from utils.lazy import lazy_exports
+
+lazy_exports(
+    __name__,
+    globals(),
+    {
+        "unsplash": ["UNSPLASH_URL", "DEFAULT_BANNER", "fetch_banner", "banner_path"],
+        "agno": ["AgnoService", "agno_service"],
+        "devto_api": ["publish_to_devto"],
+        "linkedin_api": ["linkedin_enabled", "build_commentary", "publish_to_linkedin"],
+        "publisher": ["PublishJob", "PublishStatus", "PublishTarget", "PublishQueue", "publish_queue"],
+        "page_fetcher": [
+            "USER_AGENT",
+            "extract_main_text",
+            "best_excerpt",
+            "ground_findings",
+            "PageFetcher",
+            "page_fetcher",
+        ],
+        "http_pool": ["http_session"],
+        "image_store": ["StoredImage", "ImageStore", "image_store"],
+        "exporter": ["write_bundle", "BundleExporter", "bundle_exporter", "export_to_path"],
+        "warmup": ["PRECONNECT_URLS", "DNS_HOSTS", "WarmupReport", "run_warmup", "start_warmup"],
+    },
+)
\ No newline at end of file
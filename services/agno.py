@@ -1,12 +1,29 @@
 # services/agno.py
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 from agents import WebResearchAgent
-from agents import create_image_keyword_agent
+from agents import create_metadata_agent, PostMetadata
+from agents.model_router import model_router
+from agents import ResearchResult
 from agents import ResearchAnalysis
 from agents import BlogWriter
-from agents import create_tag_agent
-from utils import *
+from utils import (
+    StageCheckpoints,
+    clean_tag_output,
+    config,
+    extract_post_metadata,
+    make_flight_key,
+    resilience_metrics,
+    single_flight,
+)
+from utils.logger import run_id_var
+from utils.usage import active_usage, usage_ledger
+from pydantic import ValidationError
+from .page_fetcher import page_fetcher, ground_findings
 import logging
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -15,50 +32,58 @@ logger = logging.getLogger(__name__)
 class AgnoService:
     def __init__(self):
         self.research_agent = WebResearchAgent()
-        self.image_agent = create_image_keyword_agent()
-        self.tag_agent = create_tag_agent()
+        self.metadata_agent = model_router.runner("metadata", create_metadata_agent)
         self.research_merger = ResearchAnalysis()
         self.blog_writer = BlogWriter()
+        # Background stages that run alongside outlining
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="agno-service")
+        # Research of runs whose blog failed, reused when the user retries
+        self.checkpoints = StageCheckpoints(max_entries=8)
         logger.info("Agno service initialized with research merger and blog writer")
 
-    def research_topic(self, topic: str) -> dict:
+    def research_topic(self, topic: str, depth: Optional[str] = None) -> ResearchResult:
         """Conduct in-depth research on a topic"""
         logger.info(f"Researching topic: {topic}")
-        return self.research_agent.research_topic(topic)
-
-    def generate_image_keyword(self, topic: str) -> str:
-        """Generate an image search keyword for a blog topic"""
-        logger.info(f"Generating image keyword for: {topic}")
-        response = self.image_agent.run(
-            message=topic,
-            input=f"Generate a keyword for an image related to this blog topic: {topic}",
-            stream=False,
-            show_full_reasoning=False,
+        return self.research_agent.research_topic(topic, depth)
+
+    def generate_metadata(self, topic: str) -> Tuple[str, str]:
+        """Generate the image search keyword and SEO tags in one call"""
+        logger.info(f"Generating post metadata for: {topic}")
+        response = self.metadata_agent.run(f"Blog topic: {topic}", stream=False)
+        metadata = self._validate_metadata(response.content)
+        tags = clean_tag_output(",".join(metadata.tags))
+        if not metadata.keyword.strip() or not tags:
+            raise ValueError(f"Incomplete post metadata: {metadata}")
+        logger.debug(f"Post metadata generated: {metadata}")
+        return metadata.keyword.strip(), tags
+
+    def generate_local_metadata(
+        self, topic: str, blog: Dict[str, Any], research_data: ResearchResult
+    ) -> Tuple[str, str]:
+        """Extract the image keyword and tags from the generated content without a model call"""
+        logger.info(f"Extracting post metadata locally for: {topic}")
+        return extract_post_metadata(
+            topic, blog.get("final", ""), research_data.key_findings
         )
-        logger.debug(f"Image keyword generated: {response.content}")
-        return response.content.strip()  # type: ignore
-    
-    def generate_tag(self, topic: str) -> str:
-        """Generate tags for a blog topic"""
-        logger.info(f"Generating tags for: {topic}")
-        response = self.tag_agent.run(
-            message=topic,
-            input=f"Generate a keyword for an image related to this blog topic: {topic}",
-            stream=False,
-            show_full_reasoning=False,
-        )
-        logger.debug(f"Tags keyword generated: {response.content}")
-        tags = clean_tag_output(response.content.strip() ) # type: ignore
-        return tags  # type: ignore
 
-    def research_analysis(self, topic: str, user_research: str) -> Dict[str, Any]:
+    def _validate_metadata(self, content: Any) -> PostMetadata:
+        """Validate the metadata response against the PostMetadata schema"""
+        if isinstance(content, PostMetadata):
+            return content
+        raw = re.sub(r"```json|```", "", str(content)).strip()
+        try:
+            return PostMetadata.model_validate_json(raw)
+        except ValidationError as e:
+            raise ValueError(f"Invalid post metadata: {e}") from e
+
+    def research_analysis(self, topic: str, user_research: str) -> ResearchResult:
         """
         Merge user research with automated research
         """
         logger.info(f"Merging research for topic: {topic}")
         return self.research_merger.analyse_research(topic, user_research)
 
-    def write_blog(self, research_data: Dict[str, Any]) -> Dict[str, Any]:
+    def write_blog(self, research_data: ResearchResult) -> Dict[str, Any]:
         """
         Generate a professional technical blog from research data
 
@@ -68,7 +93,7 @@ class AgnoService:
         Returns:
             Dictionary containing blog content and metadata
         """
-        logger.info(f"Writing blog for topic: {research_data.get('topic', 'Unknown')}")
+        logger.info(f"Writing blog for topic: {research_data.topic}")
         return self.blog_writer.write_blog(research_data)
 
     def edit_blog(self, blog_state: Dict[str, Any], user_edits: str) -> Dict[str, Any]:
@@ -86,21 +111,88 @@ class AgnoService:
         return self.blog_writer.apply_user_edits(blog_state, user_edits)
     
 
-    def run_agno_services(self, topic: str, user_research: str):
+    def run_agno_services(
+        self,
+        topic: str,
+        user_research: str,
+        depth: Optional[str] = None,
+        user_id: str = "anonymous",
+        run_id: Optional[str] = None,
+    ):
+        """
+        Research a topic and write the blog, billing every model call to the user
+
+        Raises:
+            BudgetExceeded: If the user has spent their daily budget; no model is called
+        """
+        run_id = run_id or uuid.uuid4().hex
+        log_token = run_id_var.set(run_id)
+        try:
+            scope = usage_ledger.open_scope(user_id, run_id, topic)
+            usage_token = active_usage.set(scope)
+            try:
+                return self._run_services(topic, user_research, depth)
+            finally:
+                active_usage.reset(usage_token)
+                usage_ledger.close_scope(scope)
+                logger.info(f"Run usage: {usage_ledger.run_breakdown(run_id)}")
+        finally:
+            run_id_var.reset(log_token)
+
+    def _run_services(self, topic: str, user_research: str, depth: Optional[str] = None):
         logger.info(f"Testing Agno service for topic: {topic}")
         
-        keyword = agno_service.generate_image_keyword(topic)
-
-        logger.info(f"User research input:\n{user_research[:200]}...")
+        keyword, tags = None, None
+        if config.METADATA_ENGINE != "local":
+            try:
+                keyword, tags = agno_service.generate_metadata(topic)
+            except Exception as e:
+                logger.warning(f"Metadata agent failed, using local extractor: {e}")
+
+        # The notes are the user's own content, so only their size is logged
+        logger.info(f"User research notes: {len(user_research)} characters")
         
-        research_data = agno_service.research_analysis(topic, user_research)
+        checkpoint_key = make_flight_key(
+            "run", topic, user_research, depth or config.RESEARCH_DEPTH
+        )
+        research_data = self.checkpoints.get(checkpoint_key).get("research")
+        if research_data is not None:
+            logger.info(f"Resuming from checkpointed research for topic: {topic}")
+        else:
+            logger.info(f"Merging research for topic: {topic}")
+            research_data = self.research_merger.gather_research(topic, user_research, depth)
         
         logger.info("Research Results:")
 
-            
-        blog = agno_service.write_blog(research_data)
-        
-        tags = agno_service.generate_tag(topic)
+        # Summarize in the background while the outline is being created
+        summary = None
+        if research_data.usable and not research_data.summary:
+            summary = self.research_merger.start_summary(research_data)
+
+        # Fetch cited pages in parallel with outlining; the draft uses their excerpts
+        grounding = None
+        if config.FETCH_SOURCE_PAGES and research_data.key_findings:
+            grounding = self.executor.submit(
+                copy_context().run, ground_findings, research_data.key_findings, page_fetcher
+            )
+
+        logger.info(f"Writing blog for topic: {research_data.topic}")
+        blog = self.blog_writer.write_blog(research_data, summary, grounding)
+
+        if summary is not None:
+            self.research_merger.attach_summary(research_data, summary)
+
+        if "error" in blog and research_data.usable:
+            self.checkpoints.save(checkpoint_key, "research", research_data)
+        else:
+            self.checkpoints.clear(checkpoint_key)
+
+        if keyword is None:
+            keyword, tags = agno_service.generate_local_metadata(topic, blog, research_data)
+
+        logger.info(f"Single-flight stats: {single_flight.stats()}")
+        logger.info(f"Model router stats: {model_router.snapshot()}")
+        logger.info(f"Resilience stats: {resilience_metrics()}")
         
         return keyword, research_data, blog, tags
 
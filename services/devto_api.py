@@ -1,10 +1,30 @@
 import os
 import textwrap
-import requests
+from typing import Collection, Optional, Tuple
+from utils.config import config
+from utils.resilience import RateLimiter, call_with_resilience
+from .http_pool import http_session
+from .image_store import image_store
+
+
+def _request_checked(method, url, **kwargs):
+    """Request that raises on retryable statuses so the resilience layer can act on them"""
+    response = http_session.request(method, url, **kwargs)
+    if response.status_code == 429 or response.status_code >= 500:
+        response.raise_for_status()
+    return response
 
 
 def publish_to_devto(
-    api_key, title, content, image_path=None, published=False, tags=""
+    api_key,
+    title,
+    content,
+    image_path=None,
+    published=False,
+    tags="",
+    image_id=None,
+    article_id=None,
+    limiter=None,
 ):
     """
     Publish the blog to dev.to
@@ -15,6 +35,9 @@ def publish_to_devto(
     :param image_path: Optional local path to a main image
     :param published: Whether to publish immediately
     :param tags: Comma-separated string of tags
+    :param image_id: Optional banner id in the image store; takes precedence over image_path
+    :param article_id: Id of an article this run already created; it is updated instead
+    :param limiter: Rate limiter of the API key, acquired for every article request attempt
     :return: API response JSON if successful
     """
     try:
@@ -25,9 +48,14 @@ def publish_to_devto(
                 "No API key provided and DEV_TO_API_KEY environment variable not set"
             )
 
+        # Stored banners are uploaded once and their hosted URL is reused
+        stored = image_store.get(image_id)
+        if stored is not None:
+            image_path = image_store.path(image_id)
+
         # If image_path is provided, try uploading the image using imgbb or a similar image hosting API
-        image_url = None
-        if image_path and os.path.exists(image_path):
+        image_url = stored.hosted_url if stored is not None else None
+        if not image_url and image_path and os.path.exists(image_path):
             with open(image_path, "rb") as f:
                 imgbb_api_key = os.getenv(
                     "IMGBB_API_KEY"
@@ -35,13 +63,21 @@ def publish_to_devto(
                 if not imgbb_api_key:
                     raise ValueError("IMGBB_API_KEY environment variable not set")
 
-                upload_response = requests.post(
-                    "https://api.imgbb.com/1/upload",
+                image_bytes = f.read()
+                # A repeated upload only leaves a duplicate image, so it is safe to retry
+                upload_response = call_with_resilience(
+                    "imgbb:upload",
+                    _request_checked,
+                    "POST",
+                    f"{config.IMGBB_API_URL}/upload",
                     params={"key": imgbb_api_key},
-                    files={"image": f},
+                    files={"image": image_bytes},
+                    timeout=config.HTTP_TIMEOUT,
                 )
                 if upload_response.status_code == 200:
                     image_url = upload_response.json()["data"]["url"]
+                    if stored is not None:
+                        image_store.update(stored.digest, hosted_url=image_url)
                 else:
                     print(f"Image upload failed: {upload_response.text}")
         cleaned_content = textwrap.dedent(content).strip()
@@ -58,13 +94,33 @@ def publish_to_devto(
 
         headers = {"api-key": final_api_key, "Content-Type": "application/json"}
 
-        response = requests.post(
-            "https://dev.to/api/articles",
-            headers=headers,
-            json=article_data,
-        )
+        if article_id:
+            # Updating an article is idempotent, so every transient failure is retried
+            response = call_with_resilience(
+                "devto:articles",
+                _request_checked,
+                "PUT",
+                f"{config.DEVTO_API_URL}/articles/{article_id}",
+                limiter=limiter,
+                headers=headers,
+                json=article_data,
+                timeout=config.HTTP_TIMEOUT,
+            )
+        else:
+            # Creating an article is not idempotent: only retry when dev.to refused it outright
+            response = call_with_resilience(
+                "devto:articles",
+                _request_checked,
+                "POST",
+                f"{config.DEVTO_API_URL}/articles",
+                idempotent=False,
+                limiter=limiter,
+                headers=headers,
+                json=article_data,
+                timeout=config.HTTP_TIMEOUT,
+            )
 
-        if response.status_code == 201:
+        if response.status_code in (200, 201):
             print("✅ Blog published successfully!")
             return response.json()
         else:
@@ -75,3 +131,40 @@ def publish_to_devto(
     except Exception as e:
         print(f"🚨 Error publishing to dev.to: {str(e)}")
         raise
+
+
+def find_devto_article(
+    api_key: Optional[str],
+    title: str,
+    exclude_ids: Collection[str] = (),
+    limiter: Optional[RateLimiter] = None,
+) -> Optional[Tuple[str, str]]:
+    """
+    Look up the user's most recent article with this title, e.g. one whose
+    create response was lost; returns (id, url) or None
+
+    :param exclude_ids: Article ids already known to belong to other runs
+    """
+    final_api_key = api_key or os.getenv("DEV_TO_API_KEY")
+    if not final_api_key:
+        raise ValueError("No API key provided and DEV_TO_API_KEY environment variable not set")
+    response = call_with_resilience(
+        "devto:articles",
+        _request_checked,
+        "GET",
+        f"{config.DEVTO_API_URL}/articles/me/all",
+        limiter=limiter,
+        headers={"api-key": final_api_key},
+        params={"per_page": 100},
+        timeout=config.HTTP_TIMEOUT,
+    )
+    response.raise_for_status()
+    candidates = [
+        article
+        for article in response.json()
+        if article.get("title") == title and str(article.get("id")) not in exclude_ids
+    ]
+    if not candidates:
+        return None
+    newest = max(candidates, key=lambda article: article["id"])
+    return str(newest["id"]), newest.get("url", "")
@@ -0,0 +1,221 @@
+# services/exporter.py
+import argparse
+import io
+import json
+import logging
+import os
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from tempfile import SpooledTemporaryFile
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+from utils.helpers import parse_references
+
+logger = logging.getLogger(__name__)
+
+# Bundles up to this size stay in memory; larger ones roll over to a temp file
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+CHUNK_BYTES = 64 * 1024
+
+
+def _research_dict(research: Any) -> Dict[str, Any]:
+    return research.to_dict() if hasattr(research, "to_dict") else dict(research)
+
+
+def write_bundle(
+    target: BinaryIO,
+    markdown: str,
+    research: Any,
+    image_path: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+):
+    """
+    Stream a zip of the blog, research, banner, references and run metadata into target
+
+    Args:
+        target: Writable binary file; the zip is written entry by entry
+        markdown: Final blog markdown
+        research: ResearchResult or its dict form
+        image_path: Banner file to include, if any
+        metadata: Run details such as topic, tags and run id
+    """
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        bundle.writestr("blog.md", markdown)
+
+        # Encoded piecewise so large research never exists as one string
+        with bundle.open("research.json", "w") as raw:
+            text = io.TextIOWrapper(raw, encoding="utf-8")
+            for chunk in json.JSONEncoder(indent=2).iterencode(_research_dict(research)):
+                text.write(chunk)
+            text.flush()
+            text.detach()
+
+        references = parse_references(markdown)
+        if references:
+            bundle.writestr(
+                "references.md",
+                "\n".join(f"[^{ref_id}]: {content}" for ref_id, content in references.items()) + "\n",
+            )
+
+        if image_path and os.path.exists(image_path):
+            ext = os.path.splitext(image_path)[1] or ".jpg"
+            # Already compressed, so stored as is
+            bundle.write(image_path, f"banner{ext}", compress_type=zipfile.ZIP_STORED)
+
+        run_metadata = {"exported_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+        run_metadata.update(metadata or {})
+        bundle.writestr("metadata.json", json.dumps(run_metadata, indent=2, default=str))
+
+
+class _Bundle:
+    """
+    A built bundle; its lock serializes seeks and reads on the shared spool
+
+    Evicted bundles are not closed explicitly: the spool is released once the
+    last reader drops it, so eviction never cuts a download short.
+    """
+
+    __slots__ = ("spool", "size", "lock")
+
+    def __init__(self, spool: SpooledTemporaryFile, size: int):
+        self.spool = spool
+        self.size = size
+        self.lock = threading.Lock()
+
+
+class BundleExporter:
+    """
+    Export bundles built on request and kept per blog version
+
+    Bundles are written outside the exporter-wide lock, which only guards the
+    cache, so a large export never blocks other sessions. Concurrent builds
+    of one version wait for the first instead of packing it twice.
+    """
+
+    def __init__(self, max_cached: int = 8):
+        self.max_cached = max_cached
+        self._bundles: "OrderedDict[str, _Bundle]" = OrderedDict()
+        self._building: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def has(self, version: str) -> bool:
+        with self._lock:
+            return version in self._bundles
+
+    def _get(self, version: str) -> Optional[_Bundle]:
+        with self._lock:
+            bundle = self._bundles.get(version)
+            if bundle is not None:
+                self._bundles.move_to_end(version)
+            return bundle
+
+    def build(self, version: str, **content) -> int:
+        """Build the bundle for a version unless cached; returns its size in bytes"""
+        with self._lock:
+            build_lock = self._building.setdefault(version, threading.Lock())
+        try:
+            with build_lock:
+                bundle = self._get(version)
+                if bundle is not None:
+                    return bundle.size
+                start = time.monotonic()
+                spool = SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+                write_bundle(spool, **content)
+                bundle = _Bundle(spool, self._size(spool))
+                with self._lock:
+                    self._bundles[version] = bundle
+                    while len(self._bundles) > self.max_cached:
+                        self._bundles.popitem(last=False)
+                logger.info(
+                    f"Built export bundle {version} ({bundle.size} bytes) in {time.monotonic() - start:.2f}s"
+                )
+                return bundle.size
+        finally:
+            with self._lock:
+                if self._building.get(version) is build_lock:
+                    del self._building[version]
+
+    def read(self, version: str) -> Optional[bytes]:
+        """
+        Bundle bytes for st.download_button, or None if it was not built or was evicted
+
+        Streamlit needs the whole payload as bytes, so one full copy is made
+        here and nowhere else; other callers should use chunks or copy_to.
+        """
+        bundle = self._get(version)
+        if bundle is None:
+            return None
+        with bundle.lock:
+            bundle.spool.seek(0)
+            return bundle.spool.read()
+
+    def chunks(self, version: str) -> Optional[Iterator[bytes]]:
+        """Bundle contents in CHUNK_BYTES pieces, or None if it was not built or was evicted"""
+        bundle = self._get(version)
+        if bundle is None:
+            return None
+        return self._iter_chunks(bundle)
+
+    @staticmethod
+    def _iter_chunks(bundle: _Bundle) -> Iterator[bytes]:
+        # Each reader keeps its own position, so the lock is only held per chunk
+        position = 0
+        while True:
+            with bundle.lock:
+                bundle.spool.seek(position)
+                chunk = bundle.spool.read(CHUNK_BYTES)
+            if not chunk:
+                return
+            position += len(chunk)
+            yield chunk
+
+    def copy_to(self, version: str, target: BinaryIO) -> bool:
+        """Copy a cached bundle to a file in chunks"""
+        chunks = self.chunks(version)
+        if chunks is None:
+            return False
+        for chunk in chunks:
+            target.write(chunk)
+        return True
+
+    @staticmethod
+    def _size(spool: SpooledTemporaryFile) -> int:
+        spool.seek(0, os.SEEK_END)
+        return spool.tell()
+
+
+bundle_exporter = BundleExporter()
+
+
+def export_to_path(path: str, **content):
+    """Headless export: stream the bundle straight to a file on disk"""
+    with open(path, "wb") as target:
+        write_bundle(target, **content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a blog run as a zip bundle")
+    parser.add_argument("--markdown", required=True, help="Blog markdown file")
+    parser.add_argument("--research", required=True, help="Research JSON file")
+    parser.add_argument("--banner", help="Banner image file")
+    parser.add_argument("--out", required=True, help="Zip file to write")
+    args = parser.parse_args()
+
+    with open(args.markdown, "r", encoding="utf-8") as f:
+        markdown = f.read()
+    with open(args.research, "r", encoding="utf-8") as f:
+        research = json.load(f)
+    export_to_path(
+        args.out,
+        markdown=markdown,
+        research=research,
+        image_path=args.banner,
+        metadata={"topic": research.get("topic")},
+    )
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# services/http_pool.py
+import base64
+import hashlib
+from typing import Any, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from utils.cassette import cassette, redact_url
+
+# Response headers worth keeping in a cassette
+RECORDED_HEADERS = {"content-type", "retry-after", "etag", "last-modified", "location"}
+
+
+def body_digest(body: Any, content_type: str) -> str:
+    """Hash of a request body for cassette keys; multipart boundaries are random, so skipped"""
+    if not body or content_type.startswith("multipart/"):
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.sha256(body).hexdigest() if isinstance(body, bytes) else ""
+
+
+def _encode_response(response: requests.Response) -> Dict[str, Any]:
+    return {
+        "status": response.status_code,
+        "headers": {k: v for k, v in response.headers.items() if k.lower() in RECORDED_HEADERS},
+        "body": base64.b64encode(response.content).decode("ascii"),
+    }
+
+
+def _decode_response(recorded: Dict[str, Any], request: requests.PreparedRequest) -> requests.Response:
+    response = requests.Response()
+    response.status_code = recorded["status"]
+    response.headers = CaseInsensitiveDict(recorded["headers"])
+    response._content = base64.b64decode(recorded["body"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url or ""
+    response.request = request
+    return response
+
+
+class CassetteSession(requests.Session):
+    """Session that records or replays its exchanges when a cassette is active"""
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if not cassette.enabled:
+            return super().send(request, **kwargs)
+        url = redact_url(request.url or "")
+        content_type = request.headers.get("Content-Type", "")
+        return cassette.call(
+            cassette.key("http", request.method, url, body_digest(request.body, content_type)),
+            lambda: requests.Session.send(self, request, **kwargs),
+            encode=_encode_response,
+            decode=lambda recorded: _decode_response(recorded, request),
+            request={"method": request.method, "url": url},
+        )
+
+
+def _build_session() -> requests.Session:
+    """Session whose keep-alive connections are shared by every REST call in the app"""
+    session = CassetteSession()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+http_session = _build_session()
@@ -0,0 +1,204 @@
+# services/image_store.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from io import BytesIO
+from typing import Dict, Optional
+
+from utils.config import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredImage:
+    digest: str
+    ext: str
+    size: int
+    keyword: str = ""
+    photographer: str = ""
+    source_url: str = ""
+    width: Optional[int] = None
+    height: Optional[int] = None
+    created_at: float = field(default_factory=time.time)
+    last_access: float = field(default_factory=time.time)
+    # Owner (a generation run) -> time it took the reference
+    refs: Dict[str, float] = field(default_factory=dict)
+    # Thumbnail width -> file size in bytes
+    thumbnails: Dict[str, int] = field(default_factory=dict)
+    # URL of the copy uploaded for publishing, so it is uploaded once
+    hosted_url: Optional[str] = None
+
+
+class ImageStore:
+    """
+    Banner images stored once per content hash
+
+    An index keeps each image's metadata, the runs referencing it and its
+    thumbnail variants. Past the disk quota, unreferenced images are evicted
+    least recently used first. References older than the TTL count as
+    abandoned, so closed sessions do not pin images forever.
+    """
+
+    def __init__(self, root: str, quota_bytes: int, ref_ttl_seconds: float):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.ref_ttl_seconds = ref_ttl_seconds
+        self.index_path = os.path.join(root, "index.json")
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.RLock()
+        self._images: Dict[str, StoredImage] = self._load_index()
+
+    def _load_index(self) -> Dict[str, StoredImage]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        images = {digest: StoredImage(**entry) for digest, entry in entries.items()}
+        # Drop entries whose file went missing
+        return {d: image for d, image in images.items() if os.path.exists(self._object_path(image))}
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({digest: asdict(image) for digest, image in self._images.items()}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _object_path(self, image: StoredImage, variant: str = "") -> str:
+        # Thumbnails are always re-encoded as JPEG
+        name = f"{image.digest}-{variant}.jpg" if variant else f"{image.digest}.{image.ext}"
+        return os.path.join(self.root, "objects", image.digest[:2], name)
+
+    def _disk_usage(self) -> int:
+        return sum(image.size + sum(image.thumbnails.values()) for image in self._images.values())
+
+    def _is_referenced(self, image: StoredImage) -> bool:
+        cutoff = time.time() - self.ref_ttl_seconds
+        return any(taken >= cutoff for taken in image.refs.values())
+
+    def put(
+        self,
+        data: bytes,
+        ext: str = "jpg",
+        owner: Optional[str] = None,
+        **metadata,
+    ) -> StoredImage:
+        """Store image bytes once; storing the same content again only refreshes it"""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            image = self._images.get(digest)
+            if image is None:
+                image = StoredImage(digest=digest, ext=ext, size=len(data), **metadata)
+                image.width, image.height = _dimensions(data, image.width, image.height)
+                path = self._object_path(image)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._images[digest] = image
+            image.last_access = time.time()
+            if owner:
+                image.refs[owner] = time.time()
+            self._evict(keep=digest)
+            self._save_index()
+            return image
+
+    def get(self, digest: Optional[str]) -> Optional[StoredImage]:
+        with self._lock:
+            return self._images.get(digest) if digest else None
+
+    def path(self, digest: Optional[str]) -> Optional[str]:
+        """Local path of the original image, or None if it is not stored"""
+        with self._lock:
+            image = self.get(digest)
+            if image is None:
+                return None
+            image.last_access = time.time()
+            return self._object_path(image)
+
+    def thumbnail(self, digest: Optional[str], width: int) -> Optional[str]:
+        """Path of a variant at most width pixels wide, made on first request"""
+        original = self.path(digest)
+        image = self.get(digest)
+        if original is None or image is None or width <= 0:
+            return original
+        if image.width is not None and image.width <= width:
+            return original
+        with self._lock:
+            variant = self._object_path(image, f"w{width}")
+            if str(width) in image.thumbnails and os.path.exists(variant):
+                return variant
+            try:
+                from PIL import Image
+            except ImportError:
+                return original
+            with Image.open(original) as img:
+                img.thumbnail((width, width * 10))
+                img.convert("RGB").save(variant, "JPEG", quality=82, optimize=True)
+            image.thumbnails[str(width)] = os.path.getsize(variant)
+            self._save_index()
+            return variant
+
+    def update(self, digest: str, **metadata):
+        with self._lock:
+            image = self._images.get(digest)
+            if image is not None:
+                for name, value in metadata.items():
+                    setattr(image, name, value)
+                self._save_index()
+
+    def release(self, digest: Optional[str], owner: str):
+        """Drop an owner's reference so the image becomes evictable"""
+        with self._lock:
+            image = self._images.get(digest) if digest else None
+            if image is not None and image.refs.pop(owner, None) is not None:
+                self._save_index()
+
+    def _evict(self, keep: str):
+        usage = self._disk_usage()
+        if usage <= self.quota_bytes:
+            return
+        candidates = sorted(
+            (
+                image
+                for image in self._images.values()
+                if image.digest != keep and not self._is_referenced(image)
+            ),
+            key=lambda image: image.last_access,
+        )
+        for image in candidates:
+            if usage <= self.quota_bytes:
+                break
+            for variant in [""] + [f"w{width}" for width in image.thumbnails]:
+                try:
+                    os.remove(self._object_path(image, variant))
+                except OSError:
+                    pass
+            usage -= image.size + sum(image.thumbnails.values())
+            del self._images[image.digest]
+            logger.info(f"Evicted banner {image.digest[:12]} ({image.keyword})")
+        if usage > self.quota_bytes:
+            logger.warning("Image store over quota; every remaining image is referenced")
+
+
+def _dimensions(data: bytes, width: Optional[int], height: Optional[int]):
+    try:
+        from PIL import Image
+
+        with Image.open(BytesIO(data)) as img:
+            return img.width, img.height
+    except Exception:
+        return width, height
+
+
+image_store = ImageStore(
+    root=config.IMAGE_STORE_DIR,
+    quota_bytes=config.IMAGE_STORE_QUOTA_BYTES,
+    ref_ttl_seconds=config.IMAGE_REF_TTL_DAYS * 24 * 3600,
+)
@@ -0,0 +1,151 @@
+# services/linkedin_api.py
+import re
+from typing import Collection, Optional, Tuple
+from urllib.parse import quote
+
+from utils.config import config
+from utils.keyphrases import strip_markdown
+from utils.resilience import RateLimiter, call_with_resilience
+from .http_pool import http_session
+
+LINKEDIN_VERSION = "202405"
+COMMENTARY_EXCERPT_CHARS = 1200
+# Characters LinkedIn's "little text" format reserves for templates
+_RESERVED = re.compile(r"([\\|{}@\[\]()<>#*_~])")
+
+
+def _escape(text: str) -> str:
+    return _RESERVED.sub(r"\\\1", text)
+
+
+def _headers() -> dict:
+    return {
+        "Authorization": f"Bearer {config.LINKEDIN_ACCESS_TOKEN}",
+        "LinkedIn-Version": LINKEDIN_VERSION,
+        "X-Restli-Protocol-Version": "2.0.0",
+        "Content-Type": "application/json",
+    }
+
+
+def _request_checked(method, url, **kwargs):
+    """Request that raises on retryable statuses so the resilience layer can act on them"""
+    response = http_session.request(method, url, **kwargs)
+    if response.status_code == 429 or response.status_code >= 500:
+        response.raise_for_status()
+    return response
+
+
+def linkedin_enabled() -> bool:
+    return bool(config.LINKEDIN_ACCESS_TOKEN and config.LINKEDIN_AUTHOR_URN)
+
+
+def build_commentary(title: str, content: str, tags: str) -> str:
+    """Post text: the title, an excerpt of the blog and its tags as hashtags"""
+    excerpt = " ".join(strip_markdown(content).split())
+    if len(excerpt) > COMMENTARY_EXCERPT_CHARS:
+        excerpt = excerpt[:COMMENTARY_EXCERPT_CHARS].rsplit(" ", 1)[0] + "…"
+    hashtags = " ".join(
+        f"{{hashtag|\\#|{tag.strip()}}}" for tag in tags.split(",") if tag.strip().isalnum()
+    )
+    return "\n\n".join(part for part in (_escape(title), _escape(excerpt), hashtags) if part)
+
+
+def _post_url(post_urn: str) -> str:
+    return f"https://www.linkedin.com/feed/update/{post_urn}/"
+
+
+def publish_to_linkedin(
+    title: str,
+    content: str,
+    tags: str = "",
+    post_urn: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> dict:
+    """
+    Share the blog as a LinkedIn post, or update the post a run already created
+
+    :param title: Blog title, used as the first line of the post
+    :param content: Blog markdown; an excerpt becomes the post text
+    :param tags: Comma-separated tags, added as hashtags
+    :param post_urn: URN of the run's existing post; its text is updated instead
+    :param limiter: Rate limiter of the access token, acquired for every request attempt
+    :return: {"id": post URN, "url": post URL}
+    """
+    if not linkedin_enabled():
+        raise ValueError("LINKEDIN_ACCESS_TOKEN and LINKEDIN_AUTHOR_URN must be set to post to LinkedIn")
+
+    commentary = build_commentary(title, content, tags)
+    if post_urn:
+        # A partial update sets the same text each time, so it is safe to retry
+        response = call_with_resilience(
+            "linkedin:posts",
+            _request_checked,
+            "POST",
+            f"{config.LINKEDIN_API_URL}/rest/posts/{quote(post_urn, safe='')}",
+            limiter=limiter,
+            headers={**_headers(), "X-RestLi-Method": "PARTIAL_UPDATE"},
+            json={"patch": {"$set": {"commentary": commentary}}},
+            timeout=config.HTTP_TIMEOUT,
+        )
+        expected = 204
+    else:
+        # Creating a post is not idempotent: only retry when LinkedIn refused it outright
+        response = call_with_resilience(
+            "linkedin:posts",
+            _request_checked,
+            "POST",
+            f"{config.LINKEDIN_API_URL}/rest/posts",
+            idempotent=False,
+            limiter=limiter,
+            headers=_headers(),
+            json={
+                "author": config.LINKEDIN_AUTHOR_URN,
+                "commentary": commentary,
+                "visibility": "PUBLIC",
+                "distribution": {
+                    "feedDistribution": "MAIN_FEED",
+                    "targetEntities": [],
+                    "thirdPartyDistributionChannels": [],
+                },
+                "lifecycleState": "PUBLISHED",
+                "isReshareDisabledByAuthor": False,
+            },
+            timeout=config.HTTP_TIMEOUT,
+        )
+        expected = 201
+        post_urn = response.headers.get("x-restli-id")
+
+    if response.status_code != expected or not post_urn:
+        raise Exception(f"❌ Failed to post to LinkedIn: {response.status_code} - {response.text}")
+    return {"id": post_urn, "url": _post_url(post_urn)}
+
+
+def find_linkedin_post(
+    title: str, exclude_urns: Collection[str] = (), limiter: Optional[RateLimiter] = None
+) -> Optional[Tuple[str, str]]:
+    """
+    Look up the author's most recent post for this title, e.g. one whose
+    create response was lost; returns (URN, URL) or None
+
+    :param exclude_urns: Post URNs already known to belong to other runs
+    """
+    if not linkedin_enabled():
+        raise ValueError("LINKEDIN_ACCESS_TOKEN and LINKEDIN_AUTHOR_URN must be set to post to LinkedIn")
+    response = call_with_resilience(
+        "linkedin:posts",
+        _request_checked,
+        "GET",
+        f"{config.LINKEDIN_API_URL}/rest/posts",
+        limiter=limiter,
+        headers={**_headers(), "X-RestLi-Method": "FINDER"},
+        params={"author": config.LINKEDIN_AUTHOR_URN, "q": "author", "count": 20},
+        timeout=config.HTTP_TIMEOUT,
+    )
+    response.raise_for_status()
+    # The post text starts with the escaped title, see build_commentary
+    prefix = _escape(title)
+    for post in response.json().get("elements", []):
+        urn = post.get("id")
+        if urn and urn not in exclude_urns and post.get("commentary", "").startswith(prefix):
+            return urn, _post_url(urn)
+    return None
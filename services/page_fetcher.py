@@ -0,0 +1,382 @@
+# services/page_fetcher.py
+import base64
+import hashlib
+import ipaddress
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import copy_context
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import httpcore
+import httpx
+from bs4 import BeautifulSoup
+from utils import config
+from utils.cassette import cassette, redact_url
+from .http_pool import RECORDED_HEADERS
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; BloggersTapri/1.0; +https://bloggers-tapri.streamlit.app)"
+NOISE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg"]
+MAX_TEXT_CHARS = 20000
+
+
+def extract_main_text(html: str) -> str:
+    """Main readable text of a page, without navigation and boilerplate"""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+    root = soup.find("article") or soup.find("main") or soup.body or soup
+    text = root.get_text(separator=" ")
+    return re.sub(r"\s+", " ", text).strip()[:MAX_TEXT_CHARS]
+
+
+def best_excerpt(page_text: str, fact: str, max_chars: int = 600) -> str:
+    """Window of sentences from the page that best matches a finding's fact"""
+    fact_words = {w for w in re.findall(r"[a-z0-9]{4,}", fact.lower())}
+    sentences = re.split(r"(?<=[.!?])\s+", page_text)
+    if not sentences or not fact_words:
+        return page_text[:max_chars]
+
+    def overlap(index: int) -> int:
+        return len(fact_words & set(re.findall(r"[a-z0-9]{4,}", sentences[index].lower())))
+
+    best = max(range(len(sentences)), key=overlap)
+    excerpt = sentences[best]
+    after = best + 1
+    while after < len(sentences) and len(excerpt) + len(sentences[after]) < max_chars:
+        excerpt += " " + sentences[after]
+        after += 1
+    return excerpt[:max_chars]
+
+
+def ground_findings(findings: List, fetcher: "PageFetcher") -> List:
+    """Attach the most relevant excerpt of each finding's source page"""
+    pages = fetcher.fetch_pages(finding.source_url for finding in findings)
+    return [
+        finding.with_excerpt(best_excerpt(pages[finding.source_url], finding.fact))
+        if finding.source_url in pages
+        else finding
+        for finding in findings
+    ]
+
+
+class BlockedAddressError(httpcore.ConnectError):
+    """A source URL resolved to an address the server must not fetch from"""
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    # is_global excludes private, loopback, link-local, reserved and shared (CGNAT) ranges
+    return ip.is_global and not ip.is_multicast
+
+
+class PublicAddressBackend(httpcore.NetworkBackend):
+    """
+    Network backend that only connects to hosts resolving to public addresses
+
+    Source URLs come from user notes and model output, so every connection,
+    including each redirect hop, is checked before it leaves the server. The
+    host is resolved once and the checked address is the one dialled, so a
+    rebinding DNS answer cannot swap in a private address after the check.
+    TLS still verifies and sends SNI for the hostname.
+    """
+
+    def __init__(self, inner: Optional[httpcore.NetworkBackend] = None):
+        self.inner = inner or httpcore.SyncBackend()
+
+    def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable] = None,
+    ) -> httpcore.NetworkStream:
+        try:
+            infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except (OSError, UnicodeError) as e:
+            raise httpcore.ConnectError(f"Could not resolve {host}: {e}") from e
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        blocked = [address for address in addresses if not _is_public(address)]
+        if blocked or not addresses:
+            raise BlockedAddressError(
+                f"Refusing to fetch {host}: it resolves to non-public {', '.join(blocked) or 'nothing'}"
+            )
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return self.inner.connect_tcp(
+                    address.split("%", 1)[0],
+                    port,
+                    timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except httpcore.ConnectError as e:
+                last_error = e
+        raise last_error
+
+    def connect_unix_socket(self, path: str, timeout=None, socket_options=None) -> httpcore.NetworkStream:
+        raise BlockedAddressError("Refusing to fetch through a unix socket")
+
+    def sleep(self, seconds: float):
+        self.inner.sleep(seconds)
+
+
+class PublicAddressTransport(httpx.HTTPTransport):
+    """HTTP transport whose connections go through PublicAddressBackend"""
+
+    def __init__(self, limits: httpx.Limits, backend: Optional[httpcore.NetworkBackend] = None):
+        super().__init__(limits=limits)
+        # httpx has no public hook for the network backend, so the pool is rebuilt with it
+        self._pool = httpcore.ConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=PublicAddressBackend(backend),
+        )
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """
+    Transport that records or replays page fetches when a cassette is active
+
+    Recorded bodies are capped at max_bytes, like live fetches, so a huge or
+    endless page is never buffered whole or written to the cassette.
+    """
+
+    def __init__(self, inner: httpx.BaseTransport, max_bytes: int):
+        self.inner = inner
+        self.max_bytes = max_bytes
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not cassette.enabled:
+            return self.inner.handle_request(request)
+        url = redact_url(str(request.url))
+        # A recorded 304 must only answer the same conditional request
+        conditions = [request.headers.get("if-none-match"), request.headers.get("if-modified-since")]
+
+        def live() -> httpx.Response:
+            response = self.inner.handle_request(request)
+            body = bytearray()
+            try:
+                for chunk in response.iter_bytes():
+                    body.extend(chunk)
+                    if len(body) >= self.max_bytes:
+                        del body[self.max_bytes :]
+                        break
+            finally:
+                response.close()
+            # Decoded and possibly cut short, so the original encoding and length no longer apply
+            return httpx.Response(
+                response.status_code,
+                headers={
+                    name: value
+                    for name, value in response.headers.items()
+                    if name.lower() in RECORDED_HEADERS
+                },
+                content=bytes(body),
+                request=request,
+            )
+
+        return cassette.call(
+            cassette.key("page", request.method, url, conditions),
+            live,
+            encode=lambda response: {
+                "status": response.status_code,
+                "headers": {
+                    name: value
+                    for name, value in response.headers.items()
+                    if name.lower() in RECORDED_HEADERS
+                },
+                "body": base64.b64encode(response.content).decode("ascii"),
+            },
+            decode=lambda recorded: httpx.Response(
+                recorded["status"],
+                headers=recorded["headers"],
+                content=base64.b64decode(recorded["body"]),
+                request=request,
+            ),
+            request={"method": request.method, "url": url},
+        )
+
+    def close(self):
+        self.inner.close()
+
+
+class PageFetcher:
+    """
+    Fetch cited pages concurrently over pooled connections
+
+    Each host gets a bounded number of simultaneous requests. Responses are
+    capped in size and cached on disk; stale entries are revalidated with
+    ETag / Last-Modified so unchanged pages cost a 304. Hosts that resolve to
+    private, loopback, link-local or reserved addresses are never fetched.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        timeout: float,
+        max_bytes: int,
+        per_host: int,
+        max_workers: int = 16,
+        cache_ttl: float = 24 * 3600,
+        network_backend: Optional[httpcore.NetworkBackend] = None,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.per_host = per_host
+        self.cache_ttl = cache_ttl
+        os.makedirs(cache_dir, exist_ok=True)
+        limits = httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers)
+        self.client = httpx.Client(
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            transport=CassetteTransport(PublicAddressTransport(limits, network_backend), max_bytes),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+        )
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="page-fetch")
+        # Semaphore and number of fetches using it, per host; hosts come from
+        # model output and user notes, so entries only live while in use
+        self._host_limits: Dict[str, List] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _host_limit(self, url: str) -> Iterator[None]:
+        """Hold one of the host's request slots; a host's entry is dropped once unused"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            entry = self._host_limits.setdefault(host, [threading.BoundedSemaphore(self.per_host), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._host_limits[host]
+
+    def _cache_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _load_cache(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self._cache_path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cache(self, url: str, entry: Dict):
+        path = self._cache_path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # The page was still fetched; it is just fetched again next time
+            logger.warning(f"Could not cache source page {url}: {e}")
+
+    def fetch(self, url: str) -> Optional[str]:
+        """Main text of one page, or None if it could not be fetched"""
+        cached = self._load_cache(url)
+        if cached and time.time() - cached["fetched_at"] < self.cache_ttl:
+            return cached["text"]
+
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            with self._host_limit(url):
+                with self.client.stream("GET", url, headers=headers) as response:
+                    if response.status_code == 304 and cached:
+                        cached["fetched_at"] = time.time()
+                        self._save_cache(url, cached)
+                        return cached["text"]
+                    response.raise_for_status()
+                    if "html" not in response.headers.get("content-type", "html"):
+                        logger.debug(f"Skipping non-HTML source: {url}")
+                        return None
+                    body = bytearray()
+                    for chunk in response.iter_bytes():
+                        body.extend(chunk)
+                        if len(body) >= self.max_bytes:
+                            del body[self.max_bytes :]
+                            logger.debug(f"Truncated {url} at {self.max_bytes} bytes")
+                            break
+                    encoding = response.encoding or "utf-8"
+                    etag = response.headers.get("etag")
+                    last_modified = response.headers.get("last-modified")
+        except (httpx.HTTPError, httpx.InvalidURL) as e:
+            logger.warning(f"Failed to fetch source page {url}: {e}")
+            return cached["text"] if cached else None
+
+        try:
+            html = body.decode(encoding, errors="replace")
+        except LookupError:
+            # The page declared a charset Python does not know
+            html = body.decode("utf-8", errors="replace")
+        text = extract_main_text(html)
+        self._save_cache(
+            url,
+            {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": time.time(),
+                "text": text,
+            },
+        )
+        return text
+
+    def _fetch_one(self, url: str) -> Optional[str]:
+        # One broken page must not cost the rest of the wave their excerpts
+        try:
+            return self.fetch(url)
+        except Exception:
+            logger.exception(f"Unexpected error fetching source page {url}")
+            return None
+
+    def fetch_pages(self, urls: Iterable[str]) -> Dict[str, str]:
+        """Fetch every distinct http(s) URL in one parallel wave"""
+        unique: List[str] = [
+            url for url in dict.fromkeys(urls) if url.startswith(("http://", "https://"))
+        ]
+        if not unique:
+            return {}
+        start = time.monotonic()
+        # Each fetch runs in its own copy of the caller's context, which carries the run id
+        fetched = self.executor.map(
+            lambda item: item[0].run(self._fetch_one, item[1]), [(copy_context(), url) for url in unique]
+        )
+        texts = dict(zip(unique, fetched))
+        pages = {url: text for url, text in texts.items() if text}
+        logger.info(
+            f"Fetched {len(pages)}/{len(unique)} source pages in {time.monotonic() - start:.2f}s"
+        )
+        return pages
+
+
+page_fetcher = PageFetcher(
+    cache_dir=config.PAGE_CACHE_DIR,
+    timeout=config.PAGE_FETCH_TIMEOUT,
+    max_bytes=config.PAGE_MAX_BYTES,
+    per_host=config.PAGE_FETCH_PER_HOST,
+)
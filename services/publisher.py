@@ -0,0 +1,364 @@
+# services/publisher.py
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import copy_context
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from utils.config import config
+from utils.resilience import RateLimiter
+from .devto_api import find_devto_article, publish_to_devto
+from .linkedin_api import find_linkedin_post, linkedin_enabled, publish_to_linkedin
+
+logger = logging.getLogger(__name__)
+
+# Publish states, in the order a job goes through them
+QUEUED, CHECKING, SENDING, DONE, FAILED, SKIPPED = (
+    "queued", "checking", "sending", "done", "failed", "skipped"
+)
+FINISHED_STATES = {DONE, FAILED, SKIPPED}
+# Finished statuses stay visible this long before they are pruned
+STATUS_RETENTION_SECONDS = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS publications (
+    run_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    remote_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    published INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, platform)
+);
+-- Creates sent without a confirmed response; reconciled before the next publish
+CREATE TABLE IF NOT EXISTS pending_publications (
+    run_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    PRIMARY KEY (run_id, platform)
+);
+"""
+
+
+@dataclass
+class PublishJob:
+    run_id: str
+    title: str
+    content: str
+    tags: str
+    published: bool
+    image_path: Optional[str] = None
+    image_id: Optional[str] = None
+    # Only held in memory for the duration of the publish
+    api_key: Optional[str] = field(default=None, repr=False)
+
+
+@dataclass
+class PublishStatus:
+    platform: str
+    state: str = QUEUED
+    published: bool = False
+    url: Optional[str] = None
+    error: Optional[str] = None
+    # True when an article the run created earlier was updated
+    updated: bool = False
+    changed_at: float = field(default_factory=time.time)
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+
+@dataclass(frozen=True)
+class PublishTarget:
+    """
+    A platform the queue publishes to
+
+    send(job, remote_id, limiter) creates the article when remote_id is None
+    and updates it otherwise, returning the article's id and URL. find(job,
+    known_ids, limiter) looks up an article created for the job whose create
+    response was lost. account(job) names the credentials the platform rate
+    limits by.
+    """
+
+    name: str
+    label: str
+    send: Callable[[PublishJob, Optional[str], Optional[RateLimiter]], Tuple[str, str]]
+    find: Callable[[PublishJob, Set[str], Optional[RateLimiter]], Optional[Tuple[str, str]]]
+    account: Callable[[PublishJob], str]
+    enabled: Callable[[], bool] = lambda: True
+    drafts: bool = True
+
+
+def _send_devto(job: PublishJob, remote_id: Optional[str], limiter: Optional[RateLimiter]) -> Tuple[str, str]:
+    response = publish_to_devto(
+        api_key=job.api_key,
+        title=job.title,
+        content=job.content,
+        image_path=job.image_path,
+        image_id=job.image_id,
+        published=job.published,
+        tags=job.tags,
+        article_id=remote_id,
+        limiter=limiter,
+    )
+    return str(response["id"]), response["url"]
+
+
+def _send_linkedin(job: PublishJob, remote_id: Optional[str], limiter: Optional[RateLimiter]) -> Tuple[str, str]:
+    response = publish_to_linkedin(job.title, job.content, job.tags, post_urn=remote_id, limiter=limiter)
+    return response["id"], response["url"]
+
+
+TARGETS = [
+    PublishTarget(
+        "devto",
+        "DEV.to",
+        _send_devto,
+        find=lambda job, known, limiter: find_devto_article(job.api_key, job.title, known, limiter),
+        # dev.to limits each API key
+        account=lambda job: job.api_key or os.getenv("DEV_TO_API_KEY") or "",
+    ),
+    # LinkedIn posts are public as soon as they exist, so drafts are not sent there
+    PublishTarget(
+        "linkedin",
+        "LinkedIn",
+        _send_linkedin,
+        find=lambda job, known, limiter: find_linkedin_post(job.title, known, limiter),
+        account=lambda job: config.LINKEDIN_ACCESS_TOKEN or "",
+        enabled=linkedin_enabled,
+        drafts=False,
+    ),
+]
+
+
+class PublishQueue:
+    """
+    Publishes a run to several platforms concurrently, once per platform
+
+    The remote id of every article is stored per run and platform, so
+    publishing a run again updates its article instead of creating another.
+    Publishes of the same run to the same platform are serialized, every
+    request attempt counts against the rate limit of the account it uses, and
+    status is kept for the UI to poll until a while after it finishes. A
+    create is marked pending before it is sent, so one whose response was
+    lost is found on the platform instead of being created again.
+    """
+
+    def __init__(self, db_path: str, targets: List[PublishTarget], max_workers: int = 4):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.targets = {target.name: target for target in targets}
+        self._rate_limits = config.PUBLISH_RATE_LIMITS
+        # One limiter per platform and account, created on first use
+        self._limiters: Dict[Tuple[str, str], RateLimiter] = {}
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        # Lock and number of publishes using it, per run and platform
+        self._article_locks: Dict[Tuple[str, str], List] = {}
+        self._statuses: Dict[str, Dict[str, PublishStatus]] = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="publish")
+
+    def available(self) -> List[PublishTarget]:
+        return [target for target in self.targets.values() if target.enabled()]
+
+    def remote(self, run_id: str, platform: str) -> Optional[Dict[str, str]]:
+        """The article a run already has on a platform, if any"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT remote_id, url, published FROM publications WHERE run_id = ? AND platform = ?",
+                (run_id, platform),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"remote_id": row[0], "url": row[1], "published": bool(row[2])}
+
+    def status(self, run_id: str) -> Dict[str, PublishStatus]:
+        with self._lock:
+            return {name: replace(status) for name, status in self._statuses.get(run_id, {}).items()}
+
+    def in_flight(self, run_id: str) -> bool:
+        return any(not status.finished for status in self.status(run_id).values())
+
+    def submit(self, job: PublishJob, platforms: List[str]) -> Dict[str, Future]:
+        """Queue the job for each platform and return right away"""
+        self._prune_statuses()
+        futures = {}
+        for name in platforms:
+            target = self.targets[name]
+            self._set_status(job.run_id, name, QUEUED, published=job.published)
+            # Run in the caller's context so the publish logs carry the run id
+            futures[name] = self.executor.submit(copy_context().run, self._publish, job, target)
+        return futures
+
+    def _set_status(self, run_id: str, platform: str, state: str, **changes):
+        with self._lock:
+            statuses = self._statuses.setdefault(run_id, {})
+            if state == QUEUED or platform not in statuses:
+                statuses[platform] = PublishStatus(platform)
+            status = statuses[platform]
+            status.state = state
+            status.changed_at = time.time()
+            for name, value in changes.items():
+                setattr(status, name, value)
+
+    def _prune_statuses(self):
+        """Forget runs whose publishes all finished a while ago"""
+        cutoff = time.time() - STATUS_RETENTION_SECONDS
+        with self._lock:
+            for run_id in list(self._statuses):
+                statuses = self._statuses[run_id].values()
+                if all(status.finished and status.changed_at < cutoff for status in statuses):
+                    del self._statuses[run_id]
+
+    @contextmanager
+    def _article_guard(self, run_id: str, platform: str) -> Iterator[None]:
+        """Serialize publishes of one run to one platform; the lock is dropped once unused"""
+        key = (run_id, platform)
+        with self._lock:
+            entry = self._article_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._article_locks[key]
+
+    def _limiter(self, target: PublishTarget, job: PublishJob) -> Optional[RateLimiter]:
+        """The rate limiter of the account the job publishes with"""
+        limits = self._rate_limits.get(target.name)
+        if limits is None:
+            return None
+        # Keyed by a digest so credentials are not kept around as dict keys
+        account = hashlib.sha256(target.account(job).encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            for key in [key for key, limiter in self._limiters.items() if limiter.idle]:
+                del self._limiters[key]
+            limiter = self._limiters.get((target.name, account))
+            if limiter is None:
+                limiter = RateLimiter(int(limits["requests"]), float(limits["per_seconds"]))
+                self._limiters[(target.name, account)] = limiter
+            return limiter
+
+    def _pending(self, run_id: str, platform: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM pending_publications WHERE run_id = ? AND platform = ?",
+                (run_id, platform),
+            ).fetchone()
+        return row is not None
+
+    def _mark_pending(self, run_id: str, platform: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pending_publications (run_id, platform, started_at) VALUES (?, ?, ?)",
+                (run_id, platform, time.time()),
+            )
+
+    def _clear_pending(self, run_id: str, platform: str):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM pending_publications WHERE run_id = ? AND platform = ?",
+                (run_id, platform),
+            )
+
+    def _save(self, job: PublishJob, platform: str, remote_id: str, url: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO publications (run_id, platform, remote_id, url, published, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (run_id, platform) DO UPDATE SET "
+                "remote_id = excluded.remote_id, url = excluded.url, "
+                "published = excluded.published, updated_at = excluded.updated_at",
+                (job.run_id, platform, remote_id, url, int(job.published), time.time()),
+            )
+            self._db.execute(
+                "DELETE FROM pending_publications WHERE run_id = ? AND platform = ?",
+                (job.run_id, platform),
+            )
+
+    def _reconcile(
+        self, job: PublishJob, target: PublishTarget, limiter: Optional[RateLimiter]
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Find the article of a create whose response never arrived
+
+        Articles other runs already own are excluded. Returns None when the
+        create never reached the platform; lookup errors propagate so the
+        pending marker is kept for the next attempt.
+        """
+        with self._lock:
+            known = {
+                row[0]
+                for row in self._db.execute(
+                    "SELECT remote_id FROM publications WHERE platform = ?", (target.name,)
+                )
+            }
+        found = target.find(job, known, limiter)
+        if found is not None:
+            self._save(job, target.name, *found)
+            logger.info(f"Recovered {target.label} article {found[0]} for run {job.run_id}")
+        return found
+
+    def _publish(self, job: PublishJob, target: PublishTarget):
+        if not target.enabled():
+            self._set_status(job.run_id, target.name, SKIPPED, error=f"{target.label} is not configured")
+            return
+        if not job.published and not target.drafts:
+            self._set_status(job.run_id, target.name, SKIPPED, error=f"{target.label} only receives live posts")
+            return
+
+        with self._article_guard(job.run_id, target.name):
+            limiter = self._limiter(target, job)
+            existing = self.remote(job.run_id, target.name)
+            if existing is None and self._pending(job.run_id, target.name):
+                # An earlier create may have landed without us hearing back
+                self._set_status(job.run_id, target.name, CHECKING)
+                try:
+                    found = self._reconcile(job, target, limiter)
+                except Exception as e:
+                    logger.warning(f"Checking run {job.run_id} on {target.label} failed: {e}")
+                    self._set_status(job.run_id, target.name, FAILED, error=str(e))
+                    return
+                if found is None:
+                    self._clear_pending(job.run_id, target.name)
+                existing = self.remote(job.run_id, target.name)
+
+            self._set_status(job.run_id, target.name, SENDING)
+            if existing is None:
+                # Recorded before sending so a lost response is reconciled instead of duplicated
+                self._mark_pending(job.run_id, target.name)
+            try:
+                remote_id, url = target.send(job, existing["remote_id"] if existing else None, limiter)
+            except Exception as e:
+                logger.warning(f"Publishing run {job.run_id} to {target.label} failed: {e}")
+                if existing is None:
+                    try:
+                        found = self._reconcile(job, target, limiter)
+                    except Exception as lookup_error:
+                        logger.warning(f"Checking run {job.run_id} on {target.label} failed: {lookup_error}")
+                        found = None
+                    if found is not None:
+                        self._set_status(job.run_id, target.name, DONE, url=found[1], updated=False, error=None)
+                        return
+                self._set_status(job.run_id, target.name, FAILED, error=str(e))
+                return
+
+            self._save(job, target.name, remote_id, url)
+            self._set_status(
+                job.run_id, target.name, DONE, url=url, updated=existing is not None, error=None
+            )
+            logger.info(
+                f"{'Updated' if existing else 'Created'} {target.label} article {remote_id} for run {job.run_id}"
+            )
+
+
+publish_queue = PublishQueue(config.PUBLISH_DB_PATH, TARGETS)
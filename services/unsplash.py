@@ -1,18 +1,26 @@
 import os
 import requests
 import logging
-from urllib.parse import quote
+from typing import Optional
 from utils import Config, config
+from utils.resilience import call_with_resilience
+from .http_pool import http_session
+from .image_store import image_store
 
 logger = logging.getLogger(__name__)
 
 UNSPLASH_ACCESS_KEY = config.UNSPLASH_ACCESS_KEY
-UNSPLASH_URL = "https://api.unsplash.com/photos/random"
+UNSPLASH_URL = f"{config.UNSPLASH_API_URL}/photos/random"
 
-SAVE_DIR = os.path.join("outputs", "images")
-os.makedirs(SAVE_DIR, exist_ok=True)
+DEFAULT_BANNER = os.path.join("assets", "default_banner.png")
 
-def fetch_banner(topic: str) -> str:
+def _get_checked(url: str, **kwargs) -> requests.Response:
+    response = http_session.get(url, timeout=config.HTTP_TIMEOUT, **kwargs)
+    response.raise_for_status()
+    return response
+
+def fetch_banner(topic: str, owner: Optional[str] = None) -> Optional[str]:
+    """Fetch a banner for the topic into the image store and return its id, or None"""
     headers = {
         "Accept-Version": "v1",
         "Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"
@@ -25,23 +33,38 @@ def fetch_banner(topic: str) -> str:
 
     try:
         logger.info(f"🔍 Searching Unsplash for: {topic}")
-        response = requests.get(UNSPLASH_URL, headers=headers, params=params)
-        response.raise_for_status()
+        response = call_with_resilience(
+            "unsplash:random",
+            _get_checked,
+            UNSPLASH_URL,
+            headers=headers,
+            params=params,
+        )
 
         data = response.json()
         image_url = data["urls"]["regular"]
         author = data["user"]["name"]
 
-        image_data = requests.get(image_url).content
-        filename = f"{quote(topic)}.jpg"
-        save_path = os.path.join(SAVE_DIR, filename)
-
-        with open(save_path, "wb") as f:
-            f.write(image_data)
+        image_data = call_with_resilience("unsplash:image", _get_checked, image_url).content
+        image = image_store.put(
+            image_data,
+            owner=owner,
+            keyword=topic,
+            photographer=author,
+            source_url=data.get("links", {}).get("html", image_url),
+        )
 
-        logger.info(f"✅ Banner saved: {save_path} (by {author})")
-        return save_path
+        logger.info(f"✅ Banner stored: {image.digest[:12]} (by {author})")
+        return image.digest
 
     except Exception as e:
         logger.error(f"❌ Failed to fetch banner: {e}")
-        return os.path.join("assets", "default_banner.png")
+        return None
+
+def banner_path(image_id: Optional[str], preview: bool = False) -> str:
+    """Local file of a stored banner, falling back to the default banner"""
+    if preview:
+        path = image_store.thumbnail(image_id, config.IMAGE_PREVIEW_WIDTH)
+    else:
+        path = image_store.path(image_id)
+    return path or DEFAULT_BANNER
@@ -0,0 +1,18 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+# Modules open their databases and caches on import; keep those out of the working tree
+_workdir = tempfile.mkdtemp(prefix="blog-tests-")
+for name, filename in {
+    "USAGE_DB_PATH": "usage.sqlite3",
+    "PUBLISH_DB_PATH": "publish.sqlite3",
+    "IMAGE_STORE_DIR": "images",
+    "PAGE_CACHE_DIR": "pages",
+    "LOG_PATH": "app.log",
+}.items():
+    os.environ[name] = os.path.join(_workdir, filename)
+os.environ["RECORD_MODE"] = "off"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,51 @@
+# tests/test_blog_tab.py
+import json
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+# The tab imports the Unsplash client, which reads its key on import; no request is made
+os.environ.setdefault("UNSPLASH_ACCESS_KEY", "test")
+
+from components import blog_tab  # noqa: E402
+from utils import content_hash  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    for cached in (blog_tab._markdown_payload, blog_tab._preview_body, blog_tab._tags_html):
+        cached.clear()
+
+
+def test_content_hash_separates_its_parts():
+    assert content_hash("ab", "c") != content_hash("a", "bc")
+    assert content_hash("a", None) == content_hash("a", "")
+    assert len(content_hash("blog")) == 16
+
+
+def test_payloads_are_built_once_per_version():
+    blog = "# Title\n\nBody"
+    version = content_hash(blog)
+    assert blog_tab._markdown_payload(version, blog) == blog.encode("utf-8")
+    # The unhashed argument is ignored: same version, same cached payload
+    assert blog_tab._markdown_payload(version, "changed") == blog.encode("utf-8")
+    assert blog_tab._markdown_payload(content_hash("changed"), "changed") == b"changed"
+
+
+def test_structured_blog_is_exported_as_json():
+    blog = {"final": "text"}
+    payload = blog_tab._markdown_payload(content_hash(str(blog)), blog)
+    assert json.loads(payload) == blog
+
+
+def test_preview_follows_the_edited_blog():
+    assert blog_tab._preview_body(content_hash("v1"), "v1") == "v1"
+    assert blog_tab._preview_body(content_hash("v1"), "stale") == "v1"
+    assert blog_tab._preview_body(content_hash("v2"), "v2") == "v2"
+    assert blog_tab._preview_body(content_hash("None"), None) == ""
+
+
+def test_tags_render_as_badges():
+    html = blog_tab._tags_html("ai,machine-learning")
+    assert html.count("<span") == 2 and ">machine-learning</span>" in html
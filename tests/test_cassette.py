@@ -0,0 +1,108 @@
+# tests/test_cassette.py
+import importlib
+
+import pytest
+
+from utils.cassette import Cassette, CassetteMiss, redact_url
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    recorder = Cassette(path, "record", latency_scale=0)
+    key = Cassette.key("search", "ai security", 5)
+    encode = lambda value: sorted(value)  # noqa: E731
+    assert recorder.call(key, lambda: {"b", "a"}, encode=encode, request={"query": "ai security"}) == {"a", "b"}
+
+    player = Cassette(path, "replay", latency_scale=0)
+    replayed = player.call(key, lambda: pytest.fail("replay must not run live"), decode=set)
+    assert replayed == {"a", "b"}
+
+
+def test_repeated_calls_replay_in_order_then_repeat_the_last(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    recorder = Cassette(path, "record", latency_scale=0)
+    key = Cassette.key("model", "draft", "prompt")
+    for answer in ("first", "second"):
+        recorder.call(key, lambda: answer)
+
+    player = Cassette(path, "replay", latency_scale=0)
+    assert [player.call(key, lambda: None) for _ in range(3)] == ["first", "second", "second"]
+
+
+def test_unrecorded_calls_miss(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    Cassette(path, "record", latency_scale=0).call(Cassette.key("search", "a"), lambda: [])
+    player = Cassette(path, "replay", latency_scale=0)
+    with pytest.raises(CassetteMiss):
+        player.call(Cassette.key("search", "b"), lambda: [])
+
+
+def test_replay_needs_a_cassette(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Cassette(str(tmp_path / "missing.jsonl"), "replay", latency_scale=0)
+
+
+def test_kinds_outside_the_cassette_run_live(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    recorder = Cassette(path, "record", latency_scale=0, kinds={"model"})
+    assert recorder.call(Cassette.key("page", "url"), lambda: "live") == "live"
+    assert not (tmp_path / "cassette.jsonl").exists()
+
+
+def test_secrets_are_redacted_from_urls():
+    url = redact_url("https://api.example.com/upload?key=secret&name=banner")
+    assert "secret" not in url
+    assert "name=banner" in url
+
+
+def test_page_transport_round_trip(tmp_path, monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("bs4")
+    # services.page_fetcher names the fetcher instance, not the module
+    page_fetcher = importlib.import_module("services.page_fetcher")
+
+    path = str(tmp_path / "cassette.jsonl")
+    served = []
+
+    def handler(request):
+        served.append(request)
+        return httpx.Response(200, headers={"ETag": '"v1"', "Set-Cookie": "session=1"}, content=b"\x00page")
+
+    monkeypatch.setattr(page_fetcher, "cassette", Cassette(path, "record", latency_scale=0))
+    with httpx.Client(transport=page_fetcher.CassetteTransport(httpx.MockTransport(handler), max_bytes=1000)) as client:
+        client.get("https://example.com/article?token=secret")
+
+    monkeypatch.setattr(page_fetcher, "cassette", Cassette(path, "replay", latency_scale=0))
+    with httpx.Client(transport=page_fetcher.CassetteTransport(httpx.MockTransport(handler), max_bytes=1000)) as client:
+        response = client.get("https://example.com/article?token=secret")
+        assert response.content == b"\x00page"
+        assert response.headers["etag"] == '"v1"'
+        assert "set-cookie" not in response.headers
+        # A conditional request was never recorded
+        with pytest.raises(CassetteMiss):
+            client.get("https://example.com/article?token=secret", headers={"If-None-Match": '"v1"'})
+    assert len(served) == 1
+    assert "secret" not in (tmp_path / "cassette.jsonl").read_text()
+
+
+def test_page_transport_records_at_most_max_bytes(tmp_path, monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("bs4")
+    page_fetcher = importlib.import_module("services.page_fetcher")
+
+    def endless():
+        while True:
+            yield b"x" * 4096
+
+    def handler(request):
+        return httpx.Response(200, headers={"Content-Type": "text/html"}, content=endless())
+
+    path = tmp_path / "cassette.jsonl"
+    monkeypatch.setattr(page_fetcher, "cassette", Cassette(str(path), "record", latency_scale=0))
+    transport = page_fetcher.CassetteTransport(httpx.MockTransport(handler), max_bytes=10_000)
+    with httpx.Client(transport=transport) as client:
+        assert len(client.get("https://example.com/endless").content) == 10_000
+
+    monkeypatch.setattr(page_fetcher, "cassette", Cassette(str(path), "replay", latency_scale=0))
+    with httpx.Client(transport=transport) as client:
+        assert len(client.get("https://example.com/endless").content) == 10_000
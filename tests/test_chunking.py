@@ -0,0 +1,23 @@
+# tests/test_chunking.py
+from utils.prompt_budget import chunk_text, estimate_tokens
+
+
+def test_chunks_respect_the_budget_and_keep_everything():
+    text = "\n\n".join(f"## Part {i}\n\n" + "A sentence about attacks. " * 30 for i in range(5))
+    chunks = chunk_text(text, max_tokens=100)
+    assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)
+    assert "".join(chunks).replace("\n", "").replace(" ", "") == text.replace("\n", "").replace(" ", "")
+
+
+def test_chunks_break_between_sentences():
+    text = "## One\n\n" + "First point here. Second point there. " * 10
+    chunks = chunk_text(text, max_tokens=20)
+    assert len(chunks) > 1
+    assert all(chunk.endswith(("One", ".")) for chunk in chunks)
+
+
+def test_overlong_sentences_are_split_without_loss():
+    sentence = "x" * 1000
+    chunks = chunk_text(sentence, max_tokens=50)
+    assert "".join(chunks) == sentence
+    assert max(len(chunk) for chunk in chunks) == 200
@@ -0,0 +1,51 @@
+# tests/test_citations.py
+from utils.citations import link_citations, strip_citations
+from utils.helpers import parse_references
+
+FINDINGS = [
+    {"fact": "Graph neural networks detect lateral movement", "source_url": "https://a.example/gnn"},
+    {"fact": "Phishing causes most breaches", "source_url": "https://b.example/dbir"},
+    {"fact": "Phishing emails trick employees", "source_url": "https://b.example/dbir"},
+    {"fact": "Our team saw fewer incidents", "source_url": "User Provided"},
+]
+
+BLOG = """# Title
+
+Phishing causes most breaches today. Attackers keep improving.
+
+Graph neural networks detect lateral movement in networks.
+
+```
+Phishing causes most breaches in code blocks too.
+```
+"""
+
+
+def test_findings_are_cited_at_their_best_sentence():
+    linked = link_citations(BLOG, FINDINGS)
+    assert "Phishing causes most breaches today.[^1] Attackers" in linked
+    assert "lateral movement in networks.[^2]" in linked
+    # Code blocks and headings are never cited
+    assert "too.[^" not in linked and "# Title[^" not in linked
+
+
+def test_findings_sharing_a_source_share_a_footnote():
+    blog = "Phishing causes most breaches. Phishing emails trick employees daily."
+    linked = link_citations(blog, FINDINGS)
+    assert linked.count("[^1]") == 3
+    assert parse_references(linked) == {"1": "Phishing causes most breaches. https://b.example/dbir"}
+
+
+def test_user_notes_are_labelled_as_user_provided():
+    linked = link_citations("Our team saw fewer incidents this year.", FINDINGS)
+    assert parse_references(linked) == {"1": "Our team saw fewer incidents. (User Provided)"}
+
+
+def test_unmatched_findings_leave_the_blog_alone():
+    assert link_citations("Nothing relevant here.", FINDINGS) == "Nothing relevant here."
+
+
+def test_relinking_is_stable():
+    linked = link_citations(BLOG, FINDINGS)
+    assert strip_citations(linked) == BLOG.rstrip()
+    assert link_citations(linked, FINDINGS) == linked
@@ -0,0 +1,77 @@
+# tests/test_exporter.py
+import io
+import json
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from services import exporter
+from services.exporter import BundleExporter, export_to_path
+
+MARKDOWN = "Intro sentence.[^1]\n\n## References\n\n[^1]: A fact. https://example.com\n"
+RESEARCH = {"topic": "ai", "key_findings": [{"fact": "A fact", "source_url": "https://example.com"}]}
+
+
+def content(tmp_path, **extra):
+    banner = tmp_path / "banner.png"
+    banner.write_bytes(b"\x89PNG fake")
+    values = {"markdown": MARKDOWN, "research": RESEARCH, "image_path": str(banner), "metadata": {"run_id": "r1"}}
+    values.update(extra)
+    return values
+
+
+def test_bundle_holds_every_part(tmp_path):
+    path = tmp_path / "bundle.zip"
+    export_to_path(str(path), **content(tmp_path))
+    with zipfile.ZipFile(path) as bundle:
+        assert set(bundle.namelist()) == {
+            "blog.md", "research.json", "references.md", "banner.png", "metadata.json"
+        }
+        assert json.loads(bundle.read("research.json")) == RESEARCH
+        assert bundle.read("references.md").decode() == "[^1]: A fact. https://example.com\n"
+        assert json.loads(bundle.read("metadata.json"))["run_id"] == "r1"
+
+
+def test_chunks_stream_the_cached_bundle(tmp_path, monkeypatch):
+    monkeypatch.setattr(exporter, "CHUNK_BYTES", 64)
+    bundles = BundleExporter()
+    size = bundles.build("v1", **content(tmp_path))
+    chunks = list(bundles.chunks("v1"))
+    assert len(chunks) > 1
+    assert b"".join(chunks) == bundles.read("v1")
+    assert len(b"".join(chunks)) == size
+
+    target = io.BytesIO()
+    assert bundles.copy_to("v1", target)
+    assert target.getvalue() == bundles.read("v1")
+    assert bundles.chunks("missing") is None
+
+
+def test_eviction_does_not_cut_a_reader_short(tmp_path, monkeypatch):
+    monkeypatch.setattr(exporter, "CHUNK_BYTES", 64)
+    bundles = BundleExporter(max_cached=1)
+    bundles.build("v1", **content(tmp_path))
+    expected = bundles.read("v1")
+    reader = bundles.chunks("v1")
+    first = next(reader)
+    bundles.build("v2", **content(tmp_path, markdown="Other blog."))
+    assert not bundles.has("v1")
+    assert first + b"".join(reader) == expected
+
+
+def test_concurrent_builds_of_a_version_pack_it_once(tmp_path, monkeypatch):
+    calls = []
+    real_write = exporter.write_bundle
+
+    def slow_write(target, **values):
+        calls.append(1)
+        # Slow enough for the other builds to arrive while this one runs
+        time.sleep(0.2)
+        real_write(target, **values)
+
+    monkeypatch.setattr(exporter, "write_bundle", slow_write)
+    bundles = BundleExporter()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        sizes = list(pool.map(lambda _: bundles.build("v1", **content(tmp_path)), range(4)))
+    assert len(calls) == 1
+    assert len(set(sizes)) == 1
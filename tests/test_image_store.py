@@ -0,0 +1,63 @@
+# tests/test_image_store.py
+import os
+
+from services.image_store import ImageStore
+
+
+def _store(tmp_path, quota_bytes=250, ref_ttl_seconds=3600):
+    return ImageStore(str(tmp_path / "images"), quota_bytes, ref_ttl_seconds)
+
+
+def test_same_content_is_stored_once(tmp_path):
+    store = _store(tmp_path)
+    first = store.put(b"a" * 100, keyword="ai", owner="run-1")
+    second = store.put(b"a" * 100, keyword="ai", owner="run-2")
+    assert first is second
+    assert set(first.refs) == {"run-1", "run-2"}
+    objects = [f for _, _, files in os.walk(tmp_path / "images" / "objects") for f in files]
+    assert objects == [f"{first.digest}.jpg"]
+
+
+def test_least_recently_used_unreferenced_image_is_evicted(tmp_path):
+    store = _store(tmp_path)
+    old = store.put(b"a" * 100)
+    recent = store.put(b"b" * 100)
+    old.last_access, recent.last_access = 1.0, 2.0
+    new = store.put(b"c" * 100)
+    assert store.get(old.digest) is None
+    assert not os.path.exists(os.path.join(store.root, "objects", old.digest[:2], f"{old.digest}.jpg"))
+    assert store.get(recent.digest) is recent and store.get(new.digest) is new
+
+
+def test_referenced_images_are_kept_until_released(tmp_path):
+    store = _store(tmp_path)
+    pinned = store.put(b"a" * 100, owner="run-1")
+    pinned.last_access = 0.0
+    store.put(b"b" * 100)
+    store.put(b"c" * 100)
+    assert store.get(pinned.digest) is pinned
+
+    store.release(pinned.digest, "run-1")
+    store.put(b"d" * 100)
+    assert store.get(pinned.digest) is None
+
+
+def test_abandoned_references_expire(tmp_path):
+    store = _store(tmp_path, ref_ttl_seconds=60)
+    stale = store.put(b"a" * 100, owner="closed-session")
+    stale.refs["closed-session"] -= 120
+    stale.last_access = 0.0
+    store.put(b"b" * 100)
+    store.put(b"c" * 100)
+    assert store.get(stale.digest) is None
+
+
+def test_index_survives_a_restart(tmp_path):
+    store = _store(tmp_path)
+    image = store.put(b"a" * 100, keyword="quantum", photographer="Ada", owner="run-1")
+    reloaded = _store(tmp_path)
+    assert reloaded.get(image.digest).photographer == "Ada"
+    assert reloaded.path(image.digest) == store.path(image.digest)
+
+    os.remove(store.path(image.digest))
+    assert _store(tmp_path).get(image.digest) is None
@@ -0,0 +1,47 @@
+# tests/test_keyphrases.py
+from utils.keyphrases import extract_keyphrases, extract_post_metadata, strip_markdown
+
+TOPIC = "AI-powered cybersecurity using graph neural networks for attack prediction models"
+
+
+def test_three_word_phrases_are_tagged_with_one_whole_sub_phrase():
+    keyword, tags = extract_post_metadata(TOPIC, "", [])
+    assert keyword == "graph neural networks"
+    tags = tags.split(",")
+    assert "neural-networks" in tags
+    # No leftover fragment of the same phrase
+    assert not {"graph", "graph-neural", "networks"} & set(tags)
+
+
+def test_sub_phrases_seen_on_their_own_win():
+    markdown = "Graph neural networks learn from alerts. Neural networks need labelled attacks."
+    _, tags = extract_post_metadata("Graph neural networks", markdown, [])
+    assert tags.split(",")[0] == "neural-networks"
+
+
+def test_heading_boilerplate_never_becomes_a_tag():
+    markdown = "## Intro\nThreat intelligence helps.\n\n## Conclusion\nThreat intelligence matters."
+    _, tags = extract_post_metadata("Threat intelligence", markdown, [])
+    assert tags == "threat-intelligence"
+
+
+def test_common_single_words_are_not_tags():
+    _, tags = extract_post_metadata("AI-powered cybersecurity systems", "", [])
+    assert tags == "ai-powered-cybersecurity"
+
+
+def test_tags_are_capped():
+    findings = [{"fact": "Zero trust architecture reduces lateral movement"}]
+    _, tags = extract_post_metadata(TOPIC, "Ransomware gangs target hospitals.", findings, max_tags=2)
+    assert len(tags.split(",")) == 2
+
+
+def test_repeated_rare_phrases_rank_first():
+    text = "Kubernetes operators. Kubernetes operators. The data is important."
+    assert extract_keyphrases(text, top_n=1)[0][0] == "kubernetes operators"
+
+
+def test_markdown_noise_is_stripped():
+    text = strip_markdown("Body [link](https://x.example) `code`[^1]\n\n## References\n[^1]: Source")
+    assert "https" not in text and "code" not in text and "Source" not in text
+    assert "link" in text
@@ -0,0 +1,40 @@
+# tests/test_lazy.py
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    root = tmp_path / "lazypkg"
+    root.mkdir()
+    (root / "__init__.py").write_text(
+        "from utils.lazy import lazy_exports\n"
+        "VERSION = 1\n"
+        "lazy_exports(__name__, globals(), {'heavy': ['Heavy', 'helper']}, eager=['VERSION'])\n"
+    )
+    (root / "heavy.py").write_text("class Heavy:\n    pass\n\ndef helper():\n    return 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield __import__("lazypkg")
+    for name in ("lazypkg", "lazypkg.heavy"):
+        sys.modules.pop(name, None)
+
+
+def test_submodule_is_imported_on_first_access(package):
+    assert "lazypkg.heavy" not in sys.modules
+    assert package.helper() == 42
+    assert "lazypkg.heavy" in sys.modules
+    # Cached in the namespace, so __getattr__ is not hit again
+    assert vars(package)["helper"] is sys.modules["lazypkg.heavy"].helper
+    assert "Heavy" not in vars(package)
+
+
+def test_exports_are_listed(package):
+    assert package.__all__ == ["VERSION", "Heavy", "helper"]
+    assert {"Heavy", "helper", "VERSION"} <= set(dir(package))
+    assert "lazypkg.heavy" not in sys.modules
+
+
+def test_unknown_names_raise_attribute_error(package):
+    with pytest.raises(AttributeError, match="has no attribute 'missing'"):
+        package.missing
@@ -0,0 +1,62 @@
+# tests/test_logger.py
+import importlib
+import json
+import logging
+
+import pytest
+
+pytest.importorskip("loguru")
+
+from loguru import logger  # noqa: E402
+
+# utils re-exports the loguru logger under its submodule's name
+logging_setup = importlib.import_module("utils.logger")
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    path = tmp_path / "app.jsonl"
+    monkeypatch.setenv("LOG_PATH", str(path))
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    yield path
+    monkeypatch.undo()
+    logging_setup.setup_logging()
+
+
+def _records(path):
+    logger.complete()
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["record"] for line in f]
+
+
+def test_records_carry_the_run_id_of_their_context(log_file):
+    logging_setup.setup_logging()
+    token = logging_setup.run_id_var.set("run-42")
+    try:
+        logging.getLogger("services.demo").info("from stdlib")
+        logger.info("from loguru")
+    finally:
+        logging_setup.run_id_var.reset(token)
+    logger.info("outside a run")
+
+    records = {r["message"]: r for r in _records(log_file)}
+    assert records["from stdlib"]["extra"]["run_id"] == "run-42"
+    # The stdlib caller is kept rather than the intercept handler
+    assert records["from stdlib"]["function"] == "test_records_carry_the_run_id_of_their_context"
+    assert records["from loguru"]["extra"]["run_id"] == "run-42"
+    assert records["outside a run"]["extra"]["run_id"] == "-"
+
+
+def test_bound_run_id_wins(log_file):
+    logging_setup.setup_logging()
+    logger.bind(run_id="explicit").info("bound")
+    assert _records(log_file)[0]["extra"]["run_id"] == "explicit"
+
+
+def test_debug_records_are_sampled(log_file, monkeypatch):
+    monkeypatch.setenv("LOG_DEBUG_SAMPLE_RATE", "0")
+    logging_setup.setup_logging()
+    logging.getLogger("services.demo").debug("dropped")
+    logger.debug("dropped too")
+    logging.getLogger("services.demo").warning("kept")
+    assert [r["message"] for r in _records(log_file)] == ["kept"]
@@ -0,0 +1,46 @@
+# tests/test_metadata.py
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("agno")
+
+from agents.metadata_agent import PostMetadata  # noqa: E402
+from services.agno import AgnoService  # noqa: E402
+
+
+class FakeRunner:
+    def __init__(self, content):
+        self.content = content
+        self.prompts = []
+
+    def run(self, prompt, stream=False):
+        self.prompts.append(prompt)
+        return SimpleNamespace(content=self.content)
+
+
+def _service(content) -> AgnoService:
+    # Only the metadata runner is needed, so skip building the other agents
+    service = AgnoService.__new__(AgnoService)
+    service.metadata_agent = FakeRunner(content)
+    return service
+
+
+def test_keyword_and_tags_come_from_one_call():
+    service = _service(PostMetadata(keyword=" neural networks ", tags=["Machine Learning", "AI!", "ai"]))
+    assert service.generate_metadata("Neural networks") == ("neural networks", "machine-learning,ai")
+    assert service.metadata_agent.prompts == ["Blog topic: Neural networks"]
+
+
+def test_fenced_json_responses_are_accepted():
+    service = _service('```json\n{"keyword": "quantum chips", "tags": ["quantum", "hardware"]}\n```')
+    assert service.generate_metadata("Quantum") == ("quantum chips", "quantum,hardware")
+
+
+@pytest.mark.parametrize(
+    "content",
+    ['{"keyword": "quantum"}', "not json", PostMetadata(keyword=" ", tags=["x"]), PostMetadata(keyword="x", tags=["!!"])],
+)
+def test_invalid_or_incomplete_metadata_raises(content):
+    with pytest.raises(ValueError):
+        _service(content).generate_metadata("Quantum")
@@ -0,0 +1,109 @@
+# tests/test_model_router.py
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("agno")
+
+from agno.agent import RunResponse  # noqa: E402
+
+from agents.model_router import ModelCandidate, ModelRouter  # noqa: E402
+
+
+class FakeAgent:
+    def __init__(self, model, behaviour):
+        self.model = model
+        self.behaviour = behaviour
+
+    def run(self, prompt):
+        reply = self.behaviour[self.model.id]
+        if isinstance(reply, Exception):
+            raise reply
+        delay, content = reply
+        time.sleep(delay)
+        return RunResponse(content=f"{content}: {prompt}", model=self.model.id, metrics={})
+
+
+@pytest.fixture
+def make_router(monkeypatch):
+    def make(behaviour, hedged=(), hedge_delay=0.05):
+        # Fresh model ids per test, so circuit breakers and stats start clean
+        ids = {name: f"{name}-{uuid.uuid4().hex[:6]}" for name in behaviour}
+        router = ModelRouter(
+            {"stage": [f"fake:{ids[name]}" for name in behaviour]}, set(hedged), hedge_delay
+        )
+        monkeypatch.setattr(router, "build_model", lambda candidate: SimpleNamespace(id=candidate.model_id))
+        by_id = {ids[name]: reply for name, reply in behaviour.items()}
+        return router, router.runner("stage", lambda model: FakeAgent(model, by_id)), ids
+
+    return make
+
+
+def test_candidate_specs_are_parsed():
+    assert ModelCandidate.parse(" Gemini : gemini-2.0-flash").name == "gemini:gemini-2.0-flash"
+    with pytest.raises(ValueError):
+        ModelCandidate.parse("gemini-2.0-flash")
+
+
+def test_unknown_stages_are_rejected(make_router):
+    router, _, _ = make_router({"a": (0, "A")})
+    with pytest.raises(ValueError):
+        router.runner("nope", lambda model: None)
+
+
+def test_failures_fall_through_to_the_next_candidate(make_router):
+    router, runner, ids = make_router({"a": RuntimeError("quota"), "b": (0, "B")})
+    assert runner.run("hi").content == "B: hi"
+    stats = router.snapshot()["stage"]
+    assert stats[f"fake:{ids['a']}"]["error_rate"] == 1.0
+    assert stats[f"fake:{ids['b']}"]["samples"] == 1
+
+
+def test_all_candidates_failing_raises(make_router):
+    _, runner, _ = make_router({"a": RuntimeError("down"), "b": RuntimeError("down too")})
+    with pytest.raises(RuntimeError, match="All models failed"):
+        runner.run("hi")
+
+
+def test_unhealthy_and_slow_candidates_rank_last(make_router):
+    router, _, _ = make_router({"a": (0, "A"), "b": (0, "B"), "c": (0, "C")})
+    a, b, c = router.routes["stage"]
+    for _ in range(3):
+        router.record("stage", a, 0.1, ok=False)
+    router.record("stage", b, 2.0, ok=True)
+    router.record("stage", c, 0.5, ok=True)
+    assert router.ranked("stage") == [c, b, a]
+
+
+def test_hedged_stage_returns_the_faster_backup(make_router):
+    _, runner, _ = make_router({"slow": (1.0, "slow"), "fast": (0, "fast")}, hedged={"stage"})
+    start = time.monotonic()
+    assert runner.run("hi").content == "fast: hi"
+    assert time.monotonic() - start < 0.5
+
+
+def test_unhedged_stage_waits_for_the_first_candidate(make_router):
+    _, runner, _ = make_router({"slow": (0.2, "slow"), "fast": (0, "fast")})
+    assert runner.run("hi").content == "slow: hi"
+
+
+def test_cancelled_runs_start_no_further_candidate(make_router):
+    _, runner, _ = make_router({"a": RuntimeError("down"), "b": (0, "B")})
+    cancelled = threading.Event()
+    cancelled.set()
+    with pytest.raises(Exception, match="cancelled"):
+        runner.run("hi", cancelled=cancelled)
+
+
+def test_concurrent_runs_check_out_their_own_agents(make_router):
+    _, runner, _ = make_router({"a": (0.1, "A")})
+    threads = [threading.Thread(target=runner.run, args=("hi",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    (idle,) = runner._idle.values()
+    assert len({id(agent) for agent in idle}) == 3
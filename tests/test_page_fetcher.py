@@ -0,0 +1,226 @@
+# tests/test_page_fetcher.py
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+httpcore = pytest.importorskip("httpcore")
+pytest.importorskip("bs4")
+
+import importlib  # noqa: E402
+
+# services.page_fetcher names the fetcher instance, not the module
+page_fetcher = importlib.import_module("services.page_fetcher")
+
+PUBLIC = "93.184.216.34"
+_getaddrinfo = socket.getaddrinfo
+
+
+class Resolver:
+    """getaddrinfo stand-in answering each lookup of a host with the next address"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.lookups = 0
+
+    def __call__(self, host, port, *args, **kwargs):
+        if host == "127.0.0.1":
+            # The patch is process-wide; let the test server connection through
+            return _getaddrinfo(host, port, *args, **kwargs)
+        self.lookups += 1
+        address = self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+        return [(None, None, None, "", (address, port))]
+
+
+class RecordingBackend(httpcore.NetworkBackend):
+    """Records the address dialled and connects to the local test server instead"""
+
+    def __init__(self, server_port=None):
+        self.dialled = []
+        self.server_port = server_port
+        self.real = httpcore.SyncBackend()
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.dialled.append(host)
+        if self.server_port is None:
+            raise httpcore.ConnectError("no test server")
+        return self.real.connect_tcp("127.0.0.1", self.server_port, timeout=timeout)
+
+    def sleep(self, seconds):
+        pass
+
+
+def test_rebinding_host_is_dialled_at_the_checked_address(monkeypatch):
+    resolver = Resolver(PUBLIC, "127.0.0.1")
+    monkeypatch.setattr(page_fetcher.socket, "getaddrinfo", resolver)
+    inner = RecordingBackend()
+    backend = page_fetcher.PublicAddressBackend(inner)
+
+    # First lookup is public: the public address itself is dialled, never the hostname
+    with pytest.raises(httpcore.ConnectError):
+        backend.connect_tcp("rebind.example", 80)
+    assert inner.dialled == [PUBLIC]
+
+    # The rebound answer is refused before anything is dialled
+    with pytest.raises(page_fetcher.BlockedAddressError):
+        backend.connect_tcp("rebind.example", 80)
+    assert inner.dialled == [PUBLIC]
+    assert resolver.lookups == 2
+
+
+@pytest.mark.parametrize(
+    "address", ["127.0.0.1", "10.0.0.5", "169.254.169.254", "100.64.0.1", "::1", "::ffff:127.0.0.1"]
+)
+def test_non_public_addresses_are_refused(monkeypatch, address):
+    monkeypatch.setattr(page_fetcher.socket, "getaddrinfo", Resolver(address))
+    inner = RecordingBackend()
+    with pytest.raises(page_fetcher.BlockedAddressError):
+        page_fetcher.PublicAddressBackend(inner).connect_tcp("internal.example", 80)
+    assert inner.dialled == []
+
+
+def test_any_private_answer_blocks_the_host(monkeypatch):
+    monkeypatch.setattr(
+        page_fetcher.socket,
+        "getaddrinfo",
+        lambda host, port, **kwargs: [
+            (None, None, None, "", (PUBLIC, port)),
+            (None, None, None, "", ("127.0.0.1", port)),
+        ],
+    )
+    with pytest.raises(page_fetcher.BlockedAddressError):
+        page_fetcher.PublicAddressBackend(RecordingBackend()).connect_tcp("mixed.example", 80)
+
+
+class PageServer:
+    """Local HTTP server for one test; pages maps paths to (headers, body)"""
+
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                headers, body = server.pages[self.path]
+                if self.headers.get("If-None-Match") and self.headers["If-None-Match"] == headers.get("ETag"):
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                for name, value in {"Content-Type": "text/html", **headers}.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = PageServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def make_fetcher(tmp_path, monkeypatch, server):
+    monkeypatch.setattr(page_fetcher.socket, "getaddrinfo", Resolver(PUBLIC))
+
+    def make(**options):
+        values = {"timeout": 5, "max_bytes": 100_000, "per_host": 2, "max_workers": 2}
+        values.update(options)
+        return page_fetcher.PageFetcher(
+            str(tmp_path / "pages"), network_backend=RecordingBackend(server.port), **values
+        )
+
+    return make
+
+
+def test_pages_are_capped_at_max_bytes(make_fetcher, server):
+    server.pages["/long"] = ({}, b"<html><body><p>" + b"word " * 50_000 + b"</p></body></html>")
+    text = make_fetcher(max_bytes=1000).fetch("http://pages.example/long")
+    assert 0 < len(text) <= 1000
+
+
+def test_stale_pages_are_revalidated_with_their_etag(make_fetcher, server):
+    server.pages["/article"] = ({"ETag": '"v1"'}, b"<html><body><main>Original text</main></body></html>")
+    fetcher = make_fetcher(cache_ttl=0)
+    assert fetcher.fetch("http://pages.example/article") == "Original text"
+
+    # A 304 answers from the cache
+    assert fetcher.fetch("http://pages.example/article") == "Original text"
+    assert server.requests[1].get("If-None-Match") == '"v1"'
+
+
+def test_fresh_pages_come_from_the_cache(make_fetcher, server):
+    server.pages["/article"] = ({}, b"<html><body><main>Cached text</main></body></html>")
+    fetcher = make_fetcher()
+    fetcher.fetch("http://pages.example/article")
+    assert fetcher.fetch("http://pages.example/article") == "Cached text"
+    assert len(server.requests) == 1
+
+
+def test_blocked_hosts_are_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_fetcher.socket, "getaddrinfo", Resolver("169.254.169.254"))
+    backend = RecordingBackend()
+    fetcher = page_fetcher.PageFetcher(
+        str(tmp_path / "pages"), timeout=5, max_bytes=1000, per_host=1, network_backend=backend
+    )
+    assert fetcher.fetch_pages(["http://metadata.example/latest"]) == {}
+    assert backend.dialled == []
+
+
+def test_host_limits_are_released_once_unused(make_fetcher, server):
+    server.pages["/a"] = ({}, b"<html><body><main>A</main></body></html>")
+    server.pages["/b"] = ({}, b"<html><body><main>B</main></body></html>")
+    fetcher = make_fetcher()
+    pages = fetcher.fetch_pages(["http://one.example/a", "http://two.example/b"])
+    assert pages == {"http://one.example/a": "A", "http://two.example/b": "B"}
+    assert fetcher._host_limits == {}
+
+
+def test_host_limit_bounds_concurrent_fetches(make_fetcher):
+    fetcher = make_fetcher(per_host=1)
+    inside = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def hold():
+        with fetcher._host_limit("http://slow.example/1"):
+            order.append("first")
+            inside.set()
+            release.wait(2)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    inside.wait(2)
+    def wait_for_slot():
+        with fetcher._host_limit("http://slow.example/2"):
+            order.append("second")
+
+    waiter = threading.Thread(target=wait_for_slot)
+    waiter.start()
+    waiter.join(0.1)
+    assert order == ["first"]
+    release.set()
+    holder.join(2)
+    waiter.join(2)
+    assert order == ["first", "second"]
+    assert fetcher._host_limits == {}
@@ -0,0 +1,73 @@
+# tests/test_profiler.py
+import json
+import threading
+import time
+
+import pytest
+
+from utils.profiler import SPEEDSCOPE_SCHEMA, SamplingProfiler
+
+
+def _spin(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _wait(seconds: float):
+    time.sleep(seconds)
+
+
+def _self_time(profiler: SamplingProfiler) -> dict:
+    return {entry["function"]: entry["seconds"] for entry in profiler.top_functions()}
+
+
+def test_wall_profile_attributes_time_to_the_innermost_function():
+    profiler = SamplingProfiler("wall", interval=0.002).start()
+    _spin(0.15)
+    _wait(0.15)
+    profiler.stop()
+    self_time = _self_time(profiler)
+    assert self_time.get("_spin", 0) > 0.05
+    # Wall mode counts blocking time
+    assert "_wait" in self_time or "sleep" in " ".join(self_time)
+
+
+@pytest.mark.skipif(not hasattr(time, "pthread_getcpuclockid"), reason="no per-thread CPU clocks")
+def test_cpu_profile_leaves_out_waits():
+    profiler = SamplingProfiler("cpu", interval=0.002).start()
+    _spin(0.15)
+    _wait(0.3)
+    profiler.stop()
+    self_time = _self_time(profiler)
+    assert self_time.get("_spin", 0) > 0.05
+    assert self_time.get("_wait", 0) < 0.05
+
+
+def test_worker_threads_running_app_code_are_sampled():
+    profiler = SamplingProfiler("wall", interval=0.002).start()
+    worker = threading.Thread(target=_spin, args=(0.15,), name="research-worker")
+    worker.start()
+    worker.join()
+    profiler.stop()
+    threads = {thread for thread, _ in profiler.samples}
+    assert "research-worker" in threads
+    assert "profiler" not in threads
+
+
+def test_speedscope_export(tmp_path):
+    profiler = SamplingProfiler("wall", interval=0.002).start()
+    _spin(0.05)
+    profiler.stop()
+    with open(profiler.save(str(tmp_path), "run-1"), encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["$schema"] == SPEEDSCOPE_SCHEMA
+    frames = data["shared"]["frames"]
+    for profile in data["profiles"]:
+        assert len(profile["samples"]) == len(profile["weights"])
+        assert all(0 <= frame < len(frames) for stack in profile["samples"] for frame in stack)
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        SamplingProfiler("memory")
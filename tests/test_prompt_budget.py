@@ -0,0 +1,40 @@
+# tests/test_prompt_budget.py
+import pytest
+
+from utils.prompt_budget import PromptBuilder, estimate_tokens, split_units
+
+
+def test_split_units():
+    text = "One. Two!\n\nThree?"
+    assert split_units(text, "sentence") == ["One.", "Two!", "Three?"]
+    assert split_units(text, "paragraph") == ["One. Two!", "Three?"]
+    with pytest.raises(ValueError):
+        split_units(text, "word")
+
+
+def test_sections_are_cut_at_boundaries_in_priority_order():
+    findings = [f"- Finding {i} about graph neural networks" for i in range(20)]
+    builder = PromptBuilder(budget_tokens=120)
+    prompt = (
+        builder.text("Write the outline.")
+        .section("notes", "Background sentence. " * 40, priority=2)
+        .section("findings", findings, priority=1)
+        .build()
+    )
+    assert estimate_tokens(prompt) <= 120
+    # Findings got the budget first and are kept whole
+    assert builder.report["findings"]["units"] > 0
+    assert builder.report["notes"]["units"] < builder.report["notes"]["total_units"]
+    assert all(line in findings for line in prompt.splitlines()[1:] if line.startswith("- "))
+
+
+def test_required_sections_are_never_cut():
+    blog = "# Blog\n\n" + "Paragraph text. " * 200
+    prompt = PromptBuilder(budget_tokens=50).section("blog", blog, required=True).build()
+    assert prompt == blog.strip()
+
+
+def test_section_max_tokens_caps_a_section():
+    builder = PromptBuilder(budget_tokens=1000)
+    builder.section("excerpts", ["e" * 40] * 10, max_tokens=30).build()
+    assert builder.report["excerpts"]["tokens"] <= 30
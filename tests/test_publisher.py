@@ -0,0 +1,209 @@
+# tests/test_publisher.py
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from services import publisher  # noqa: E402
+from services.publisher import (  # noqa: E402
+    CHECKING,
+    DONE,
+    FAILED,
+    SKIPPED,
+    PublishJob,
+    PublishQueue,
+    PublishTarget,
+)
+
+
+class FakePlatform:
+    """A platform whose create responses can be lost after the article was made"""
+
+    def __init__(self):
+        self.articles = {}
+        self.creates = 0
+        self.updates = 0
+        self.lose_next_create = False
+        self.lookup_error = None
+        self.limiters = []
+
+    def send(self, job, remote_id, limiter):
+        # The real senders acquire the limiter on every request attempt
+        limiter.acquire()
+        self.limiters.append(limiter)
+        if remote_id:
+            self.updates += 1
+            self.articles[remote_id] = job.title
+            return remote_id, f"https://fake.example/{remote_id}"
+        self.creates += 1
+        remote_id = f"a{self.creates}"
+        self.articles[remote_id] = job.title
+        if self.lose_next_create:
+            self.lose_next_create = False
+            raise TimeoutError("response lost")
+        return remote_id, f"https://fake.example/{remote_id}"
+
+    def find(self, job, known_ids, limiter):
+        limiter.acquire()
+        if self.lookup_error:
+            raise self.lookup_error
+        for remote_id, title in reversed(list(self.articles.items())):
+            if title == job.title and remote_id not in known_ids:
+                return remote_id, f"https://fake.example/{remote_id}"
+        return None
+
+
+@pytest.fixture
+def platform():
+    return FakePlatform()
+
+
+@pytest.fixture
+def queue(tmp_path, platform):
+    target = PublishTarget(
+        "fake", "Fake", platform.send, find=platform.find, account=lambda job: job.api_key or ""
+    )
+    queue = PublishQueue(str(tmp_path / "publish.sqlite3"), [target])
+    queue._rate_limits = {"fake": {"requests": 100, "per_seconds": 60}}
+    yield queue
+    queue.executor.shutdown(wait=True)
+
+
+def job(run_id="run-1", title="Graph neural networks", api_key="key-1", published=True):
+    return PublishJob(run_id=run_id, title=title, content="Body", tags="ai", published=published, api_key=api_key)
+
+
+def publish(queue, publish_job):
+    queue.submit(publish_job, ["fake"])["fake"].result(5)
+    return queue.status(publish_job.run_id)["fake"]
+
+
+def test_publishing_again_updates_the_article(queue, platform):
+    first = publish(queue, job())
+    second = publish(queue, job())
+    assert (first.state, first.updated) == (DONE, False)
+    assert (second.state, second.updated) == (DONE, True)
+    assert (platform.creates, platform.updates) == (1, 1)
+    assert queue.remote("run-1", "fake")["remote_id"] == "a1"
+
+
+def test_lost_create_is_recovered_instead_of_duplicated(queue, platform):
+    platform.lose_next_create = True
+    status = publish(queue, job())
+    assert (status.state, status.url) == (DONE, "https://fake.example/a1")
+    assert not queue._pending("run-1", "fake")
+
+    publish(queue, job())
+    assert (platform.creates, platform.updates) == (1, 1)
+
+
+def test_pending_create_is_reconciled_before_the_next_publish(queue, platform):
+    platform.lose_next_create = True
+    platform.lookup_error = ConnectionError("platform down")
+    status = publish(queue, job())
+    assert status.state == FAILED
+    assert queue._pending("run-1", "fake")
+
+    # The lookup fails again: nothing is sent and the marker stays
+    status = publish(queue, job())
+    assert status.state == FAILED
+    assert platform.creates == 1 and queue._pending("run-1", "fake")
+
+    platform.lookup_error = None
+    status = publish(queue, job())
+    assert (status.state, status.updated) == (DONE, True)
+    assert (platform.creates, platform.updates) == (1, 1)
+
+
+def test_pending_create_that_never_landed_is_sent_again(queue, platform):
+    queue._mark_pending("run-1", "fake")
+    status = publish(queue, job())
+    assert (status.state, status.updated) == (DONE, False)
+    assert platform.creates == 1
+    assert not queue._pending("run-1", "fake")
+
+
+def test_articles_of_other_runs_are_never_claimed(queue, platform):
+    publish(queue, job(run_id="run-1"))
+    queue._mark_pending("run-2", "fake")
+    publish(queue, job(run_id="run-2"))
+    assert platform.creates == 2
+    assert queue.remote("run-2", "fake")["remote_id"] == "a2"
+
+
+def test_reconcile_shows_a_checking_state(queue, platform, monkeypatch):
+    seen = []
+    real_find = platform.find
+
+    def find(publish_job, known_ids, limiter):
+        seen.append(queue.status(publish_job.run_id)["fake"].state)
+        return real_find(publish_job, known_ids, limiter)
+
+    platform.find = find
+    queue.targets["fake"] = PublishTarget("fake", "Fake", platform.send, find=find, account=lambda j: "")
+    queue._mark_pending("run-1", "fake")
+    publish(queue, job())
+    assert seen == [CHECKING]
+
+
+def test_targets_that_cannot_take_the_job_are_skipped(tmp_path, platform):
+    targets = [
+        PublishTarget("off", "Off", platform.send, find=platform.find, account=lambda j: "", enabled=lambda: False),
+        PublishTarget("live", "Live", platform.send, find=platform.find, account=lambda j: "", drafts=False),
+    ]
+    queue = PublishQueue(str(tmp_path / "publish.sqlite3"), targets)
+    futures = queue.submit(job(published=False), ["off", "live"])
+    for future in futures.values():
+        future.result(5)
+    assert {status.state for status in queue.status("run-1").values()} == {SKIPPED}
+    assert platform.creates == 0
+
+
+def test_rate_limits_are_kept_per_account(queue, platform):
+    publish(queue, job(run_id="run-1", api_key="key-1"))
+    publish(queue, job(run_id="run-2", api_key="key-1"))
+    publish(queue, job(run_id="run-3", api_key="key-2"))
+    first, second, third = platform.limiters
+    assert first is second
+    assert first is not third
+
+
+def test_idle_state_is_released(queue, monkeypatch):
+    publish(queue, job())
+    assert queue._article_locks == {}
+    monkeypatch.setattr(publisher, "STATUS_RETENTION_SECONDS", 0)
+    time.sleep(0.01)
+    queue._prune_statuses()
+    assert queue.status("run-1") == {}
+
+
+@pytest.fixture
+def stand_in(request):
+    stand_ins = pytest.importorskip("scripts.stand_ins")
+    server = getattr(stand_ins, request.param)(latency=0).start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("stand_in", ["devto_stand_in"], indirect=True)
+def test_devto_lookup_finds_the_created_article(stand_in, monkeypatch):
+    from services.devto_api import find_devto_article, publish_to_devto
+
+    monkeypatch.setenv("DEVTO_API_URL", stand_in.url)
+    created = publish_to_devto("key", "Graph neural networks", "Body")
+    publish_to_devto("key", "Another post", "Body")
+    assert find_devto_article("key", "Graph neural networks") == (str(created["id"]), created["url"])
+    assert find_devto_article("key", "Graph neural networks", exclude_ids={str(created["id"])}) is None
+
+
+@pytest.mark.parametrize("stand_in", ["linkedin_stand_in"], indirect=True)
+def test_linkedin_lookup_finds_the_created_post(stand_in, monkeypatch):
+    from services.linkedin_api import find_linkedin_post, publish_to_linkedin
+
+    monkeypatch.setenv("LINKEDIN_API_URL", stand_in.url)
+    monkeypatch.setenv("LINKEDIN_ACCESS_TOKEN", "token")
+    monkeypatch.setenv("LINKEDIN_AUTHOR_URN", "urn:li:person:test")
+    created = publish_to_linkedin("Graph neural networks", "Body", "ai")
+    assert find_linkedin_post("Graph neural networks") == (created["id"], created["url"])
+    assert find_linkedin_post("Graph neural networks", exclude_urns={created["id"]}) is None
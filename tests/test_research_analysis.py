@@ -0,0 +1,107 @@
+# tests/test_research_analysis.py
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("agno")
+
+from agents.research_analysis_agent import ResearchAnalysis  # noqa: E402
+from agents.research_models import MISSING_SUMMARY, Finding, ResearchResult  # noqa: E402
+
+
+class FakeAgent:
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    def run(self, prompt, *args, **kwargs):
+        self.prompts.append(prompt)
+        content = self.reply(prompt) if callable(self.reply) else self.reply
+        return SimpleNamespace(content=content)
+
+
+class FakeResearcher:
+    def __init__(self, result):
+        self.result = result
+
+    def research_topic(self, topic, depth=None):
+        return self.result
+
+
+@pytest.fixture
+def analysis():
+    analysis = ResearchAnalysis()
+    analysis.summary_agent = FakeAgent(lambda prompt: f"summary #{len(analysis.summary_agent.prompts)}")
+    analysis.parser_agent = FakeAgent('{"key_findings": [{"fact": "Teams patch weekly"}]}')
+    return analysis
+
+
+def _web(summary=MISSING_SUMMARY):
+    return ResearchResult(
+        topic="Patching",
+        key_findings=[Finding.create("Unpatched servers cause breaches", source_url="https://a.example")],
+        summary=summary,
+    )
+
+
+def test_web_summary_is_reused_without_notes(analysis):
+    analysis.research_agent = FakeResearcher(_web("Web summary"))
+    research = analysis.analyse_research("Patching", "   ")
+    assert research.summary == "Web summary"
+    # Empty notes are not sent to the parser, and no summary call is made
+    assert analysis.parser_agent.prompts == [] and analysis.summary_agent.prompts == []
+    assert research.auto_summary is None and research.user_findings == []
+
+
+def test_only_new_user_findings_are_folded_into_the_web_summary(analysis):
+    analysis.research_agent = FakeResearcher(_web("Web summary"))
+    research = analysis.analyse_research("Patching", "Our teams patch weekly.")
+    assert research.summary == "summary #1"
+    (prompt,) = analysis.summary_agent.prompts
+    assert "**Existing Summary**:\nWeb summary" in prompt
+    assert "- Teams patch weekly" in prompt and "Unpatched servers" not in prompt
+
+
+def test_a_full_summary_is_written_when_the_web_agent_had_none(analysis):
+    analysis.research_agent = FakeResearcher(_web())
+    research = analysis.analyse_research("Patching", "")
+    assert research.summary == "summary #1"
+    assert "- Unpatched servers cause breaches (Source: https://a.example)" in analysis.summary_agent.prompts[0]
+
+
+def test_summary_runs_alongside_and_falls_back_on_failure(analysis):
+    analysis.research_agent = FakeResearcher(_web("Web summary"))
+    research = analysis.gather_research("Patching", "Our teams patch weekly.")
+    analysis.summary_agent.reply = lambda prompt: 1 / 0
+    pending = analysis.start_summary(research)
+    analysis.attach_summary(research, pending)
+    assert research.summary == "Web summary"
+    assert research.auto_summary is None and research.user_findings == []
+
+
+def _notes_reply(prompt):
+    if "part 2 of 3" in prompt:
+        return "not json"
+    fact = "Critical servers go first" if "Alpha notes" in prompt else "Backups are restored monthly"
+    return '{"key_findings": [{"fact": "Teams patch weekly"}, {"fact": "%s"}]}' % fact
+
+
+def test_long_notes_are_parsed_in_parallel_chunks(analysis, monkeypatch):
+    monkeypatch.setenv("NOTES_CHUNK_TOKENS", "40")
+    analysis.parser_agent = FakeAgent(_notes_reply)
+    notes = "\n\n".join(f"## Part {name}\n\n" + f"{name} notes. " * 10 for name in ("Alpha", "Beta", "Gamma"))
+    research = analysis._parse_user_research("Patching", notes)
+
+    # The failing part is asked for again, then named in the error
+    assert len(analysis.parser_agent.prompts) == 4
+    assert research.error.startswith("Could not parse 1 of 3 parts") and "part 2:" in research.error
+    # Findings of the parts that parsed are merged and deduplicated
+    assert [f.fact for f in research.key_findings] == ["Teams patch weekly", "Critical servers go first", "Backups are restored monthly"]
+    assert research.usable
+
+
+def test_short_notes_are_parsed_in_one_call(analysis):
+    research = analysis._parse_user_research("Patching", "Our teams patch weekly.")
+    assert len(analysis.parser_agent.prompts) == 1
+    assert "part 1 of" not in analysis.parser_agent.prompts[0]
+    assert [f.fact for f in research.key_findings] == ["Teams patch weekly"]
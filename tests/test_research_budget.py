@@ -0,0 +1,72 @@
+# tests/test_research_budget.py
+import json
+
+import pytest
+
+pytest.importorskip("agno")
+pytest.importorskip("duckduckgo_search")
+
+from agno.exceptions import StopAgentRun  # noqa: E402
+
+from agents import research_budget  # noqa: E402
+from agents.research_budget import (  # noqa: E402
+    BUDGET_EXHAUSTED,
+    ResearchBudget,
+    SearchSession,
+    active_search_session,
+    duckduckgo_search,
+)
+
+
+class FakeDDGS:
+    calls = 0
+
+    def text(self, keywords, max_results):
+        FakeDDGS.calls += 1
+        return [{"title": f"{keywords} {i}", "href": f"https://r.example/{keywords}/{i}", "body": "b"} for i in range(max_results)]
+
+
+@pytest.fixture
+def session(monkeypatch):
+    FakeDDGS.calls = 0
+    monkeypatch.setattr(research_budget, "DDGS", FakeDDGS)
+    session = SearchSession(ResearchBudget(max_tool_calls=2, max_seconds=60, min_findings=2))
+    token = active_search_session.set(session)
+    yield session
+    active_search_session.reset(token)
+
+
+def test_budget_presets(monkeypatch):
+    assert ResearchBudget.for_depth("fast").max_tool_calls == 2
+    monkeypatch.setenv("RESEARCH_BUDGETS", json.dumps({"fast": {"max_tool_calls": 1, "max_seconds": 5, "min_findings": 1}}))
+    assert ResearchBudget.for_depth("fast").deadline_seconds == 5 + research_budget.ANSWER_GRACE_SECONDS
+    with pytest.raises(ValueError):
+        ResearchBudget.for_depth("exhaustive")
+
+
+def test_searches_stop_at_the_tool_call_budget(session):
+    assert len(json.loads(duckduckgo_search("a", max_results=2))) == 2
+    duckduckgo_search("b", max_results=2)
+    assert duckduckgo_search("c") == BUDGET_EXHAUSTED
+    assert FakeDDGS.calls == 2 and session.tool_calls == 2
+
+
+def test_searches_stop_at_the_time_budget(session):
+    session.started -= 61
+    assert duckduckgo_search("a") == BUDGET_EXHAUSTED
+    assert FakeDDGS.calls == 0
+
+
+def test_cancelled_session_aborts_the_run(session):
+    session.cancel()
+    with pytest.raises(StopAgentRun):
+        duckduckgo_search("a")
+
+
+def test_fallback_findings_skip_known_and_repeated_urls(session):
+    duckduckgo_search("a", max_results=3)
+    session.record([{"title": "a 0", "href": "https://r.example/a/0"}, {"title": "", "href": "https://x.example"}])
+    known = {"https://r.example/a/1"}
+    findings = session.fallback_findings(known, limit=5)
+    assert [f.source_url for f in findings] == ["https://r.example/a/0", "https://r.example/a/2"]
+    assert session.fallback_findings(known, limit=5) == []
@@ -0,0 +1,51 @@
+# tests/test_research_models.py
+import json
+
+import pytest
+
+from agents.research_models import Credibility, Finding, ResearchResult
+
+
+def test_finding_create_normalizes_fields():
+    finding = Finding.create("  Phishing leads breaches. ", source_url="https://a.example", source_credibility="high")
+    assert finding.fact == "Phishing leads breaches."
+    assert finding.source_credibility is Credibility.HIGH
+    assert Finding.create("x", source_credibility="unheard of").source_credibility is Credibility.MEDIUM
+
+
+def test_finding_reads_like_the_old_dicts():
+    finding = Finding.create("Fact", source_url="https://a.example", source_credibility="Low")
+    assert finding["source_credibility"] == "Low"
+    assert finding.get("excerpt") is None and "excerpt" not in finding
+    assert finding.get("missing", "default") == "default"
+    with pytest.raises(KeyError):
+        finding["excerpt"]
+    assert finding.prompt_line == "- Fact"
+    assert finding.source_line == "- Fact (Source: https://a.example)"
+
+
+def test_finding_to_dict_includes_excerpt_only_when_fetched():
+    finding = Finding.create("Fact", source_url="https://a.example")
+    assert "excerpt" not in finding.to_dict()
+    grounded = finding.with_excerpt("From the page")
+    assert grounded.to_dict()["excerpt"] == "From the page"
+    assert grounded == finding.with_excerpt("From the page") and grounded != finding
+
+
+def test_failed_result_is_unusable_unless_it_kept_findings():
+    failed = ResearchResult.failed("AI", "timeout", raw_output="partial")
+    assert not failed.usable
+    assert failed.to_dict() == {"topic": "AI", "key_findings": [], "error": "timeout", "raw_output": "partial"}
+    failed.add_findings([Finding.create("Fact")])
+    assert failed.usable
+
+
+def test_json_export_follows_changes():
+    result = ResearchResult(topic="AI", summary="First")
+    assert json.loads(result.to_json())["summary"] == "First"
+    result.summary = "Second"
+    result.add_findings([Finding.create("Fact")])
+    exported = json.loads(result.to_json())
+    assert exported["summary"] == "Second"
+    assert exported["key_findings"][0]["fact"] == "Fact"
+    assert "auto_summary" not in exported
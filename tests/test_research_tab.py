@@ -0,0 +1,58 @@
+# tests/test_research_tab.py
+import pytest
+
+pytest.importorskip("streamlit")
+
+from components import research_tab  # noqa: E402
+from components.research_tab import CREDIBILITY_LEVELS, _findings_page, _indexed_findings  # noqa: E402
+
+FINDINGS = [
+    {
+        "fact": f"Finding {i} about {'phishing' if i % 2 else 'ransomware'}",
+        "source_url": f"https://s.example/{i}",
+        "source_credibility": "High" if i % 3 == 0 else "Low",
+    }
+    for i in range(30)
+]
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    _indexed_findings.clear()
+    _findings_page.clear()
+
+
+def _page(query="", levels=CREDIBILITY_LEVELS, page=1, page_size=10, findings=FINDINGS, version="v1"):
+    return _findings_page(version, query, tuple(levels), page, page_size, findings)
+
+
+def test_pages_slice_the_matching_findings():
+    first, total = _page()
+    last, _ = _page(page=3)
+    assert total == 30
+    assert first.count("class='card'") == 10 and "Finding 0 " in first
+    assert "Finding 29 " in last and "Finding 9 " not in last
+    assert _page(page=4)[0] == ""
+
+
+def test_search_and_credibility_filters_combine():
+    page, total = _page(query="PHISHING https://s.example/1", levels=["High"])
+    # Odd findings divisible by 3, whose URL starts with /1
+    assert total == 1 and "Finding 15 about phishing" in page
+
+
+def test_cards_are_escaped():
+    findings = [{"fact": "<script>x</script>", "source_url": "javascript:'x'", "supporting_evidence": "a & b"}]
+    page, _ = _page(findings=findings, version="v2")
+    assert "<script>" not in page and "&lt;script&gt;" in page
+    assert "a &amp; b" in page and "href='javascript:&#x27;x&#x27;'" in page
+
+
+def test_cards_are_built_once_per_research_version(monkeypatch):
+    built = []
+    card = research_tab._finding_card
+    monkeypatch.setattr(research_tab, "_finding_card", lambda finding: built.append(finding) or card(finding))
+    for page in (1, 2, 3):
+        _page(page=page)
+    _page(query="ransomware")
+    assert len(built) == len(FINDINGS)
@@ -0,0 +1,250 @@
+# tests/test_resilience.py
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import resilience
+from utils.resilience import (
+    CallTimeoutError,
+    CircuitBreaker,
+    CircuitOpenError,
+    RateLimiter,
+    RetryPolicy,
+    call_with_resilience,
+    retry_after_seconds,
+)
+
+_endpoints = itertools.count()
+
+
+class HTTPError(Exception):
+    """Stands in for requests/httpx errors, which carry the response"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code, "headers": headers or {}})()
+
+
+class Flaky:
+    """Raises the given errors in turn, then succeeds"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def endpoint():
+    # Breakers are kept per endpoint for the whole process
+    return f"test:{next(_endpoints)}"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(resilience.time, "sleep", slept.append)
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: low)
+    return slept
+
+
+POLICY = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=5.0)
+
+
+def test_transient_errors_are_retried(endpoint, sleeps):
+    fn = Flaky(HTTPError(503), ConnectionError("reset"))
+    assert call_with_resilience(endpoint, fn, policy=POLICY) == "ok"
+    assert fn.calls == 3
+    assert resilience.circuit_breaker(endpoint).snapshot()["retries"] == 2
+
+
+def test_gives_up_after_max_attempts(endpoint, sleeps):
+    fn = Flaky(*[HTTPError(502)] * 3)
+    with pytest.raises(HTTPError):
+        call_with_resilience(endpoint, fn, policy=POLICY)
+    assert fn.calls == 3
+
+
+def test_client_errors_are_not_retried(endpoint, sleeps):
+    fn = Flaky(HTTPError(400))
+    with pytest.raises(HTTPError):
+        call_with_resilience(endpoint, fn, policy=POLICY)
+    assert fn.calls == 1
+    assert resilience.circuit_breaker(endpoint).snapshot()["state"] == "closed"
+
+
+def test_non_idempotent_calls_only_repeat_refused_requests(endpoint, sleeps):
+    fn = Flaky(HTTPError(500))
+    with pytest.raises(HTTPError):
+        call_with_resilience(endpoint, fn, policy=POLICY, idempotent=False)
+    assert fn.calls == 1
+
+    fn = Flaky(HTTPError(429))
+    assert call_with_resilience(endpoint, fn, policy=POLICY, idempotent=False) == "ok"
+    assert fn.calls == 2
+
+
+def test_retry_after_sets_the_delay(endpoint, sleeps):
+    fn = Flaky(HTTPError(429, {"Retry-After": "3"}))
+    call_with_resilience(endpoint, fn, policy=POLICY)
+    assert sleeps == [3.0]
+
+
+def test_retry_after_is_capped_by_max_delay(endpoint, sleeps):
+    fn = Flaky(HTTPError(429, {"Retry-After": "600"}))
+    call_with_resilience(endpoint, fn, policy=POLICY)
+    assert sleeps == [POLICY.max_delay]
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds(HTTPError(429, {"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(HTTPError(429, {"Retry-After": "-5"})) == 0.0
+    assert retry_after_seconds(HTTPError(429, {"Retry-After": "soon"})) is None
+    assert retry_after_seconds(HTTPError(429)) is None
+    http_date = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 60))
+    assert 55 <= retry_after_seconds(HTTPError(503, {"Retry-After": http_date})) <= 60
+
+
+def test_timed_out_calls_are_not_repeated_when_disallowed(endpoint, sleeps):
+    calls = []
+
+    def slow():
+        calls.append(1)
+        threading.Event().wait(0.5)
+
+    policy = RetryPolicy(max_attempts=3, base_delay=0.01, timeout=0.05, retry_timeouts=False)
+    with pytest.raises(CallTimeoutError):
+        call_with_resilience(endpoint, slow, policy=policy)
+    assert len(calls) == 1
+
+
+def test_breaker_opens_and_probes_after_cooldown(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test:breaker", failure_threshold=2, reset_seconds=30)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    now[0] += 30
+    assert breaker.allow()
+    assert breaker.state == "half-open"
+    # A failed probe opens it again straight away
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["short_circuits"] == 2
+
+
+def test_half_open_breaker_admits_a_single_probe(endpoint, monkeypatch):
+    monkeypatch.setenv("CIRCUIT_FAILURE_THRESHOLD", "1")
+    monkeypatch.setenv("CIRCUIT_RESET_SECONDS", "0.05")
+    once = RetryPolicy(max_attempts=1)
+    with pytest.raises(HTTPError):
+        call_with_resilience(endpoint, Flaky(HTTPError(503)), policy=once)
+    time.sleep(0.06)
+
+    release = threading.Event()
+    probes = []
+
+    def probe():
+        probes.append(1)
+        release.wait(2)
+        return "ok"
+
+    def caller():
+        try:
+            return call_with_resilience(endpoint, probe, policy=once)
+        except CircuitOpenError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = [pool.submit(caller) for _ in range(8)]
+        # Everyone but the probe is turned away while it is still in flight
+        deadline = time.monotonic() + 2
+        while sum(future.done() for future in results) < 7 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert sum(future.done() for future in results) == 7
+        release.set()
+        outcomes = [future.result(2) for future in results]
+    assert len(probes) == 1
+    assert outcomes.count("ok") == 1
+    assert sum(isinstance(outcome, CircuitOpenError) for outcome in outcomes) == 7
+    assert resilience.circuit_breaker(endpoint).state == "closed"
+
+
+def test_open_circuit_short_circuits_calls(endpoint, sleeps, monkeypatch):
+    monkeypatch.setenv("CIRCUIT_FAILURE_THRESHOLD", "2")
+    fn = Flaky(*[HTTPError(500)] * 5)
+    with pytest.raises(HTTPError):
+        call_with_resilience(endpoint, fn, policy=RetryPolicy(max_attempts=2, base_delay=0.01))
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience(endpoint, fn, policy=POLICY)
+    assert fn.calls == 2
+
+
+def test_every_attempt_goes_through_the_limiter(endpoint, sleeps):
+    acquired = []
+
+    class Limiter:
+        def acquire(self):
+            acquired.append(1)
+            return 0.0
+
+    fn = Flaky(HTTPError(429), HTTPError(429))
+    call_with_resilience(endpoint, fn, policy=POLICY, limiter=Limiter())
+    assert len(acquired) == fn.calls == 3
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(resilience.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_rate_limiter_waits_for_the_window(clock):
+    limiter = RateLimiter(requests=2, per_seconds=10)
+    assert limiter.acquire() == 0
+    clock.now = 4
+    assert limiter.acquire() == 0
+    # The third request waits until the first leaves the window
+    assert limiter.acquire() == pytest.approx(6)
+    assert clock.now == pytest.approx(10)
+    assert limiter.acquire() == pytest.approx(4)
+
+
+def test_rate_limiter_idle(clock):
+    limiter = RateLimiter(requests=1, per_seconds=10)
+    assert limiter.idle
+    limiter.acquire()
+    assert not limiter.idle
+    clock.now = 10
+    assert limiter.idle
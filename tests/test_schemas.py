@@ -0,0 +1,75 @@
+# tests/test_schemas.py
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("agno")
+
+from agents.research_models import MISSING_SUMMARY, Credibility  # noqa: E402
+from agents.schemas import (  # noqa: E402
+    FindingRepairSchema,
+    FindingSchema,
+    ResearchSchema,
+    coerce_research,
+    repair_findings,
+    validate_findings,
+)
+
+
+def test_findings_accept_aliases_and_loose_credibility():
+    (finding,), broken = validate_findings(
+        [{"claim": "Fact", "evidence": "Why", "url": "https://a.example", "credibility": " user provided "}]
+    )
+    assert broken == []
+    assert finding.fact == "Fact" and finding.supporting_evidence == "Why"
+    assert finding.source_credibility is Credibility.USER
+
+
+def test_grouped_findings_are_flattened_and_broken_ones_kept_aside():
+    valid, broken = validate_findings(
+        [{"category": "Threats", "sources": [{"fact": "A"}, {"fact": ""}]}, {"fact": "B", "source_credibility": "bogus"}]
+    )
+    assert [finding.fact for finding in valid] == ["A"]
+    assert [item for item, _ in broken] == [{"fact": ""}, {"fact": "B", "source_credibility": "bogus"}]
+
+
+def test_coerce_structured_and_text_responses():
+    structured = ResearchSchema(topic="AI", key_findings=[FindingSchema(fact="A")], summary="S")
+    research, broken = coerce_research(structured, "ignored")
+    assert (research.topic, research.summary, broken) == ("AI", "S", [])
+
+    research, broken = coerce_research('Here you go: {"key_findings": [{"fact": "A"}, {}]} trailing', "AI")
+    assert research.topic == "AI" and research.summary == MISSING_SUMMARY
+    assert [f.fact for f in research.key_findings] == ["A"] and len(broken) == 1
+
+
+@pytest.mark.parametrize("content", ["no json", "[1, 2]", '{"key_findings": "A"}'])
+def test_coerce_rejects_unusable_responses(content):
+    with pytest.raises(ValueError):
+        coerce_research(content, "AI")
+
+
+class FakeRepairAgent:
+    def __init__(self, content=None, error=None):
+        self.content, self.error, self.calls = content, error, 0
+
+    def run(self, prompt):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return SimpleNamespace(content=self.content)
+
+
+def test_repair_revalidates_broken_findings_in_one_call():
+    agent = FakeRepairAgent(FindingRepairSchema(key_findings=[FindingSchema(fact="Fixed")]))
+    assert [f.fact for f in repair_findings(agent, [({"fakt": "Fixed"}, "fact missing")])] == ["Fixed"]
+    assert agent.calls == 1
+
+    agent = FakeRepairAgent('{"key_findings": [{"fact": "Fixed"}, {"fact": ""}]}')
+    assert [f.fact for f in repair_findings(agent, [({}, "error")])] == ["Fixed"]
+
+
+def test_repair_is_skipped_or_drops_findings_on_failure():
+    agent = FakeRepairAgent()
+    assert repair_findings(agent, []) == [] and agent.calls == 0
+    assert repair_findings(FakeRepairAgent(error=RuntimeError("down")), [({}, "error")]) == []
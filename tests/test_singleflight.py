@@ -0,0 +1,79 @@
+# tests/test_singleflight.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.singleflight import SingleFlight, make_flight_key
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting"
+        time.sleep(0.005)
+
+
+def run_concurrently(flight, fn, callers):
+    """Start callers on one key while the first call is held open"""
+    release = threading.Event()
+
+    def held():
+        release.wait(2)
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        futures = [pool.submit(flight.do, "stage", "key", held) for _ in range(callers)]
+        _wait_for(lambda: sum(flight.stats().get("stage", {}).values()) == callers)
+        release.set()
+        # Exceptions are returned in place of results so every caller can be checked
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_identical_calls_are_coalesced():
+    flight = SingleFlight()
+    calls = []
+    results = run_concurrently(flight, lambda: calls.append(1) or {"findings": ["a"]}, callers=5)
+    assert len(calls) == 1
+    assert results == [{"findings": ["a"]}] * 5
+    assert flight.stats() == {"stage": {"executed": 1, "coalesced": 4}}
+
+
+def test_followers_get_their_own_copy():
+    flight = SingleFlight()
+    results = run_concurrently(flight, lambda: {"findings": ["a"]}, callers=3)
+    results[0]["findings"].append("b")
+    assert [len(result["findings"]) for result in results].count(1) == 2
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("provider down")
+
+    results = run_concurrently(flight, fail, callers=3)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["stage"]["executed"] == 1
+
+
+def test_finished_calls_are_not_cached():
+    flight = SingleFlight()
+    calls = []
+    flight.do("stage", "key", lambda: calls.append(1))
+    flight.do("stage", "key", lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_disabled_runs_every_call():
+    flight = SingleFlight(enabled=False)
+    calls = []
+    run_concurrently(flight, lambda: calls.append(1), callers=3)
+    assert len(calls) == 3
+    assert flight.stats() == {"stage": {"executed": 3, "coalesced": 0}}
+
+
+def test_flight_keys_ignore_case_and_whitespace():
+    assert make_flight_key("research", "  AI   Security ") == make_flight_key("research", "ai security")
+    assert make_flight_key("research", {"b": 1, "a": 2}) == make_flight_key("research", {"a": 2, "b": 1})
+    assert make_flight_key("research", "ai") != make_flight_key("outline", "ai")
+    assert make_flight_key("research", "a", "b") != make_flight_key("research", "ab")
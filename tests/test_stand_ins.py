@@ -0,0 +1,75 @@
+# tests/test_stand_ins.py
+import threading
+import time
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from scripts.stand_ins import StandIn, devto_stand_in, json_reply, unsplash_stand_in  # noqa: E402
+
+
+@pytest.fixture
+def serve():
+    started = []
+
+    def start(stand_in: StandIn) -> StandIn:
+        started.append(stand_in.start())
+        return stand_in
+
+    yield start
+    for stand_in in started:
+        stand_in.stop()
+
+
+def test_routes_match_exactly_or_by_prefix_and_are_counted(serve):
+    release = threading.Event()
+
+    def slow(stand_in, request):
+        release.wait(5)
+        return json_reply({"path": request["path"], "query": request["query"]})
+
+    stand_in = serve(
+        StandIn("demo", {"GET /items": lambda s, r: json_reply([]), "GET /files/": slow}, latency=0)
+    )
+    workers = [
+        threading.Thread(target=requests.get, args=(f"{stand_in.url}/files/{i}?v={i}",)) for i in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    deadline = time.monotonic() + 5
+    while stand_in.stats.in_flight < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for worker in workers:
+        worker.join()
+
+    assert requests.get(f"{stand_in.url}/items").json() == []
+    assert requests.get(f"{stand_in.url}/files/a?v=1").json() == {"path": "/files/a", "query": {"v": "1"}}
+    assert requests.post(f"{stand_in.url}/items").status_code == 404
+    assert stand_in.stats.by_route == {"GET /files/": 4, "GET /items": 1, "POST /items": 1}
+    assert stand_in.stats.max_in_flight == 3 and stand_in.stats.in_flight == 0
+
+
+def test_devto_keeps_articles_and_requires_a_key(serve):
+    devto = serve(devto_stand_in(latency=0))
+    headers = {"api-key": "key"}
+    created = requests.post(f"{devto.url}/articles", json={"article": {"title": "Draft"}}, headers=headers)
+    assert created.status_code == 201
+    article_id = created.json()["id"]
+    updated = requests.put(
+        f"{devto.url}/articles/{article_id}", json={"article": {"title": "Final", "published": True}}, headers=headers
+    )
+    assert updated.json()["title"] == "Final"
+    assert requests.put(f"{devto.url}/articles/999", json={}, headers=headers).status_code == 404
+    assert [a["title"] for a in requests.get(f"{devto.url}/articles/me/all", headers=headers).json()] == ["Final"]
+    assert requests.get(f"{devto.url}/articles/me/all").status_code == 401
+
+
+def test_unsplash_photos_point_at_its_own_images(serve):
+    pytest.importorskip("PIL")
+    unsplash = serve(unsplash_stand_in(latency=0))
+    photo = requests.get(f"{unsplash.url}/photos/random").json()
+    image = requests.get(photo["urls"]["regular"])
+    assert photo["urls"]["regular"].startswith(unsplash.url)
+    assert image.headers["Content-Type"] == "image/jpeg" and image.content[:2] == b"\xff\xd8"
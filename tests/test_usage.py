@@ -0,0 +1,129 @@
+# tests/test_usage.py
+import json
+
+import pytest
+
+from utils.config import DEFAULT_MODEL_ROUTES
+from utils.usage import BudgetExceeded, UsageLedger, UsageScope, active_usage, token_counts
+
+PRICES = {"test-model": {"input": 1.0, "output": 2.0}}
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    monkeypatch.setenv("MODEL_PRICES", json.dumps(PRICES))
+    # A single priced stage keeps the expected run cost easy to follow
+    routes = {stage: [] for stage in DEFAULT_MODEL_ROUTES}
+    routes["draft"] = ["gemini:test-model"]
+    monkeypatch.setenv("MODEL_ROUTES", json.dumps(routes))
+    monkeypatch.setenv("DAILY_USER_BUDGET_USD", "0.01")
+    return UsageLedger(str(tmp_path / "usage.sqlite3"))
+
+
+def record(ledger, user_id, run_id, input_tokens, output_tokens):
+    token = active_usage.set(UsageScope(user_id, run_id))
+    try:
+        return ledger.record(
+            "draft", "test-model", {"input_tokens": input_tokens, "output_tokens": output_tokens}, 1.0
+        )
+    finally:
+        active_usage.reset(token)
+
+
+def test_token_counts_sum_per_message_metrics():
+    assert token_counts({"input_tokens": [100, 50], "output_tokens": [20]}) == (150, 20)
+    assert token_counts({"prompt_tokens": 10, "completion_tokens": 5}) == (10, 5)
+    assert token_counts(None) == (0, 0)
+
+
+def test_calls_are_priced_and_totalled(ledger):
+    assert record(ledger, "ann", "run-1", 1000, 500) == pytest.approx(0.002)
+    record(ledger, "ann", "run-1", 1000, 500)
+    record(ledger, "bob", "run-2", 1000, 500)
+    spent = ledger.spent_today("ann")
+    assert spent["calls"] == 2
+    assert spent["cost_usd"] == pytest.approx(0.004)
+    assert ledger.run_breakdown("run-1")[0]["input_tokens"] == 2000
+
+
+def test_spent_budget_blocks_new_runs(ledger):
+    record(ledger, "ann", "run-1", 5000, 2500)
+    with pytest.raises(BudgetExceeded):
+        ledger.open_scope("ann", "run-2")
+    # Budgets are per user
+    ledger.open_scope("bob", "run-3")
+
+
+def test_open_runs_reserve_their_expected_cost(ledger):
+    # One draft call at the default token estimate: 2000 in, 1000 out
+    assert ledger.estimate_run_cost() == pytest.approx(0.004)
+    scopes = [ledger.open_scope("ann", f"run-{i}") for i in range(3)]
+    with pytest.raises(BudgetExceeded, match="held by runs in progress"):
+        ledger.open_scope("ann", "run-4")
+
+    ledger.close_scope(scopes[0])
+    ledger.open_scope("ann", "run-4")
+
+
+def test_last_run_inside_the_budget_is_routed_to_economy(ledger):
+    first = ledger.open_scope("ann", "run-1")
+    assert not first.economy
+    ledger.open_scope("ann", "run-2")
+    assert ledger.open_scope("ann", "run-3").economy
+
+
+def test_zero_budget_is_unlimited(ledger, monkeypatch):
+    monkeypatch.setenv("USER_DAILY_BUDGETS", json.dumps({"ann": 0}))
+    record(ledger, "ann", "run-1", 10**6, 10**6)
+    for i in range(5):
+        ledger.open_scope("ann", f"run-{i + 2}")
+
+
+def test_recorded_costs_are_averaged_per_stage_and_model(ledger):
+    record(ledger, "ann", "run-1", 1000, 0)
+    record(ledger, "ann", "run-1", 3000, 0)
+    assert ledger.expected_cost("draft", "test-model") == pytest.approx(0.002)
+    # A run's estimate follows what recent runs actually cost
+    assert ledger.estimate_run_cost() == pytest.approx(0.004)
+
+
+def test_recorded_cost_counts_against_the_reservation_once(ledger):
+    scope = ledger.open_scope("ann", "run-1")
+    token = active_usage.set(scope)
+    try:
+        ledger.record("draft", "test-model", {"input_tokens": 1000, "output_tokens": 500}, 1.0)
+    finally:
+        active_usage.reset(token)
+    # $0.002 spent plus the $0.002 still reserved, not $0.002 + $0.004
+    assert ledger._reserved("ann") == pytest.approx(0.002)
+    ledger.close_scope(scope)
+    assert ledger._reserved("ann") == 0
+
+
+def test_calls_finishing_after_close_are_still_billed(ledger):
+    scope = ledger.open_scope("ann", "run-1")
+    ledger.close_scope(scope)
+    record(ledger, "ann", "run-1", 1000, 500)
+    assert ledger.spent_today("ann")["cost_usd"] == pytest.approx(0.002)
+
+
+def test_unpriced_models_are_free(ledger):
+    token = active_usage.set(UsageScope("ann", "run-1"))
+    try:
+        assert ledger.record("draft", "unknown-model", {"input_tokens": 10**6}, 1.0) == 0
+    finally:
+        active_usage.reset(token)
+    assert ledger.spent_today("ann")["calls"] == 1
+
+
+def test_per_user_budgets_override_the_default(ledger, monkeypatch):
+    monkeypatch.setenv("USER_DAILY_BUDGETS", json.dumps({"vip@example.com": 1.0}))
+    for i in range(10):
+        ledger.open_scope("vip@example.com", f"run-{i}")
+
+
+def test_history_survives_a_restart(ledger):
+    record(ledger, "ann", "run-1", 3000, 0)
+    reopened = UsageLedger(ledger.path)
+    assert reopened.spent_today("ann")["cost_usd"] == pytest.approx(0.003)
+    assert reopened.expected_cost("draft", "test-model") == pytest.approx(0.003)
@@ -0,0 +1,66 @@
+# tests/test_warmup.py
+import importlib
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("agno")
+
+from agents.model_router import model_router  # noqa: E402
+from utils.cassette import cassette  # noqa: E402
+
+warmup = importlib.import_module("services.warmup")
+
+
+@pytest.fixture
+def targets(monkeypatch):
+    """Record every warm-up target instead of touching the network"""
+    warmed = []
+    lock = threading.Lock()
+
+    def record(name, saved=0.25):
+        with lock:
+            warmed.append(name)
+        return saved
+
+    def preconnect(candidate):
+        if candidate.name == "groq":
+            raise ConnectionError("unreachable")
+        record(candidate.name)
+
+    monkeypatch.setattr(warmup, "_warm_url", lambda url: record(url))
+    monkeypatch.setattr(warmup, "_warm_dns", lambda host: record(host))
+    monkeypatch.setattr(
+        type(model_router), "candidates", property(lambda self: [SimpleNamespace(name="gemini"), SimpleNamespace(name="groq")])
+    )
+    monkeypatch.setattr(model_router, "preconnect", preconnect)
+    return warmed
+
+
+def test_every_target_is_warmed_and_failures_reported(targets):
+    report = warmup.run_warmup()
+    assert set(targets) >= set(warmup.PRECONNECT_URLS.values()) | set(warmup.DNS_HOSTS) | {"gemini"}
+    assert set(report.saved) == set(warmup.PRECONNECT_URLS) | {f"dns:{h}" for h in warmup.DNS_HOSTS} | {"gemini"}
+    assert report.errors == {"groq": "unreachable"}
+    assert all(saved == 0.25 for name, saved in report.saved.items() if name != "gemini")
+    assert report.summary().endswith("(1 unreachable)")
+
+
+def test_replayed_sessions_skip_the_warmup(targets, monkeypatch):
+    monkeypatch.setattr(type(cassette), "replaying", property(lambda self: True))
+    report = warmup.run_warmup()
+    assert targets == [] and report.saved == {}
+
+
+def test_measure_reports_the_time_saved_by_the_warm_connection(monkeypatch):
+    clock = iter([0.0, 0.4, 0.4, 0.5])
+    monkeypatch.setattr(warmup.time, "monotonic", lambda: next(clock))
+    assert warmup._measure(lambda: None, lambda: None) == pytest.approx(0.3)
+
+
+def test_warmup_starts_once_per_process(targets, monkeypatch):
+    monkeypatch.setattr(warmup, "_warmup", None)
+    first = warmup.start_warmup()
+    assert warmup.start_warmup() is first
+    assert first.result(timeout=5).errors == {"groq": "unreachable"}
@@ -1,3 +1,86 @@
-from .config import *
-from .logger import *
-from .helpers import *
\ No newline at end of file
+# Config is light and needed everywhere; other helpers load on first use
+from .config import (
+    DEFAULT_MODEL_PRICES,
+    DEFAULT_MODEL_ROUTES,
+    DEFAULT_PROMPT_TOKEN_BUDGETS,
+    DEFAULT_PUBLISH_RATE_LIMITS,
+    DEFAULT_RESEARCH_BUDGETS,
+    GEMINI_FLASH,
+    GEMINI_FLASH_LITE,
+    GROQ_LLAMA_SCOUT,
+    Config,
+    config,
+)
+from .lazy import lazy_exports
+
+lazy_exports(
+    __name__,
+    globals(),
+    {
+        "logger": ["logger", "run_id_var", "setup_logging"],
+        "helpers": [
+            "clean_tag_output",
+            "get_credibility_badge",
+            "image_to_base64",
+            "parse_references",
+            "clean_tag",
+            "calculate_duration",
+            "content_hash",
+        ],
+        "singleflight": ["normalize_stage_input", "make_flight_key", "SingleFlight", "single_flight"],
+        "keyphrases": [
+            "STOPWORDS",
+            "DOCUMENT_FREQUENCIES",
+            "DEFAULT_DOCUMENT_FREQUENCY",
+            "strip_markdown",
+            "extract_keyphrases",
+            "extract_post_metadata",
+        ],
+        "prompt_budget": [
+            "CHARS_PER_TOKEN",
+            "estimate_tokens",
+            "split_units",
+            "chunk_text",
+            "PromptBuilder",
+        ],
+        "citations": ["CITATION_THRESHOLD", "link_citations"],
+        "resilience": [
+            "RETRYABLE_STATUS",
+            "SAFE_TO_REPEAT_STATUS",
+            "CircuitOpenError",
+            "RetryPolicy",
+            "default_policy",
+            "retry_after_seconds",
+            "is_retryable",
+            "CircuitBreaker",
+            "circuit_breaker",
+            "resilience_metrics",
+            "call_with_resilience",
+            "StageCheckpoints",
+            "RateLimiter",
+        ],
+        "cassette": ["RECORD_MODES", "CassetteMiss", "redact_url", "Cassette", "cassette"],
+        "profiler": ["PROFILE_MODES", "SamplingProfiler"],
+        "usage": [
+            "UsageScope",
+            "active_usage",
+            "BudgetExceeded",
+            "token_counts",
+            "estimate_cost",
+            "UsageLedger",
+            "usage_ledger",
+        ],
+    },
+    eager=[
+        "DEFAULT_MODEL_PRICES",
+        "DEFAULT_MODEL_ROUTES",
+        "DEFAULT_PROMPT_TOKEN_BUDGETS",
+        "DEFAULT_PUBLISH_RATE_LIMITS",
+        "DEFAULT_RESEARCH_BUDGETS",
+        "GEMINI_FLASH",
+        "GEMINI_FLASH_LITE",
+        "GROQ_LLAMA_SCOUT",
+        "Config",
+        "config",
+    ],
+)
\ No newline at end of file
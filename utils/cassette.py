@@ -0,0 +1,145 @@
+# utils/cassette.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+RECORD_MODES = ("off", "record", "replay")
+# Query parameters that carry credentials and must never reach a cassette
+SECRET_PARAMS = {"key", "api_key", "apikey", "client_id", "access_token", "token"}
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a call was never recorded"""
+
+
+def redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = [
+        (name, "REDACTED" if name.lower() in SECRET_PARAMS else value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class Cassette:
+    """
+    Record external calls to a JSONL file and serve them back offline
+
+    Calls are matched by kind and a hash of their inputs. Repeated identical
+    calls replay their recordings in order, then keep repeating the last one,
+    so one recorded run can drive many replayed sessions. Replays sleep for
+    the recorded latency times latency_scale (0 replays instantly). Kinds
+    outside ``kinds`` always run live, e.g. to hit local stand-in servers.
+    """
+
+    def __init__(
+        self, path: str, mode: str, latency_scale: float, kinds: Optional[Set[str]] = None
+    ):
+        if mode not in RECORD_MODES:
+            raise ValueError(f"Unknown record mode '{mode}', expected one of {RECORD_MODES}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.kinds = kinds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        if mode == "replay":
+            self._load()
+        elif mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def key(kind: str, *parts: Any) -> str:
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return f"{kind}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]].append(entry)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No cassette to replay at {self.path}") from None
+        logger.info(f"Loaded {sum(map(len, self._entries.values()))} recorded calls from {self.path}")
+
+    def _next(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            recordings = self._entries.get(key)
+            if not recordings:
+                raise CassetteMiss(f"No recording for {key}")
+            # Keep the last recording so later identical calls still replay
+            return recordings.popleft() if len(recordings) > 1 else recordings[0]
+
+    def _record(self, key: str, request: Dict[str, Any], response: Any, latency: float):
+        entry = {
+            "key": key,
+            "request": request,
+            "response": response,
+            "latency": round(latency, 4),
+            "recorded_at": time.time(),
+        }
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def call(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        encode: Callable[[Any], Any] = lambda value: value,
+        decode: Callable[[Any], Any] = lambda value: value,
+        request: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """
+        Run fn live, record it, or replay its recording, depending on the mode
+
+        Args:
+            key: Match key from Cassette.key
+            fn: The live call
+            encode: Result -> JSON-serializable form
+            decode: Recorded form -> result
+            request: Readable request details stored alongside the response
+        """
+        if self.kinds is not None and key.split(":", 1)[0] not in self.kinds:
+            return fn()
+
+        if self.replaying:
+            entry = self._next(key)
+            if self.latency_scale > 0:
+                time.sleep(entry["latency"] * self.latency_scale)
+            return decode(entry["response"])
+
+        start = time.monotonic()
+        result = fn()
+        if self.mode == "record":
+            self._record(key, request or {}, encode(result), time.monotonic() - start)
+        return result
+
+
+cassette = Cassette(
+    path=config.CASSETTE_PATH,
+    mode=config.RECORD_MODE,
+    latency_scale=config.REPLAY_LATENCY_SCALE,
+    kinds=config.CASSETTE_KINDS,
+)
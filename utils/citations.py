@@ -0,0 +1,134 @@
+# utils/citations.py
+import re
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .keyphrases import STOPWORDS
+
+# Share of a fact's content words that must appear in a sentence to cite it there
+CITATION_THRESHOLD = 0.5
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9\-]*")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_REFERENCES_HEADING = re.compile(r"^#{1,6}\s*references\s*$", re.IGNORECASE | re.MULTILINE)
+_EXISTING_MARKER = re.compile(r"\[\^\d+\]")
+
+
+def _content_words(text: str) -> Set[str]:
+    words = set()
+    for word in _WORD.findall(text.lower()):
+        if word in STOPWORDS or len(word) < 3:
+            continue
+        # Light stemming so "models" matches "model"
+        words.add(word[:-1] if word.endswith("s") and len(word) > 4 else word)
+    return words
+
+
+def _is_prose(line: str) -> bool:
+    stripped = line.lstrip()
+    return bool(stripped) and not stripped.startswith(("#", "|", "```", "[^", "---", "<"))
+
+
+def _split_body(markdown: str) -> str:
+    """Drop any references section the model wrote on its own"""
+    match = _REFERENCES_HEADING.search(markdown)
+    body = markdown[: match.start()] if match else markdown
+    return _EXISTING_MARKER.sub("", body).rstrip()
+
+
+def strip_citations(markdown: str) -> str:
+    """Blog markdown without footnote markers or references, ready for link_citations"""
+    return _split_body(markdown)
+
+
+def _sentences(lines: List[str]) -> List[Tuple[int, int, str]]:
+    """(line index, sentence index, sentence) for every prose sentence outside code blocks"""
+    found, in_code = [], False
+    for line_no, line in enumerate(lines):
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+            continue
+        if in_code or not _is_prose(line):
+            continue
+        for sentence_no, sentence in enumerate(_SENTENCE_END.split(line)):
+            found.append((line_no, sentence_no, sentence))
+    return found
+
+
+def _reference_text(finding) -> str:
+    url = finding.get("source_url", "User Provided")
+    fact = finding.get("fact", "").rstrip(".")
+    if url.startswith("http"):
+        return f"{fact}. {url}"
+    return f"{fact}. (User Provided)"
+
+
+def link_citations(
+    markdown: str, findings: Sequence, threshold: float = CITATION_THRESHOLD
+) -> str:
+    """
+    Insert [^n] footnotes and a references section without a model call
+
+    Each finding is cited at the sentence that covers the largest share of its
+    content words, provided the share reaches the threshold. Findings that
+    share a source URL share a footnote, numbered by first appearance.
+
+    Args:
+        markdown: Blog markdown without citations
+        findings: Research findings with fact and source_url
+        threshold: Minimum share of a fact's words found in the sentence
+
+    Returns:
+        Markdown with footnote markers and a references section
+    """
+    lines = _split_body(markdown).split("\n")
+    sentences = _sentences(lines)
+    sentence_words = [_content_words(sentence) for _, _, sentence in sentences]
+
+    # Best sentence for each finding
+    citations: Dict[int, List[int]] = {}
+    for finding_no, finding in enumerate(findings):
+        fact_words = _content_words(finding.get("fact", ""))
+        if not fact_words:
+            continue
+        best: Optional[Tuple[float, int]] = None
+        for index, words in enumerate(sentence_words):
+            score = len(fact_words & words) / len(fact_words)
+            if score >= threshold and (best is None or score > best[0]):
+                best = (score, index)
+        if best is not None:
+            citations.setdefault(best[1], []).append(finding_no)
+
+    if not citations:
+        return "\n".join(lines)
+
+    # Number sources in reading order
+    numbers: Dict[str, int] = {}
+    references: List[str] = []
+    markers: Dict[Tuple[int, int], str] = {}
+    for index in sorted(citations):
+        line_no, sentence_no, _ = sentences[index]
+        labels = []
+        for finding_no in citations[index]:
+            finding = findings[finding_no]
+            source = finding.get("source_url", "User Provided")
+            key = source if source.startswith("http") else f"user:{finding_no}"
+            if key not in numbers:
+                numbers[key] = len(numbers) + 1
+                references.append(f"[^{numbers[key]}]: {_reference_text(finding)}")
+            label = f"[^{numbers[key]}]"
+            if label not in labels:
+                labels.append(label)
+        markers[(line_no, sentence_no)] = "".join(labels)
+
+    for line_no in {line_no for line_no, _ in markers}:
+        parts = _SENTENCE_END.split(lines[line_no])
+        separators = _SENTENCE_END.findall(lines[line_no])
+        rebuilt = ""
+        for sentence_no, part in enumerate(parts):
+            marker = markers.get((line_no, sentence_no), "")
+            rebuilt += part.rstrip() + marker if marker else part
+            if sentence_no < len(separators):
+                rebuilt += separators[sentence_no]
+        lines[line_no] = rebuilt
+
+    return "\n".join(lines) + "\n\n## References\n\n" + "\n".join(references) + "\n"
@@ -1,10 +1,54 @@
 import os
-from typing import Optional
+import json
+import logging
+from typing import Dict, List, Optional, Set
 from dotenv import load_dotenv
-from loguru import logger
 
 load_dotenv(override=True)
 
+logger = logging.getLogger(__name__)
+
+GEMINI_FLASH = "gemini:gemini-2.0-flash"
+GEMINI_FLASH_LITE = "gemini:gemini-2.0-flash-lite"
+GROQ_LLAMA_SCOUT = "groq:meta-llama/llama-4-scout-17b-16e-instruct"
+
+DEFAULT_MODEL_ROUTES: Dict[str, List[str]] = {
+    "research": [GEMINI_FLASH, GROQ_LLAMA_SCOUT],
+    "outline": [GEMINI_FLASH, GROQ_LLAMA_SCOUT],
+    "draft": [GEMINI_FLASH, GROQ_LLAMA_SCOUT],
+    "polish": [GEMINI_FLASH, GROQ_LLAMA_SCOUT],
+    "parse": [GROQ_LLAMA_SCOUT, GEMINI_FLASH],
+    "summary": [GROQ_LLAMA_SCOUT, GEMINI_FLASH],
+    "metadata": [GEMINI_FLASH_LITE, GROQ_LLAMA_SCOUT],
+}
+
+# Research depth presets: tool calls, wall-clock seconds and the findings floor
+DEFAULT_RESEARCH_BUDGETS: Dict[str, Dict[str, float]] = {
+    "fast": {"max_tool_calls": 2, "max_seconds": 20, "min_findings": 4},
+    "thorough": {"max_tool_calls": 8, "max_seconds": 75, "min_findings": 8},
+}
+
+# Input token budgets per model. Kept well below the context windows so
+# latency and cost stay bounded; Groq's lower limit reflects its per-minute caps.
+DEFAULT_PROMPT_TOKEN_BUDGETS: Dict[str, int] = {
+    "gemini-2.0-flash": 16000,
+    "gemini-2.0-flash-lite": 4000,
+    "meta-llama/llama-4-scout-17b-16e-instruct": 6000,
+}
+
+# USD per million input and output tokens; used to estimate what each stage costs
+DEFAULT_MODEL_PRICES: Dict[str, Dict[str, float]] = {
+    "gemini-2.0-flash": {"input": 0.10, "output": 0.40},
+    "gemini-2.0-flash-lite": {"input": 0.075, "output": 0.30},
+    "meta-llama/llama-4-scout-17b-16e-instruct": {"input": 0.11, "output": 0.34},
+}
+
+# Requests allowed per window for each publishing platform
+DEFAULT_PUBLISH_RATE_LIMITS: Dict[str, Dict[str, float]] = {
+    "devto": {"requests": 10, "per_seconds": 30},
+    "linkedin": {"requests": 100, "per_seconds": 86400},
+}
+
 class Config:
     """Singleton configuration manager using properties."""
     _instance = None
@@ -42,10 +86,258 @@ class Config:
     def LINKEDIN_CLIENT_SECRET(self) -> Optional[str]:
         return os.getenv("LINKEDIN_CLIENT_SECRET")
     
+    @property
+    def LINKEDIN_ACCESS_TOKEN(self) -> Optional[str]:
+        """Member token from the app's OAuth client, with the w_member_social scope"""
+        return os.getenv("LINKEDIN_ACCESS_TOKEN")
+    
+    @property
+    def LINKEDIN_AUTHOR_URN(self) -> Optional[str]:
+        """Author of LinkedIn posts, e.g. urn:li:person:abc123"""
+        return os.getenv("LINKEDIN_AUTHOR_URN")
+    
+    @property
+    def LINKEDIN_API_URL(self) -> str:
+        return os.getenv("LINKEDIN_API_URL", "https://api.linkedin.com").rstrip("/")
+    
     @property
     def CHROMA_DB_PATH(self) -> str:
         return os.getenv("CHROMA_DB_PATH", "./chroma_data")
     
+    @property
+    def METADATA_ENGINE(self) -> str:
+        """'llm' for the metadata agent, 'local' for the keyphrase extractor"""
+        return os.getenv("METADATA_ENGINE", "llm").lower()
+    
+    @property
+    def MODEL_ROUTES(self) -> Dict[str, List[str]]:
+        """Ordered 'provider:model_id' candidates per stage; MODEL_ROUTES (JSON) overrides stages"""
+        routes = dict(DEFAULT_MODEL_ROUTES)
+        routes.update(json.loads(os.getenv("MODEL_ROUTES", "{}")))
+        return routes
+    
+    @property
+    def HEDGED_STAGES(self) -> Set[str]:
+        stages = os.getenv("HEDGED_STAGES", "metadata,summary,parse")
+        return {stage.strip() for stage in stages.split(",") if stage.strip()}
+    
+    @property
+    def MODEL_HEDGE_DELAY(self) -> float:
+        """Seconds before hedging when a candidate has no latency history yet"""
+        return float(os.getenv("MODEL_HEDGE_DELAY", "4.0"))
+    
+    @property
+    def PROMPT_TOKEN_BUDGETS(self) -> Dict[str, int]:
+        """Input token budget per model id; PROMPT_TOKEN_BUDGETS (JSON) overrides models"""
+        budgets = dict(DEFAULT_PROMPT_TOKEN_BUDGETS)
+        budgets.update(json.loads(os.getenv("PROMPT_TOKEN_BUDGETS", "{}")))
+        return budgets
+    
+    @property
+    def DEFAULT_PROMPT_TOKEN_BUDGET(self) -> int:
+        return int(os.getenv("DEFAULT_PROMPT_TOKEN_BUDGET", "6000"))
+    
+    @property
+    def NOTES_CHUNK_TOKENS(self) -> int:
+        """Largest slice of pasted research notes sent to the parser in one call"""
+        return int(os.getenv("NOTES_CHUNK_TOKENS", "2500"))
+    
+    @property
+    def NOTES_PARSE_CONCURRENCY(self) -> int:
+        return int(os.getenv("NOTES_PARSE_CONCURRENCY", "4"))
+    
+    @property
+    def FETCH_SOURCE_PAGES(self) -> bool:
+        return os.getenv("FETCH_SOURCE_PAGES", "true").lower() in ("1", "true", "yes")
+    
+    @property
+    def PAGE_CACHE_DIR(self) -> str:
+        return os.getenv("PAGE_CACHE_DIR", os.path.join("outputs", "page_cache"))
+    
+    @property
+    def PAGE_FETCH_TIMEOUT(self) -> float:
+        return float(os.getenv("PAGE_FETCH_TIMEOUT", "8"))
+    
+    @property
+    def PAGE_MAX_BYTES(self) -> int:
+        return int(os.getenv("PAGE_MAX_BYTES", str(2 * 1024 * 1024)))
+    
+    @property
+    def PAGE_FETCH_PER_HOST(self) -> int:
+        return int(os.getenv("PAGE_FETCH_PER_HOST", "2"))
+    
+    @property
+    def IMAGE_STORE_DIR(self) -> str:
+        return os.getenv("IMAGE_STORE_DIR", os.path.join("outputs", "images"))
+    
+    @property
+    def IMAGE_STORE_QUOTA_BYTES(self) -> int:
+        return int(os.getenv("IMAGE_STORE_QUOTA_MB", "256")) * 1024 * 1024
+    
+    @property
+    def IMAGE_PREVIEW_WIDTH(self) -> int:
+        """Width of the preview thumbnail; 0 shows the original image"""
+        return int(os.getenv("IMAGE_PREVIEW_WIDTH", "960"))
+    
+    @property
+    def IMAGE_REF_TTL_DAYS(self) -> float:
+        return float(os.getenv("IMAGE_REF_TTL_DAYS", "7"))
+    
+    @property
+    def RESEARCH_BUDGETS(self) -> Dict[str, Dict[str, float]]:
+        """Budget presets per research depth; RESEARCH_BUDGETS (JSON) overrides depths"""
+        budgets = dict(DEFAULT_RESEARCH_BUDGETS)
+        budgets.update(json.loads(os.getenv("RESEARCH_BUDGETS", "{}")))
+        return budgets
+    
+    @property
+    def RESEARCH_DEPTH(self) -> str:
+        return os.getenv("RESEARCH_DEPTH", "thorough")
+    
+    @property
+    def HTTP_TIMEOUT(self) -> float:
+        return float(os.getenv("HTTP_TIMEOUT", "15"))
+    
+    @property
+    def MODEL_CALL_TIMEOUT(self) -> float:
+        return float(os.getenv("MODEL_CALL_TIMEOUT", "90"))
+    
+    @property
+    def TIMEOUT_POOL_SIZE(self) -> int:
+        # Workers per endpoint for calls made under a timeout
+        return int(os.getenv("TIMEOUT_POOL_SIZE", "8"))
+    
+    @property
+    def RETRY_MAX_ATTEMPTS(self) -> int:
+        return int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    
+    @property
+    def CIRCUIT_FAILURE_THRESHOLD(self) -> int:
+        return int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    
+    @property
+    def CIRCUIT_RESET_SECONDS(self) -> float:
+        return float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+    
+    @property
+    def RECORD_MODE(self) -> str:
+        """'off' calls providers live, 'record' also writes a cassette, 'replay' serves one"""
+        return os.getenv("RECORD_MODE", "off").lower()
+    
+    @property
+    def CASSETTE_PATH(self) -> str:
+        return os.getenv("CASSETTE_PATH", os.path.join("outputs", "cassettes", "session.jsonl"))
+    
+    @property
+    def REPLAY_LATENCY_SCALE(self) -> float:
+        """Multiplier on recorded latency during replay; 0 replays instantly"""
+        return float(os.getenv("REPLAY_LATENCY_SCALE", "0"))
+    
+    @property
+    def CASSETTE_KINDS(self) -> Set[str]:
+        """Call kinds the cassette covers (model, search, http, page); others always run live"""
+        kinds = os.getenv("CASSETTE_KINDS", "model,search,http,page")
+        return {kind.strip() for kind in kinds.split(",") if kind.strip()}
+    
+    @property
+    def UNSPLASH_API_URL(self) -> str:
+        return os.getenv("UNSPLASH_API_URL", "https://api.unsplash.com").rstrip("/")
+    
+    @property
+    def DEVTO_API_URL(self) -> str:
+        return os.getenv("DEVTO_API_URL", "https://dev.to/api").rstrip("/")
+    
+    @property
+    def IMGBB_API_URL(self) -> str:
+        return os.getenv("IMGBB_API_URL", "https://api.imgbb.com/1").rstrip("/")
+    
+    @property
+    def MODEL_PRICES(self) -> Dict[str, Dict[str, float]]:
+        """USD per million tokens per model id; MODEL_PRICES (JSON) overrides models"""
+        prices = dict(DEFAULT_MODEL_PRICES)
+        prices.update(json.loads(os.getenv("MODEL_PRICES", "{}")))
+        return prices
+    
+    @property
+    def USAGE_DB_PATH(self) -> str:
+        return os.getenv("USAGE_DB_PATH", os.path.join("outputs", "usage.sqlite3"))
+    
+    @property
+    def DAILY_USER_BUDGET_USD(self) -> float:
+        """Estimated model spend allowed per user per UTC day; 0 disables the limit"""
+        return float(os.getenv("DAILY_USER_BUDGET_USD", "0.50"))
+    
+    @property
+    def USER_DAILY_BUDGETS(self) -> Dict[str, float]:
+        """Per-user overrides of DAILY_USER_BUDGET_USD, keyed by user email (JSON)"""
+        return json.loads(os.getenv("USER_DAILY_BUDGETS", "{}"))
+    
+    @property
+    def BUDGET_ECONOMY_SHARE(self) -> float:
+        """Below this share of the daily budget left, routing prefers the cheapest models"""
+        return float(os.getenv("BUDGET_ECONOMY_SHARE", "0.25"))
+    
+    @property
+    def ADMIN_EMAILS(self) -> Set[str]:
+        """Users allowed to use admin tools such as the run profiler"""
+        emails = os.getenv("ADMIN_EMAILS", "")
+        return {email.strip().lower() for email in emails.split(",") if email.strip()}
+    
+    @property
+    def PROFILE_DIR(self) -> str:
+        return os.getenv("PROFILE_DIR", os.path.join("outputs", "profiles"))
+    
+    @property
+    def PROFILE_INTERVAL_MS(self) -> float:
+        return float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    
+    @property
+    def LOG_LEVEL(self) -> str:
+        return os.getenv("LOG_LEVEL", "DEBUG").upper()
+    
+    @property
+    def LOG_CONSOLE_LEVEL(self) -> str:
+        return os.getenv("LOG_CONSOLE_LEVEL", "INFO").upper()
+    
+    @property
+    def LOG_PATH(self) -> str:
+        """JSON lines log file; rotated files keep a timestamp suffix"""
+        return os.getenv("LOG_PATH", os.path.join("outputs", "logs", "app.jsonl"))
+    
+    @property
+    def LOG_ROTATION(self) -> str:
+        return os.getenv("LOG_ROTATION", "10 MB")
+    
+    @property
+    def LOG_RETENTION(self) -> int:
+        """Rotated log files to keep"""
+        return int(os.getenv("LOG_RETENTION", "5"))
+    
+    @property
+    def LOG_DEBUG_SAMPLE_RATE(self) -> float:
+        """Share of DEBUG records that are written; everything above DEBUG is kept"""
+        return float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+    
+    @property
+    def PUBLISH_DB_PATH(self) -> str:
+        return os.getenv("PUBLISH_DB_PATH", os.path.join("outputs", "publish.sqlite3"))
+    
+    @property
+    def PUBLISH_RATE_LIMITS(self) -> Dict[str, Dict[str, float]]:
+        """Rate limit per platform; PUBLISH_RATE_LIMITS (JSON) overrides platforms"""
+        limits = dict(DEFAULT_PUBLISH_RATE_LIMITS)
+        limits.update(json.loads(os.getenv("PUBLISH_RATE_LIMITS", "{}")))
+        return limits
+    
+    @property
+    def SINGLE_FLIGHT(self) -> bool:
+        # Coalesce identical in-flight stage calls; load tests turn it off to measure every session
+        return os.getenv("SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes")
+    
+    @property
+    def WARMUP_ON_LOGIN(self) -> bool:
+        return os.getenv("WARMUP_ON_LOGIN", "true").lower() in ("1", "true", "yes")
+    
     def _get_required(self, var_name: str) -> str:
         value = os.getenv(var_name)
         if not value:
@@ -64,9 +356,9 @@ class Config:
             _ = self.UNSPLASH_ACCESS_KEY
             _ = self.UNSPLASH_SECRET_KEY
             
-            if not self.LINKEDIN_CLIENT_ID or not self.LINKEDIN_CLIENT_SECRET:
+            if not self.LINKEDIN_ACCESS_TOKEN or not self.LINKEDIN_AUTHOR_URN:
                 logger.warning(
-                    "LinkedIn OAuth credentials not configured - "
+                    "LinkedIn access token or author not configured - "
                     "publishing to LinkedIn will be disabled"
                 )
                 
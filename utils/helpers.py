@@ -2,6 +2,7 @@ import re
 
 import re
 import base64
+import hashlib
 import os
 from datetime import datetime
 from typing import Dict, Optional
@@ -11,9 +12,10 @@ def clean_tag_output(raw_output: str) -> str:
     lines = re.split(r"[\n,]+", raw_output)
     tags = [tag.strip().lower().replace(" ", "-") for tag in lines if tag.strip()]
     tags = [
-        re.sub(r"[^a-z0-9\-]", "", tag) for tag in tags
+        re.sub(r"[^a-z0-9\-]", "", tag).strip("-") for tag in tags
     ]
-    return ",".join(tags)
+    # Drop tags emptied by cleaning and keep the first occurrence of duplicates
+    return ",".join(dict.fromkeys(tag for tag in tags if tag))
 
 
 def get_credibility_badge(credibility: str) -> str:
@@ -47,3 +49,12 @@ def clean_tag(tag: str) -> str:
 
 def calculate_duration(start_time: datetime) -> float:
     return (datetime.now() - start_time).total_seconds()
+
+
+def content_hash(*parts: str) -> str:
+    """Short hash identifying one version of rendered content, for cache keys"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
@@ -0,0 +1,186 @@
+# utils/keyphrases.py
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .helpers import clean_tag_output
+
+STOPWORDS = frozenset(
+    """
+    a about above after again against all also am an and any are as at be because
+    been before being below between both but by can could did do does doing down
+    during each either etc even ever every few for from further get gets got had
+    has have having he her here hers herself him himself his how however i if in
+    into is it its itself just least less let like made make makes many may me
+    might more most much must my myself neither no nor not now of off often on
+    once one only or other others our ours ourselves out over own per rather same
+    see several shall she should since so some such than that the their theirs
+    them themselves then there these they this those though through thus to too
+    under until up upon us use used uses using very via was we well were what
+    when where whether which while who whom whose why will with within without
+    would yet you your yours yourself yourselves
+    new key based across including include includes within toward towards among
+    can't don't won't isn't aren't it's let's we're they're you're
+    """.split()
+)
+
+# Approximate share of general technical articles containing each word. Words
+# missing from the table are treated as rare and therefore informative.
+DOCUMENT_FREQUENCIES: Dict[str, float] = {
+    "data": 0.42, "system": 0.38, "systems": 0.33, "time": 0.40, "way": 0.35,
+    "example": 0.30, "first": 0.34, "important": 0.26, "different": 0.27,
+    "approach": 0.22, "process": 0.24, "information": 0.25, "model": 0.21,
+    "models": 0.19, "tools": 0.20, "work": 0.31, "need": 0.29, "help": 0.27,
+    "provide": 0.23, "provides": 0.20, "results": 0.22, "future": 0.20,
+    "potential": 0.19, "significant": 0.17, "ensure": 0.18, "enable": 0.15,
+    "enhance": 0.14, "improve": 0.19, "challenges": 0.16, "solution": 0.18,
+    "solutions": 0.17, "technology": 0.21, "technologies": 0.16, "world": 0.22,
+    "conclusion": 0.18, "introduction": 0.17, "overview": 0.12, "section": 0.14,
+    "source": 0.16, "research": 0.18, "study": 0.13, "report": 0.12,
+    "article": 0.15, "blog": 0.12, "post": 0.14, "today": 0.18, "year": 0.24,
+    "years": 0.22, "number": 0.23, "level": 0.20, "part": 0.25, "case": 0.21,
+    "real": 0.19, "high": 0.24, "large": 0.21, "better": 0.22, "best": 0.21,
+}
+DEFAULT_DOCUMENT_FREQUENCY = 0.01
+
+# Section headings and blog boilerplate: frequent in generated posts, useless as tags
+TAG_STOPWORDS = frozenset(
+    """
+    intro introduction conclusion conclusions overview summary recap background
+    takeaway takeaways tldr faq appendix outlook closing final thoughts wrap
+    wrapping next steps further reading references sources section contents
+    article blog post guide tutorial
+    """.split()
+)
+# Longest tag, in words; longer phrases are tagged with their best sub-phrase
+MAX_TAG_WORDS = 2
+
+_SENTENCE_BREAKS = re.compile(r"[.!?;:,()\[\]{}\"'|/\\\n\t–—]+")
+_WORD = re.compile(r"[a-z][a-z0-9+#\-]*[a-z0-9+#]|[a-z]")
+
+
+def strip_markdown(markdown: str) -> str:
+    """Reduce blog markdown to plain prose for phrase extraction"""
+    text = re.split(r"\n#+\s*references\b", markdown, flags=re.IGNORECASE)[0]
+    text = re.sub(r"```.*?```", " ", text, flags=re.DOTALL)
+    text = re.sub(r"`[^`]*`", " ", text)
+    text = re.sub(r"\[\^\d+\](:.*)?", " ", text)
+    text = re.sub(r"!?\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"https?://\S+", " ", text)
+    text = re.sub(r"[#>*_~|]+", " ", text)
+    return text
+
+
+def _candidate_phrases(text: str, max_words: int) -> Iterable[Tuple[str, ...]]:
+    for fragment in _SENTENCE_BREAKS.split(text.lower()):
+        phrase: List[str] = []
+        for word in _WORD.findall(fragment):
+            if word in STOPWORDS or word.isdigit() or len(word) < 2:
+                if phrase:
+                    yield tuple(phrase[:max_words])
+                phrase = []
+            else:
+                phrase.append(word)
+        if phrase:
+            yield tuple(phrase[:max_words])
+
+
+def _idf(word: str) -> float:
+    return -math.log(DOCUMENT_FREQUENCIES.get(word, DEFAULT_DOCUMENT_FREQUENCY))
+
+
+def _word_scores(phrases: List[Tuple[str, ...]]) -> Dict[str, float]:
+    """RAKE degree-to-frequency ratio of each word, weighted by its IDF"""
+    frequency: Counter = Counter()
+    degree: Dict[str, int] = defaultdict(int)
+    for phrase in phrases:
+        for word in phrase:
+            frequency[word] += 1
+            degree[word] += len(phrase)
+    return {word: (degree[word] / frequency[word]) * _idf(word) for word in frequency}
+
+
+def extract_keyphrases(
+    text: str, top_n: int = 10, max_words: int = 3
+) -> List[Tuple[str, float]]:
+    """
+    Score candidate phrases with RAKE weighted by inverse document frequency
+
+    Args:
+        text: Plain text to extract phrases from
+        top_n: Number of phrases to return
+        max_words: Longest phrase considered
+
+    Returns:
+        (phrase, score) pairs, best first
+    """
+    phrases = list(_candidate_phrases(text, max_words))
+    word_scores = _word_scores(phrases)
+    phrase_counts = Counter(phrases)
+    scored = {
+        " ".join(phrase): sum(word_scores[w] for w in phrase) * math.log1p(count)
+        for phrase, count in phrase_counts.items()
+    }
+    return sorted(scored.items(), key=lambda item: item[1], reverse=True)[:top_n]
+
+
+def _occurrences(words: Tuple[str, ...], phrase: Tuple[str, ...]) -> int:
+    size = len(words)
+    return sum(phrase[i : i + size] == words for i in range(len(phrase) - size + 1))
+
+
+def _best_tag(
+    phrase: str, phrases: List[Tuple[str, ...]], word_scores: Dict[str, float]
+) -> Optional[str]:
+    """
+    The best sub-phrase of at most MAX_TAG_WORDS words to tag a phrase with
+
+    Sub-phrases are scored like whole phrases: their RAKE/IDF word scores
+    times how often they occur in the text's candidate phrases. Boilerplate
+    words and common single words never make a tag. On a tie the later
+    sub-phrase wins, as English compounds end in their head noun.
+    """
+    runs: List[List[str]] = [[]]
+    for word in phrase.split():
+        if word in TAG_STOPWORDS:
+            runs.append([])
+        else:
+            runs[-1].append(word)
+
+    best: Optional[Tuple[float, int, Tuple[str, ...]]] = None
+    for run in runs:
+        for size in range(1, MAX_TAG_WORDS + 1):
+            for start in range(len(run) - size + 1):
+                words = tuple(run[start : start + size])
+                if size == 1 and words[0] in DOCUMENT_FREQUENCIES:
+                    continue
+                occurrences = sum(_occurrences(words, candidate) for candidate in phrases)
+                score = sum(word_scores.get(w, 0.0) for w in words) * math.log1p(occurrences)
+                if best is None or (score, start + size) >= best[:2]:
+                    best = (score, start + size, words)
+    return " ".join(best[2]) if best else None
+
+
+def extract_post_metadata(
+    topic: str, markdown: str, findings: List[Dict], max_tags: int = 4
+) -> Tuple[str, str]:
+    """
+    Derive the image keyword and SEO tags locally from the generated content
+
+    The topic is repeated so its phrases outrank incidental ones from the body.
+    Each top phrase contributes its best tag-sized sub-phrase.
+
+    Returns:
+        (image keyword, comma-separated tags)
+    """
+    facts = " . ".join(str(finding.get("fact", "")) for finding in findings)
+    text = " . ".join([topic] * 3 + [strip_markdown(markdown or ""), facts])
+    phrases = extract_keyphrases(text, top_n=max_tags * 4)
+    candidates = list(_candidate_phrases(text, 3))
+    word_scores = _word_scores(candidates)
+
+    keyword = phrases[0][0] if phrases else topic
+    tag_candidates = [_best_tag(phrase, candidates, word_scores) for phrase, _ in phrases]
+    tags = clean_tag_output(",".join(tag for tag in tag_candidates if tag)).split(",")
+    return keyword, ",".join(tag for tag in tags[:max_tags] if tag)
\ No newline at end of file
@@ -0,0 +1,36 @@
+# utils/lazy.py
+import importlib
+from typing import Any, Dict, List, Sequence
+
+
+def lazy_exports(
+    package: str,
+    namespace: Dict[str, Any],
+    exports: Dict[str, List[str]],
+    eager: Sequence[str] = (),
+):
+    """
+    Re-export submodule names from a package, importing each submodule on first access
+
+    Args:
+        package: The package's __name__
+        namespace: The package's globals()
+        exports: Submodule name -> names it provides
+        eager: Names the package already imported, listed in __all__ as well
+    """
+    owners = {name: module for module, names in exports.items() for name in names}
+
+    def __getattr__(name: str) -> Any:
+        module = owners.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(f".{module}", package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(owners))
+
+    namespace["__getattr__"] = __getattr__
+    namespace["__dir__"] = __dir__
+    namespace["__all__"] = list(eager) + list(owners)
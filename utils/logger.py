@@ -1,13 +1,104 @@
+# utils/logger.py
+import inspect
+import logging
+import random
+import sys
+from contextvars import ContextVar
+
 from loguru import logger
 
-logger.remove()
+from .config import config
+
+# Correlation id of the run being served; "-" outside a run
+run_id_var: ContextVar[str] = ContextVar("run_id", default="-")
 
-logger.add(
-    sink=lambda msg: print(msg, end=""),
-    colorize=True,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-           "<level>{level: <8}</level> | "
-           "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
-           "<level>{message}</level>",
-    level="DEBUG",
+CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<level>{level: <8}</level> | "
+    "<magenta>{extra[run_id]}</magenta> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+    "<level>{message}</level>"
 )
+# Libraries that log every request at DEBUG
+QUIET_LOGGERS = ("httpx", "httpcore", "urllib3", "hpack", "PIL")
+
+# Share of DEBUG records kept, read once by setup_logging
+_debug_sample_rate = 1.0
+
+
+def _sample(levelno: int) -> bool:
+    return levelno > logging.DEBUG or random.random() < _debug_sample_rate
+
+
+class InterceptHandler(logging.Handler):
+    """Route stdlib logging records into loguru, keeping the original caller"""
+
+    def emit(self, record: logging.LogRecord):
+        # Sampled before the frame walk, so dropped DEBUG records cost next to nothing
+        if not _sample(record.levelno):
+            return
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+        # Skip this handler and the logging module's own frames
+        frame, depth = inspect.currentframe(), 0
+        while frame is not None and (depth == 0 or frame.f_code.co_filename == logging.__file__):
+            frame = frame.f_back
+            depth += 1
+        logger.bind(sampled=True).opt(depth=depth, exception=record.exc_info).log(
+            level, record.getMessage()
+        )
+
+
+def _patch(record):
+    # Runs in the thread that logs, so it sees that thread's run; bind() takes precedence
+    extra = record["extra"]
+    extra.setdefault("run_id", run_id_var.get())
+    # Decided once per record, so every sink keeps the same DEBUG records
+    if "sampled" not in extra:
+        extra["sampled"] = _sample(record["level"].no)
+
+
+def _is_sampled(record) -> bool:
+    return record["extra"].get("sampled", True)
+
+
+def setup_logging():
+    """
+    One pipeline for loguru and stdlib logging
+
+    Sinks are enqueued, so callers only hand records to a background writer
+    and never wait on the console or the disk. The file sink writes JSON
+    lines with the run id, rotating by size. Stdlib records below the lowest
+    sink level are dropped by logging itself, before reaching loguru.
+    """
+    global _debug_sample_rate
+    _debug_sample_rate = config.LOG_DEBUG_SAMPLE_RATE
+    logger.remove()
+    logger.configure(patcher=_patch)
+    logger.add(
+        sys.stderr,
+        format=CONSOLE_FORMAT,
+        level=config.LOG_CONSOLE_LEVEL,
+        filter=_is_sampled,
+        enqueue=True,
+    )
+    logger.add(
+        config.LOG_PATH,
+        serialize=True,
+        level=config.LOG_LEVEL,
+        filter=_is_sampled,
+        enqueue=True,
+        rotation=config.LOG_ROTATION,
+        retention=config.LOG_RETENTION,
+        backtrace=False,
+        diagnose=False,
+    )
+    lowest = min(logger.level(name).no for name in (config.LOG_LEVEL, config.LOG_CONSOLE_LEVEL))
+    logging.basicConfig(handlers=[InterceptHandler()], level=lowest, force=True)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.INFO)
+
+
+setup_logging()
@@ -0,0 +1,190 @@
+# utils/profiler.py
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("wall", "cpu")
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# (function, file, first line)
+FrameKey = Tuple[str, str, int]
+
+
+def _thread_cpu_time(ident: int) -> Optional[float]:
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(ident))
+    except (OSError, OverflowError):
+        # The thread exited between listing and reading its clock
+        return None
+
+
+def _runs_app_code(frame) -> bool:
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_ROOT) and "site-packages" not in filename:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class SamplingProfiler:
+    """
+    Periodically samples Python stacks into a speedscope profile
+
+    The thread that starts the profiler is always sampled; other threads are
+    sampled while they run app code, which covers the worker pools a run fans
+    out to and skips idle workers and server threads. Wall mode weights each
+    sample by elapsed time, so blocking I/O shows up; CPU mode weights it by
+    the CPU time the thread used since the previous sample, so waits vanish.
+    Other sessions running app code at the same time are sampled as well.
+    """
+
+    def __init__(self, mode: str = "wall", interval: float = 0.005):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', expected one of {PROFILE_MODES}")
+        if mode == "cpu" and not hasattr(time, "pthread_getcpuclockid"):
+            raise ValueError("CPU profiling needs per-thread CPU clocks, which this platform lacks")
+        self.mode = mode
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.elapsed = 0.0
+        self._started = 0.0
+        self._frames: Dict[FrameKey, int] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._cpu_times: Dict[int, float] = {}
+        self._target: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self._target = threading.get_ident()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+        return self
+
+    def _frame_id(self, key: FrameKey) -> int:
+        frame_id = self._frames.get(key)
+        if frame_id is None:
+            frame_id = self._frames[key] = len(self._frames)
+        return frame_id
+
+    def _stack(self, frame) -> Tuple[int, ...]:
+        """Frame ids from the outermost call to the sampled one"""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(
+                self._frame_id(
+                    (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+                )
+            )
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def _thread_name(self, ident: int) -> str:
+        if ident not in self._thread_names:
+            self._thread_names.update((t.ident, t.name) for t in threading.enumerate())
+        return self._thread_names.get(ident, f"thread-{ident}")
+
+    def _weight(self, ident: int, wall: float) -> float:
+        if self.mode == "wall":
+            return wall
+        now = _thread_cpu_time(ident)
+        if now is None:
+            return 0.0
+        previous = self._cpu_times.get(ident)
+        self._cpu_times[ident] = now
+        # A thread's first sample only sets its baseline
+        return now - previous if previous is not None else 0.0
+
+    def _sample_loop(self):
+        sampler = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            wall, last = now - last, now
+            for ident, frame in sys._current_frames().items():
+                if ident == sampler or (ident != self._target and not _runs_app_code(frame)):
+                    continue
+                weight = self._weight(ident, wall)
+                if weight > 0:
+                    self.samples[(self._thread_name(ident), self._stack(frame))] += weight
+
+    def top_functions(self, limit: int = 15) -> List[Dict[str, Any]]:
+        """Functions with the most self time, i.e. samples where they were the innermost frame"""
+        frames = list(self._frames)
+        self_time: Counter = Counter()
+        for (_, stack), weight in self.samples.items():
+            if stack:
+                self_time[stack[-1]] += weight
+        total = sum(self_time.values()) or 1.0
+        return [
+            {
+                "function": frames[frame_id][0],
+                "location": f"{os.path.relpath(frames[frame_id][1], APP_ROOT)}:{frames[frame_id][2]}",
+                "seconds": round(weight, 4),
+                "share": round(weight / total, 4),
+            }
+            for frame_id, weight in self_time.most_common(limit)
+        ]
+
+    def to_speedscope(self, name: str) -> Dict[str, Any]:
+        """One sampled profile per thread, in speedscope's file format"""
+        by_thread: Dict[str, List[Tuple[Tuple[int, ...], float]]] = {}
+        for (thread_name, stack), weight in self.samples.items():
+            by_thread.setdefault(thread_name, []).append((stack, weight))
+        profiles = []
+        for thread_name, samples in sorted(by_thread.items(), key=lambda item: -sum(w for _, w in item[1])):
+            total = sum(weight for _, weight in samples)
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": total,
+                    "samples": [list(stack) for stack, _ in samples],
+                    "weights": [weight for _, weight in samples],
+                }
+            )
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": f"{name} ({self.mode})",
+            "exporter": "bloggers-tapri profiler",
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": function, "file": filename, "line": line}
+                    for function, filename, line in self._frames
+                ]
+            },
+            "profiles": profiles,
+        }
+
+    def save(self, directory: str, name: str) -> str:
+        """Write the speedscope JSON and return its path"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}-{self.mode}.speedscope.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_speedscope(name), f)
+        logger.info(
+            f"Saved {self.mode} profile of {self.elapsed:.1f}s "
+            f"({len(self.samples)} distinct stacks) to {path}"
+        )
+        return path
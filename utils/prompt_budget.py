@@ -0,0 +1,188 @@
+# utils/prompt_budget.py
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# Rough average for English prose across the Gemini and Llama tokenizers
+CHARS_PER_TOKEN = 4
+
+_SEPARATORS = {"sentence": " ", "paragraph": "\n\n", "line": "\n", "items": "\n"}
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+_PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n")
+_HEADING_BOUNDARY = re.compile(r"\n(?=#{1,6}\s)")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate, good enough for budgeting prompt sections"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_units(text: str, split: str) -> List[str]:
+    """Split text into the units a section may be truncated at"""
+    if split == "sentence":
+        units = [s for p in _PARAGRAPH_BOUNDARY.split(text) for s in _SENTENCE_BOUNDARY.split(p)]
+    elif split == "paragraph":
+        units = _PARAGRAPH_BOUNDARY.split(text)
+    elif split == "line":
+        units = text.splitlines()
+    else:
+        raise ValueError(f"Unknown split mode: {split}")
+    return [unit.strip() for unit in units if unit.strip()]
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """
+    Split long text into chunks of at most max_tokens without dropping anything
+
+    Chunks break at headings and paragraphs where possible, then at
+    sentences, and only split inside a sentence when it alone is too long.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    blocks = [
+        block.strip()
+        for section in _HEADING_BOUNDARY.split(text)
+        for block in _PARAGRAPH_BOUNDARY.split(section)
+        if block.strip()
+    ]
+
+    pieces: List[str] = []
+    for block in blocks:
+        if len(block) <= max_chars:
+            pieces.append(block)
+            continue
+        for sentence in _SENTENCE_BOUNDARY.split(block):
+            pieces.extend(
+                sentence[start : start + max_chars] for start in range(0, len(sentence), max_chars)
+            )
+
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        candidate = f"{current}\n\n{piece}" if current else piece
+        if len(candidate) > max_chars and current:
+            chunks.append(current)
+            current = piece
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@dataclass
+class _Section:
+    name: str
+    units: List[str]
+    separator: str
+    priority: int
+    required: bool
+    max_tokens: Optional[int]
+    kept: List[str] = field(default_factory=list)
+
+    @property
+    def requested_tokens(self) -> int:
+        return estimate_tokens(self.separator.join(self.units))
+
+    def render(self) -> str:
+        return self.separator.join(self.kept)
+
+
+class PromptBuilder:
+    """
+    Assemble a prompt from fixed text and budgeted sections
+
+    Fixed text and required sections are always kept. The remaining token
+    budget goes to the other sections in priority order (lower number
+    first), each truncated at sentence, paragraph, line or item boundaries
+    rather than mid-word.
+    """
+
+    def __init__(self, budget_tokens: int, name: str = "prompt"):
+        self.budget_tokens = budget_tokens
+        self.name = name
+        self._parts: List[Union[str, _Section]] = []
+        self.report: Dict[str, Dict[str, int]] = {}
+
+    def text(self, text: str) -> "PromptBuilder":
+        self._parts.append(text)
+        return self
+
+    def section(
+        self,
+        name: str,
+        content: Union[str, Sequence[str]],
+        priority: int = 1,
+        split: str = "sentence",
+        required: bool = False,
+        max_tokens: Optional[int] = None,
+    ) -> "PromptBuilder":
+        """
+        Add a budgeted section
+
+        Args:
+            name: Label used in the size report
+            content: Text to split, or a ready list of items (findings, sources)
+            priority: Lower numbers receive budget first
+            split: sentence, paragraph or line when content is text
+            required: Keep the whole section verbatim even if it exceeds the budget
+            max_tokens: Upper bound for this section on its own
+        """
+        if isinstance(content, str) and required:
+            # Required text is never cut, so keep its formatting untouched
+            units, separator = [content.strip()], ""
+        elif isinstance(content, str):
+            units, separator = split_units(content, split), _SEPARATORS[split]
+        else:
+            units, separator = [str(item) for item in content], _SEPARATORS["items"]
+        self._parts.append(_Section(name, units, separator, priority, required, max_tokens))
+        return self
+
+    def build(self) -> str:
+        sections = [part for part in self._parts if isinstance(part, _Section)]
+        fixed = sum(estimate_tokens(part) for part in self._parts if isinstance(part, str))
+        remaining = self.budget_tokens - fixed
+
+        for section in sections:
+            section.kept = []
+            if section.required:
+                section.kept = list(section.units)
+                remaining -= section.requested_tokens
+        if remaining < 0:
+            logger.warning(
+                f"Prompt '{self.name}' exceeds its {self.budget_tokens} token budget "
+                f"by {-remaining} tokens with required content alone"
+            )
+
+        for section in sorted(sections, key=lambda s: s.priority):
+            if section.required:
+                continue
+            allowance = max(0, remaining)
+            if section.max_tokens is not None:
+                allowance = min(allowance, section.max_tokens)
+            used = 0
+            for unit in section.units:
+                cost = estimate_tokens(unit + section.separator)
+                if used + cost > allowance:
+                    break
+                section.kept.append(unit)
+                used += cost
+            remaining -= used
+
+        prompt = "\n".join(
+            part.render() if isinstance(part, _Section) else part for part in self._parts
+        )
+        self.report = {
+            section.name: {
+                "tokens": estimate_tokens(section.render()),
+                "requested": section.requested_tokens,
+                "units": len(section.kept),
+                "total_units": len(section.units),
+            }
+            for section in sections
+        }
+        self.report["total"] = {"tokens": estimate_tokens(prompt), "budget": self.budget_tokens}
+        logger.info(f"Prompt '{self.name}' size: {self.report}")
+        return prompt
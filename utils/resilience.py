@@ -0,0 +1,346 @@
+# utils/resilience.py
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# Statuses that guarantee the server did not act on the request
+SAFE_TO_REPEAT_STATUS = {425, 429, 503}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+
+class CallTimeoutError(TimeoutError):
+    """The call started but did not finish in time; it keeps running in the background"""
+
+
+class NoWorkerError(TimeoutError):
+    """No worker picked the call up in time, so it was never started"""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    # Measured from when a worker starts the call, not from when it was queued
+    timeout: Optional[float] = None
+    # A timed-out call may still complete, and be billed, so repeating it can pay twice
+    retry_timeouts: bool = True
+
+
+def default_policy(**overrides) -> RetryPolicy:
+    values = {"max_attempts": config.RETRY_MAX_ATTEMPTS}
+    values.update(overrides)
+    return RetryPolicy(**values)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    response = getattr(error, "response", None)
+    for source in (error, response):
+        for attr in ("status_code", "code", "status"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Delay requested by the server through a Retry-After header, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _is_connect_error(error: BaseException) -> bool:
+    """Failures before the request reached the server, safe to repeat for any method"""
+    # Matched by name so neither requests nor httpx has to be imported here
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if names & {"ConnectError", "ConnectTimeout"}:
+        return True
+    # requests wraps both refused connections and mid-request resets as ConnectionError
+    return "ConnectionError" in names and (
+        "Failed to establish a new connection" in str(error) or "NameResolutionError" in str(error)
+    )
+
+
+def is_retryable(error: BaseException, idempotent: bool) -> bool:
+    """Whether repeating the call is both useful and safe"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = _status_code(error)
+    if status is not None:
+        return status in (RETRYABLE_STATUS if idempotent else SAFE_TO_REPEAT_STATUS)
+    if _is_connect_error(error):
+        return True
+    if not idempotent:
+        return False
+    names = {cls.__name__ for cls in type(error).__mro__}
+    return isinstance(error, (TimeoutError, FutureTimeoutError, ConnectionError)) or bool(
+        names
+        & {"ConnectionError", "Timeout", "ReadTimeout", "TimeoutException", "RemoteProtocolError"}
+    )
+
+
+def _is_endpoint_failure(error: BaseException) -> bool:
+    """Client errors such as a wrong password say nothing about the endpoint's health"""
+    status = _status_code(error)
+    return status is None or status >= 500 or status in (408, 429)
+
+
+class CircuitBreaker:
+    """
+    Stop calling an endpoint after repeated failures, probing again after a cool-down
+
+    While half-open a single probe call is let through and everyone else is
+    short-circuited until its result comes back. A probe that never reports
+    back is replaced after another cool-down.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        # When the half-open probe in flight was let through, if there is one
+        self.probe_started: Optional[float] = None
+        self.metrics = {"calls": 0, "failures": 0, "retries": 0, "short_circuits": 0}
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == "open" and now - self.opened_at >= self.reset_seconds:
+                self.state = "half-open"
+            if self.state == "half-open":
+                if self.probe_started is not None and now - self.probe_started < self.reset_seconds:
+                    self.metrics["short_circuits"] += 1
+                    return False
+                self.probe_started = now
+            if self.state == "open":
+                self.metrics["short_circuits"] += 1
+                return False
+            self.metrics["calls"] += 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.metrics["failures"] += 1
+            self.consecutive_failures += 1
+            self.probe_started = None
+            if self.state == "half-open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"Circuit for '{self.name}' opened")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def record_retry(self):
+        with self._lock:
+            self.metrics["retries"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, **self.metrics}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+# One pool per endpoint, so a slow provider cannot starve calls to the others
+_timeout_executors: Dict[str, ThreadPoolExecutor] = {}
+_timeout_executors_lock = threading.Lock()
+
+
+def circuit_breaker(endpoint: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(
+                endpoint, config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_SECONDS
+            )
+        return _breakers[endpoint]
+
+
+def resilience_metrics() -> Dict[str, Dict[str, Any]]:
+    """Breaker state and call counters for every endpoint seen so far"""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.snapshot() for name, breaker in sorted(breakers.items())}
+
+
+def _timeout_executor(endpoint: str) -> ThreadPoolExecutor:
+    with _timeout_executors_lock:
+        if endpoint not in _timeout_executors:
+            _timeout_executors[endpoint] = ThreadPoolExecutor(
+                max_workers=config.TIMEOUT_POOL_SIZE, thread_name_prefix=f"timeout-{endpoint}"
+            )
+        return _timeout_executors[endpoint]
+
+
+def _call_once(endpoint: str, fn: Callable[..., Any], timeout: Optional[float], args, kwargs) -> Any:
+    if timeout is None:
+        return fn(*args, **kwargs)
+    context = contextvars.copy_context()
+    started_at: List[float] = []
+    started = threading.Event()
+
+    def run():
+        started_at.append(time.monotonic())
+        started.set()
+        return context.run(fn, *args, **kwargs)
+
+    future = _timeout_executor(endpoint).submit(run)
+    # Waiting for a worker is bounded separately; a call that never started can be withdrawn
+    if not started.wait(timeout) and future.cancel():
+        raise NoWorkerError(f"No worker for '{endpoint}' became free within {timeout:g}s")
+    started.wait()
+    remaining = started_at[0] + timeout - time.monotonic()
+    try:
+        return future.result(timeout=max(0.0, remaining))
+    except FutureTimeoutError:
+        # The worker cannot be interrupted; it finishes in the background
+        raise CallTimeoutError(f"Call timed out after {timeout:g}s") from None
+
+
+def call_with_resilience(
+    endpoint: str,
+    fn: Callable[..., Any],
+    *args,
+    policy: Optional[RetryPolicy] = None,
+    idempotent: bool = True,
+    limiter: Optional["RateLimiter"] = None,
+    **kwargs,
+) -> Any:
+    """
+    Call fn with the endpoint's circuit breaker, a timeout and jittered retries
+
+    Args:
+        endpoint: Breaker and metrics key, e.g. "devto:articles"
+        fn: The call to make
+        policy: Attempts, backoff and per-attempt timeout
+        idempotent: False limits retries to failures where the request was not processed
+        limiter: Rate limit every attempt, retries included, is sent under
+
+    Raises:
+        CircuitOpenError: the endpoint is failing and still cooling down
+        The last error from fn once retries are exhausted or not allowed
+    """
+    policy = policy or default_policy()
+    breaker = circuit_breaker(endpoint)
+
+    for attempt in range(1, policy.max_attempts + 1):
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit for '{endpoint}' is open")
+        if limiter is not None:
+            waited = limiter.acquire()
+            if waited:
+                logger.info(f"Waited {waited:.1f}s for the '{endpoint}' rate limit")
+        try:
+            result = _call_once(endpoint, fn, policy.timeout, args, kwargs)
+        except Exception as e:
+            if _is_endpoint_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if attempt == policy.max_attempts or not is_retryable(e, idempotent):
+                raise
+            if isinstance(e, CallTimeoutError) and not policy.retry_timeouts:
+                raise
+            backoff = random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** attempt))
+            delay = max(backoff, min(retry_after_seconds(e) or 0.0, policy.max_delay))
+            breaker.record_retry()
+            logger.warning(
+                f"'{endpoint}' attempt {attempt}/{policy.max_attempts} failed ({e}), "
+                f"retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+class StageCheckpoints:
+    """Bounded store of finished stage outputs so a retried run resumes where it failed"""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return dict(entry or {})
+
+    def save(self, key: str, stage: str, value: Any):
+        with self._lock:
+            self._entries.setdefault(key, {})[stage] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RateLimiter:
+    """Sliding-window limit of requests per period; acquire waits for a free slot"""
+
+    def __init__(self, requests: int, per_seconds: float):
+        self.requests = requests
+        self.per_seconds = per_seconds
+        self._sent: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def idle(self) -> bool:
+        """True when nothing was sent within the current window"""
+        with self._lock:
+            return not self._sent or time.monotonic() - self._sent[-1] >= self.per_seconds
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0] >= self.per_seconds:
+                    self._sent.popleft()
+                if len(self._sent) < self.requests:
+                    self._sent.append(now)
+                    return waited
+                delay = self.per_seconds - (now - self._sent[0])
+            time.sleep(delay)
+            waited += delay
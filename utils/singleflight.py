@@ -0,0 +1,95 @@
+# utils/singleflight.py
+import copy
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_stage_input(value: Any) -> str:
+    """Normalize a stage input so trivially different requests share a key"""
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().lower()
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def make_flight_key(stage: str, *parts: Any) -> str:
+    """Build a stable key from a stage name and its normalized inputs"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(normalize_stage_input(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return f"{stage}:{digest.hexdigest()}"
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight calls.
+
+    The first caller for a key runs the computation; callers arriving while
+    it is still running wait for it and receive a copy of the same result.
+    Nothing is cached once the computation finishes. When disabled, every
+    call runs on its own.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self.executed_calls: Counter = Counter()
+        self.coalesced_calls: Counter = Counter()
+
+    def do(self, stage: str, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if not self.enabled:
+            with self._lock:
+                self.executed_calls[stage] += 1
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.executed_calls[stage] += 1
+            else:
+                self.coalesced_calls[stage] += 1
+
+        if not leader:
+            logger.info(f"Coalesced identical in-flight '{stage}' call")
+            # Followers get their own copy so per-session mutations stay local
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Executed and coalesced call counts per stage"""
+        with self._lock:
+            stages = set(self.executed_calls) | set(self.coalesced_calls)
+            return {
+                stage: {
+                    "executed": self.executed_calls[stage],
+                    "coalesced": self.coalesced_calls[stage],
+                }
+                for stage in sorted(stages)
+            }
+
+
+single_flight = SingleFlight(enabled=config.SINGLE_FLIGHT)
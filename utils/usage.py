@@ -0,0 +1,264 @@
+# utils/usage.py
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# Assumed tokens per call for a stage nothing has been recorded for yet
+DEFAULT_CALL_TOKENS = (2000, 1000)
+# Observed averages cover this many days of history
+AVERAGE_WINDOW_DAYS = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    model TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cost_usd REAL NOT NULL,
+    latency REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS usage_user_day ON usage (user_id, day);
+CREATE INDEX IF NOT EXISTS usage_run ON usage (run_id);
+"""
+
+
+@dataclass(frozen=True)
+class UsageScope:
+    """Who a model call is billed to; economy runs route to the cheapest models"""
+
+    user_id: str
+    run_id: str
+    topic: str = ""
+    economy: bool = False
+
+
+active_usage: ContextVar[Optional[UsageScope]] = ContextVar("active_usage", default=None)
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised before a run when the user has spent their daily budget"""
+
+
+def _today() -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime())
+
+
+def token_counts(metrics: Any) -> Tuple[int, int]:
+    """(input, output) tokens from Agno run metrics, which hold one value per model message"""
+    if not metrics:
+        return 0, 0
+    get = metrics.get if isinstance(metrics, dict) else lambda name: getattr(metrics, name, None)
+
+    def total(*names: str) -> int:
+        for name in names:
+            value = get(name)
+            if value:
+                return int(sum(value) if isinstance(value, (list, tuple)) else value)
+        return 0
+
+    return total("input_tokens", "prompt_tokens"), total("output_tokens", "completion_tokens")
+
+
+def estimate_cost(model_id: str, input_tokens: int, output_tokens: int) -> float:
+    price = config.MODEL_PRICES.get(model_id)
+    if price is None:
+        logger.debug(f"No price configured for {model_id}, counting it as free")
+        return 0.0
+    return (input_tokens * price["input"] + output_tokens * price["output"]) / 1_000_000
+
+
+class UsageLedger:
+    """
+    Token and cost records per model call, persisted in SQLite
+
+    Every model call that reached a provider is stored with the stage, model,
+    user and run it belongs to, whether or not its response was usable. Daily
+    totals enforce per-user budgets; each open run holds a reservation of its
+    expected cost, so concurrent runs of one user cannot all pass the check.
+    The average cost of each stage on each model tells the router which
+    candidate is cheapest.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        # (stage, model) -> [calls, input tokens, output tokens, cost]
+        self._averages: Dict[Tuple[str, str], List[float]] = {}
+        # run id -> [user id, reserved cost, cost recorded so far]
+        self._open_runs: Dict[str, List[Any]] = {}
+        self._load_averages()
+
+    def _load_averages(self):
+        since = time.time() - AVERAGE_WINDOW_DAYS * 86400
+        rows = self._db.execute(
+            "SELECT stage, model, COUNT(*), SUM(input_tokens), SUM(output_tokens), SUM(cost_usd) "
+            "FROM usage WHERE recorded_at >= ? GROUP BY stage, model",
+            (since,),
+        )
+        for stage, model, *totals in rows:
+            self._averages[(stage, model)] = list(totals)
+
+    def record(self, stage: str, model_id: str, metrics: Any, latency: float) -> float:
+        """Store one model call for the active scope and return its estimated cost"""
+        scope = active_usage.get()
+        input_tokens, output_tokens = token_counts(metrics)
+        cost = estimate_cost(model_id, input_tokens, output_tokens)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO usage (recorded_at, day, user_id, run_id, topic, stage, model, "
+                "input_tokens, output_tokens, cost_usd, latency) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.time(),
+                    _today(),
+                    scope.user_id if scope else "anonymous",
+                    scope.run_id if scope else "",
+                    scope.topic if scope else "",
+                    stage,
+                    model_id,
+                    input_tokens,
+                    output_tokens,
+                    cost,
+                    round(latency, 3),
+                ),
+            )
+            totals = self._averages.setdefault((stage, model_id), [0, 0, 0, 0.0])
+            for i, value in enumerate((1, input_tokens, output_tokens, cost)):
+                totals[i] += value
+            if scope and scope.run_id in self._open_runs:
+                self._open_runs[scope.run_id][2] += cost
+        logger.debug(
+            f"Stage '{stage}' on {model_id}: {input_tokens} in, {output_tokens} out, ${cost:.5f}"
+        )
+        return cost
+
+    def budget_for(self, user_id: str) -> float:
+        return float(config.USER_DAILY_BUDGETS.get(user_id, config.DAILY_USER_BUDGET_USD))
+
+    def _spent_today(self, user_id: str) -> Tuple[int, int, int, float]:
+        return self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0), "
+            "COALESCE(SUM(cost_usd), 0) FROM usage WHERE user_id = ? AND day = ?",
+            (user_id, _today()),
+        ).fetchone()
+
+    def _reserved(self, user_id: str) -> float:
+        """Expected cost of the user's open runs that they have not recorded yet"""
+        return sum(
+            max(0.0, reserved - recorded)
+            for owner, reserved, recorded in self._open_runs.values()
+            if owner == user_id
+        )
+
+    def spent_today(self, user_id: str) -> Dict[str, float]:
+        with self._lock:
+            calls, input_tokens, output_tokens, cost = self._spent_today(user_id)
+        return {
+            "calls": calls,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost_usd": cost,
+        }
+
+    def estimate_run_cost(self) -> float:
+        """Average cost of recent runs, else the expected cost of one call per configured stage"""
+        since = time.time() - AVERAGE_WINDOW_DAYS * 86400
+        with self._lock:
+            (average,) = self._db.execute(
+                "SELECT AVG(run_cost) FROM (SELECT SUM(cost_usd) AS run_cost FROM usage "
+                "WHERE recorded_at >= ? AND run_id != '' GROUP BY run_id)",
+                (since,),
+            ).fetchone()
+        if average:
+            return float(average)
+        return sum(
+            self.expected_cost(stage, specs[0].partition(":")[2])
+            for stage, specs in config.MODEL_ROUTES.items()
+            if specs
+        )
+
+    def open_scope(self, user_id: str, run_id: str, topic: str = "") -> UsageScope:
+        """
+        Check the user's daily budget, reserve the run's expected cost and
+        return the scope to bill the run to; release it with close_scope
+
+        Raises:
+            BudgetExceeded: If today's spend plus the user's open runs uses up the budget
+        """
+        budget = self.budget_for(user_id)
+        if budget <= 0:
+            return UsageScope(user_id, run_id, topic)
+        estimate = self.estimate_run_cost()
+        with self._lock:
+            spent = self._spent_today(user_id)[3]
+            committed = spent + self._reserved(user_id)
+            if committed >= budget:
+                raise BudgetExceeded(
+                    f"Daily model budget of ${budget:.2f} reached (${spent:.2f} spent today"
+                    + (f", ${committed - spent:.2f} held by runs in progress" if committed > spent else "")
+                    + "). It resets at midnight UTC."
+                )
+            self._open_runs[run_id] = [user_id, estimate, 0.0]
+        economy = (budget - committed - estimate) / budget < config.BUDGET_ECONOMY_SHARE
+        if economy:
+            logger.info(f"User {user_id} is low on budget, routing run {run_id} to the cheapest models")
+        return UsageScope(user_id, run_id, topic, economy)
+
+    def close_scope(self, scope: UsageScope):
+        """Release the run's reservation; calls finishing later are still recorded"""
+        with self._lock:
+            self._open_runs.pop(scope.run_id, None)
+
+    def run_breakdown(self, run_id: str) -> List[Dict[str, Any]]:
+        """Calls, tokens and cost per stage of one run"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT stage, COUNT(*), SUM(input_tokens), SUM(output_tokens), SUM(cost_usd) "
+                "FROM usage WHERE run_id = ? GROUP BY stage ORDER BY MIN(recorded_at)",
+                (run_id,),
+            ).fetchall()
+        return [
+            {
+                "stage": stage,
+                "calls": calls,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cost_usd": cost,
+            }
+            for stage, calls, input_tokens, output_tokens, cost in rows
+        ]
+
+    def expected_cost(self, stage: str, model_id: str) -> float:
+        """Average observed cost of a stage on a model, else priced from the stage's usual tokens"""
+        with self._lock:
+            totals = self._averages.get((stage, model_id))
+            if totals and totals[0]:
+                return totals[3] / totals[0]
+            stage_totals = [t for (s, _), t in self._averages.items() if s == stage and t[0]]
+        if stage_totals:
+            calls = sum(t[0] for t in stage_totals)
+            tokens = (sum(t[1] for t in stage_totals) / calls, sum(t[2] for t in stage_totals) / calls)
+        else:
+            tokens = DEFAULT_CALL_TOKENS
+        return estimate_cost(model_id, *tokens)
+
+
+usage_ledger = UsageLedger(config.USAGE_DB_PATH)